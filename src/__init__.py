@@ -1,3 +1,4 @@
 from . import kgraph
 from . import moves
 from . import io
+from . import search
@@ -1 +1 @@
-from .util import load_kgraph, save_kgraph
+from .util import load_kgraph, save_kgraph, load_skeletons
@@ -1,5 +1,9 @@
 from ..kgraph import ColoredDigraph
 
+import os
+import tarfile
+import zipfile
+
 def save_kgraph(skeleton, path):
     graph_string = skeleton.to_string()
     with open(path, 'w+') as f:
@@ -37,3 +41,34 @@ def load_kgraph(path):
     # todo - buffered loading for Very Large Graphs
     with open(path, 'r') as f:
         return from_string(f.read())
+
+def load_skeletons(path):
+    """
+    reads every skeleton in a directory, searched recursively, or in a tar or
+    zip archive. each file holds one skeleton, as written by `save_kgraph`.
+    :param path: the path of a directory or an archive.
+    :return: a list of (name, ColoredDigraph), sorted by name, the path of
+    the file within the directory or archive.
+    """
+    skeletons = []
+    if os.path.isdir(path):
+        for root, _, files in os.walk(path):
+            for name in files:
+                full = os.path.join(root, name)
+                skeletons.append((os.path.relpath(full, path),
+                                  load_kgraph(full)))
+    elif tarfile.is_tarfile(path):
+        with tarfile.open(path) as archive:
+            for member in archive.getmembers():
+                if member.isfile():
+                    text = archive.extractfile(member).read().decode()
+                    skeletons.append((member.name, from_string(text)))
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for name in archive.namelist():
+                if (not name.endswith('/')):
+                    text = archive.read(name).decode()
+                    skeletons.append((name, from_string(text)))
+    else:
+        raise ValueError("expected a directory, or a tar or zip archive")
+    return sorted(skeletons, key=lambda item: item[0])
@@ -17,7 +17,13 @@ class ColoredDigraph:
         """
         self._k = k
         self._vertices = []
+        # the position of each vertex in `self._vertices`
+        self._index = dict()
         self._E = 0
+        self._subscribers = []
+        # None when every adjacency list belongs to this graph. after `fork`,
+        # the vertices whose list, per color, is no longer shared.
+        self._owned = None
         if (adj==None):
             self._adj = [{} for color in range(self.k())]
             for v in vertices:
@@ -30,9 +36,68 @@ class ColoredDigraph:
             # unsafe - only for instantiating subgraphs
             self._adj = adj
             self._vertices = vertices
+            self._index = dict((v,i) for i,v in enumerate(vertices))
         else:
             raise ValueError(f"the constructor received an adjacency table with keys {list(adj.keys())}, but a {k}-graph requires {k} numerically-keyed adjacency lists.")
 
+    def __getstate__(self):
+        # subscribers observe this object, not its copies
+        state = self.__dict__.copy()
+        state['_subscribers'] = []
+        # a copy of a fork may share its adjacency lists with copies of other
+        # forks made at the same time, e.g. by one pickle, so it owns none
+        if (self._owned != None):
+            state['_owned'] = [set() for color in self.colors()]
+        return state
+
+    def fork(self):
+        """
+        a copy of the graph that shares the adjacency lists of `self`. a shared
+        list is copied by whichever graph first modifies it, so a fork costs a
+        reference per vertex and color, and edges are only copied where either
+        graph changes.
+        :return: a ColoredDigraph object.
+        """
+        other = type(self).__new__(type(self))
+        other.__dict__.update(self.__getstate__())
+        other._adj = [dict(adj) for adj in self._adj]
+        other._vertices = list(self._vertices)
+        other._index = dict(self._index)
+        # every list is now shared by both graphs
+        self._owned = [set() for color in self.colors()]
+        other._owned = [set() for color in self.colors()]
+        return other
+
+    def _own(self, v, color):
+        """
+        copies the adjacency list of a vertex, if it may be shared by a fork.
+        :param v: a vertex
+        :param color: an integer color
+        """
+        if ((self._owned != None) and (v not in self._owned[color])):
+            self._adj[color][v] = list(self._adj[color][v])
+            self._owned[color].add(v)
+
+    def subscribe(self, callback):
+        """
+        registers a function to be called after every mutation of the graph.
+        :param callback: a function taking an event name, 'add_vertex',
+        'add_edge', 'del_edge' or 'del_vertex', followed by the arguments of
+        the mutation: a vertex, or the source, range and (integer) color of an
+        edge. deleting a vertex first emits 'del_edge' for each of its edges.
+        """
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """
+        :param callback: a function previously passed to `subscribe`.
+        """
+        self._subscribers.remove(callback)
+
+    def _notify(self, event, *args):
+        for callback in self._subscribers:
+            callback(event, *args)
+
     def _flip(self, v):
         """
         :param v: vertex to be flipped
@@ -82,7 +147,11 @@ class ColoredDigraph:
             v = max(self.vertices()) + 1
         for color in self.colors():
             self._adj[color][v] = []
+            if (self._owned != None):
+                self._owned[color].add(v)
+        self._index[v] = len(self._vertices)
         self._vertices.append(v)
+        self._notify('add_vertex', v)
         return v
 
     def add_edge(self, v, w, color):
@@ -94,9 +163,12 @@ class ColoredDigraph:
         color(s) of edge to be created
         """
         if (type(color) == int):
+            self._own(v, color)
+            self._own(w, color)
             self._adj[color][v].append(w)
             self._adj[color][w].append(self._flip(v))
             self._E += 1
+            self._notify('add_edge', v, w, color)
         else:
             try:
                 for c in color:
@@ -165,11 +237,14 @@ class ColoredDigraph:
         color(s) on which to remove an edge vw
         """
         if (type(color) == int):
+            self._own(v, color)
+            self._own(w, color)
             i = self._adj[color][v].index(w)
             del self._adj[color][v][i]
             j = self._adj[color][w].index(self._flip(v))
             del self._adj[color][w][j]
             self._E -= 1
+            self._notify('del_edge', v, w, color)
         else:
             try:
                 for c in color:
@@ -180,7 +255,8 @@ class ColoredDigraph:
     def del_vertex(self, v):
         """
         removes a vertex, all edges sourced or ranged at the vertex, and its
-        adjacency lists
+        adjacency lists. the last vertex of `vertices` takes the place of the
+        deleted one, so that the cost is in the degree of the vertex only.
         :param v: the vertex to delete
         """
         for color in self.colors():
@@ -192,8 +268,14 @@ class ColoredDigraph:
                     continue
                 self.del_edge(x,v,color)
             del self._adj[color][v]
-        i = self._vertices.index(v)
-        del self._vertices[i]
+            if (self._owned != None):
+                self._owned[color].discard(v)
+        i = self._index.pop(v)
+        last = self._vertices.pop()
+        if (last != v):
+            self._vertices[i] = last
+            self._index[last] = i
+        self._notify('del_vertex', v)
 
     def restrict_colors(self, colors):
         """
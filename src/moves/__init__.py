@@ -6,3 +6,5 @@ from .insplit import Insplit as I, InsplitInverse as IInverse
 from .outsplit import Outsplit as O, OutsplitInverse as OInverse
 from .cuntzsplice import CuntzSplice as C, CuntzSpliceInverse as CInverse
 from .eclose import Eclose as P, EcloseInverse as PInverse
+from .normalform import reduce
+from .sequence import MoveSequence
@@ -1,23 +1,102 @@
 from .k1move import K1Move
 from .cycles_interface import CycleFinder, CycleIntersection
+from .degree_index import DegreeIndex
+
+from itertools import chain
 
 class CuntzSplice(K1Move):
     # move (C)
 
-    def __init__(self, skeleton):
+    shardable = True
+    # True for the move of a `_checker`, whose cycle finder no one else uses
+    _owns_cyclefinder = False
+
+    def __init__(self, skeleton, cyclefinder=None, cycleintersection=None,
+                 in_place=False, incremental=False, lazy=False,
+                 processes=None):
         """
         :param skeleton: a ColoredDigraph object.
+        :param cyclefinder: optional, a CycleFinder on `skeleton` to reuse. an
+        incremental CycleFinder stays current as moves are applied to
+        `skeleton`, so it can be shared by every move along a rewrite sequence.
+        :param cycleintersection: optional, a CycleIntersection on
+        `cyclefinder` to reuse.
+        :param incremental: see `Move`. the cycle finder must be incremental
+        too; one is created if none is given.
+        :param processes: see `Move`. a cycle finder created by the move
+        searches large components with as many processes.
         """
         self.graph = skeleton
 
         # associates every vertex to the cycles it supports.
-        self.cyclefinder = CycleFinder(self.graph)
+        if (cyclefinder == None):
+            cyclefinder = CycleFinder(self.graph, incremental=incremental,
+                                      processes=processes)
+        elif (cyclefinder.graph is not self.graph):
+            raise ValueError("the cycle finder belongs to another graph")
+        elif (incremental and (not cyclefinder.incremental)):
+            raise ValueError("an incremental move needs an incremental cycle finder")
+        self.cyclefinder = cyclefinder
         # an undirected graph: nodes are cycles, edges correspond to cycles
         # whose paths intersect.
-        self.cycleintersection = CycleIntersection(self.graph, self.cyclefinder)
+        if (cycleintersection == None):
+            cycleintersection = CycleIntersection(self.graph, self.cyclefinder)
+        elif (cycleintersection.cyclefinder is not self.cyclefinder):
+            raise ValueError("the cycle intersection belongs to another cycle finder")
+        self.cycleintersection = cycleintersection
+
+        super().__init__(skeleton, in_place, incremental, lazy, processes)
+        if (self.incremental):
+            # viability depends on the cycles near each vertex, too
+            self.cyclefinder.listen(self._cycle_update)
+
+    def _cycle_update(self, event, c):
+        """
+        marks the vertices near a cycle that has been found or lost.
+        :param event: 'add_cycle' or 'del_cycle', see `CycleFinder.listen`.
+        :param c: the index of the cycle.
+        """
+        self._touch(self.cyclefinder.cycles[c])
+
+    def detach(self):
+        """
+        stops tracking changes to `self.graph` and its cycles. the cycle finder
+        of a `_checker` is its own, and stops too.
+        """
+        if (self.incremental):
+            super().detach()
+            self.cyclefinder.unlisten(self._cycle_update)
+        if (self._owns_cyclefinder):
+            self.cyclefinder.detach()
+
+    def _current(self, graph):
+        """
+        :param graph: a graph the move is being applied to.
+        :return: boolean, True iff viability can still be decided on `graph`,
+        which needs the cycle finder to follow it.
+        """
+        return ((graph is self.graph) and self.cyclefinder.incremental)
 
-        self.viable = self._check()
-        self.active = (len(self.viable) > 0)
+    def _checker(self, graph):
+        """
+        :param graph: a graph the move is being applied to, other than
+        `self.graph`.
+        :return: a lazy move of the same class on `graph`, whose incremental
+        cycle finder follows its mutations.
+        """
+        checker = type(self)(graph,
+                             cyclefinder=CycleFinder(graph, incremental=True),
+                             lazy=True)
+        checker._owns_cyclefinder = True
+        return checker
+
+    def _prepare_shards(self):
+        """
+        finds every cycle once, before the cycle finder is copied to the
+        workers.
+        """
+        for v in self.graph.vertices():
+            self.cyclefinder._search(v)
 
     def condition_C(self, v):
         """
@@ -64,6 +143,13 @@ class CuntzSplice(K1Move):
         return [v for v in self.graph.vertices()
                 if self.condition_C(v)]
 
+    def _secondary_check_at(self, v):
+        """
+        :param v: a vertex
+        :return: `v`, if it supports two return paths.
+        """
+        return ([v] if self.condition_C(v) else [])
+
     def _action(self, component):
         """
         :param component: one or more vertices
@@ -86,6 +172,56 @@ class CuntzSplice(K1Move):
 
 class CuntzSpliceInverse(CuntzSplice):
 
+    # a motif reaches from `v`, through `w`, to `u`
+    radius = 2
+    # deleting a motif may cut the return paths of another motif's `u`
+    local = False
+    shardable = False
+    # the signature (in-degree, out-degree, loop count) of `v`, per c1
+    motif_key = (2, 2, 1)
+
+    def __init__(self, skeleton, cyclefinder=None, cycleintersection=None,
+                 in_place=False, incremental=False, lazy=False,
+                 degreeindex=None, processes=None):
+        """
+        :param degreeindex: optional, a DegreeIndex on `skeleton` to reuse. the
+        motifs are only sought at vertices with signature `motif_key`. an
+        incremental move needs an incremental index; one is created if none is
+        given. otherwise, the index given, or one built at the first full
+        check, is kept.
+        see `CuntzSplice` for the other parameters.
+        """
+        if (degreeindex == None):
+            if (incremental):
+                degreeindex = DegreeIndex(skeleton, incremental=True)
+        elif (degreeindex.graph is not skeleton):
+            raise ValueError("the degree index belongs to another graph")
+        elif (incremental and (not degreeindex.incremental)):
+            raise ValueError("an incremental move needs an incremental degree index")
+        self.degreeindex = degreeindex
+        super().__init__(skeleton, cyclefinder, cycleintersection,
+                         in_place, incremental, lazy, processes)
+
+    def _candidates(self):
+        """
+        :return: the vertices with signature `motif_key`.
+        """
+        if (self.degreeindex == None):
+            self.degreeindex = DegreeIndex(self.graph)
+        return self.degreeindex[self.motif_key]
+
+    def _candidate(self, v):
+        """
+        :param v: a vertex
+        :return: boolean, True iff `v` has signature `motif_key`.
+        """
+        if ((self.degreeindex != None) and self.degreeindex.incremental):
+            return (self.degreeindex.key(v) == self.motif_key)
+        else:
+            adj_out, adj_in = self.graph.adj(v)
+            return ((len(adj_in), len(adj_out),
+                     len([w for w in adj_out if (w == v)])) == self.motif_key)
+
     def c1(self, x, out_adj_x, in_adj_x):
         """
         checks condition (i)
@@ -149,9 +285,7 @@ class CuntzSpliceInverse(CuntzSplice):
         not traverse any vertex in `omit`.
         """
         # cycles restricting the contents of `omit`
-        cycles_at_x = [c for c in cyclefinder[x]
-                       if all((o not in cyclefinder.cycles[c])
-                              for o in omit)]
+        cycles_at_x = cyclefinder.avoiding(x, omit)
         nb_cycles = len(cycles_at_x)
         if (nb_cycles == 0):
             return False
@@ -215,12 +349,31 @@ class CuntzSpliceInverse(CuntzSplice):
         :return: a list of all (C)-motifs in the graph.
         """
         motifs = []
-        for v in self.graph.vertices():
+        for v in self._candidates():
             motif_at_v = self.motif(v)
             if (len(motif_at_v) == 3):
                 motifs.append(motif_at_v)
         return motifs
 
+    def _secondary_check_at(self, v):
+        """
+        :param v: a vertex
+        :return: the (C)-motif at `v`, if there is one.
+        """
+        if (not self._candidate(v)):
+            return []
+        motif_at_v = self.motif(v)
+        return ([motif_at_v] if (len(motif_at_v) == 3) else [])
+
+    def _anchors(self, component):
+        """
+        :param component: one or more (C)-motifs
+        :return: the vertices of the motifs.
+        """
+        if (type(component) == tuple):
+            component = [component]
+        return list(chain(*component))
+
     def _action(self, component):
         """
         :param component: a (C)-motif (w, v1, v2)
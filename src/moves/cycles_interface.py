@@ -1,11 +1,472 @@
 from itertools import chain
+from collections import deque, defaultdict
+from heapq import heappush, heappop
 
-from ..kgraph import CC, ColoredDigraph
-from .python_simple_cycles import simple_cycles
+from ..kgraph import ColoredDigraph
+from .python_simple_cycles import (simple_cycles, parallel_simple_cycles,
+                                   cycle_statistics,
+                                   strongly_connected_components)
+
+def set_bits(bits):
+    """
+    :param bits: a bitset, as a non-negative integer.
+    :return: iterable, the positions of the set bits in increasing order.
+    """
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
 
 class CycleFinder:
     """
-    interfaces between qpwo's cycle finder and the ColoredDigraph object
+    interfaces between qpwo's cycle finder and the ColoredDigraph object.
+    cycles are discovered lazily: the first query at a vertex runs Johnson's
+    algorithm on the strongly connected component of that vertex only, and the
+    result is cached.
+    """
+
+    # steps of the path search that closes the cycles through an added edge,
+    # before the search is abandoned in favor of searching the component again
+    path_budget = 4096
+    # components smaller than this are searched in-process, even when a pool
+    # of processes is available
+    parallel_threshold = 32
+
+    def __init__(self, skeleton, incremental=False, processes=None):
+        """
+        :param skeleton: a ColoredDigraph object.
+        :param incremental: if True, subscribe to `skeleton` and keep the index
+        current as vertices and edges are added or removed. cycles through a
+        deleted edge are dropped, cycles through an added edge are found by a
+        path search local to the edge, and the strongly connected component is
+        searched again only when that local search is too large.
+        :param processes: optional, the number of worker processes with which
+        to search large components. see `parallel_simple_cycles`.
+        """
+        if (skeleton.k() != 1):
+            raise ValueError()
+        self.graph = skeleton
+        # every cycle lies within one strongly connected component, so the
+        # components partition the search. the decomposition is computed on
+        # demand, and again after the graph changes.
+        self._sccs = None
+        self._scc = None
+        # vertices whose cycles have all been found
+        self._searched = set()
+        # discovered cycles, keyed by index. the indices of lost cycles are
+        # reused, least first, so that the bitsets stay as short as the
+        # number of cycles over a long incremental session.
+        self.cycles = dict()
+        self._keys = dict()
+        self._next_cycle = 0
+        self._free = []
+        # \tau, complete on the searched vertices: an inverted index from each
+        # vertex to the bitset of cycle indices through it.
+        self._tau = dict((v,0)
+                         for v in self.graph.vertices())
+        # each cycle as the bitset of its vertex labels
+        self._bits = dict()
+        self._listeners = []
+        self.processes = processes
+        self.incremental = incremental
+        if (self.incremental):
+            self.graph.subscribe(self._update)
+
+    def detach(self):
+        """
+        stops tracking changes to `self.graph`.
+        """
+        if (self.incremental):
+            self.graph.unsubscribe(self._update)
+            self.incremental = False
+
+    def listen(self, callback):
+        """
+        registers a function to be called when a cycle is found or lost.
+        :param callback: a function taking an event, 'add_cycle' or
+        'del_cycle', and the index of the cycle. 'add_cycle' is emitted after
+        the cycle is indexed, 'del_cycle' before it is removed. the index of a
+        lost cycle may be given to a cycle found later.
+        """
+        self._listeners.append(callback)
+
+    def unlisten(self, callback):
+        """
+        :param callback: a function previously passed to `listen`.
+        """
+        self._listeners.remove(callback)
+
+    def _components(self):
+        """
+        :return: the strongly connected components of `self.graph`.
+        """
+        if (self._sccs == None):
+            skeleton_adj = dict((v,self.graph.adj(v)[0])
+                                for v in self.graph.vertices())
+            self._sccs = strongly_connected_components(skeleton_adj)
+            self._scc = dict()
+            for s in range(len(self._sccs)):
+                for v in self._sccs[s]:
+                    self._scc[v] = s
+        return self._sccs
+
+    def _add_cycle(self, cycle):
+        """
+        :param cycle: a list of vertices.
+        :return: the index of the cycle, which is indexed if it is new.
+        """
+        i = cycle.index(min(cycle))
+        key = tuple(cycle[i:] + cycle[:i])
+        if (key not in self._keys):
+            if (len(self._free) > 0):
+                c = heappop(self._free)
+            else:
+                c = self._next_cycle
+                self._next_cycle += 1
+            self.cycles[c] = cycle
+            self._keys[key] = c
+            self._bits[c] = 0
+            for v in cycle:
+                self._tau[v] |= (1 << c)
+                self._bits[c] |= (1 << v)
+            for callback in self._listeners:
+                callback('add_cycle', c)
+        return self._keys[key]
+
+    def _del_cycle(self, c):
+        """
+        :param c: the index of a cycle.
+        """
+        for callback in self._listeners:
+            callback('del_cycle', c)
+        cycle = self.cycles.pop(c)
+        i = cycle.index(min(cycle))
+        del self._keys[tuple(cycle[i:] + cycle[:i])]
+        del self._bits[c]
+        for v in cycle:
+            self._tau[v] &= ~(1 << c)
+        heappush(self._free, c)
+
+    def _search(self, v):
+        """
+        finds the cycles of the strongly connected component of a vertex, if
+        they have not been found already.
+        :param v: a vertex
+        """
+        if (v not in self._searched):
+            self._search_all(self._components()[self._scc[v]])
+
+    def _search_all(self, vertices):
+        """
+        finds the cycles of every strongly connected component which meets
+        `vertices`, in one pass.
+        :param vertices: iterable of vertices, each a union of components.
+        """
+        members = set(vertices)
+        scc_adj = dict((x,[w for w in self.graph.adj(x)[0]
+                           if (w in members)])
+                       for x in members)
+        if ((self.processes == None) or
+            (len(members) < self.parallel_threshold)):
+            cycles = simple_cycles(scc_adj)
+        else:
+            cycles = parallel_simple_cycles(scc_adj, self.processes,
+                                            self.parallel_threshold)
+        for cycle in cycles:
+            self._add_cycle(cycle)
+        self._searched.update(members)
+
+    def _update(self, event, *args):
+        """
+        keeps the index current under a mutation of `self.graph`.
+        :param event: a mutation, as given by `ColoredDigraph.subscribe`.
+        """
+        if (event == 'add_vertex'):
+            v = args[0]
+            self._tau[v] = 0
+            self._searched.add(v)
+        elif (event == 'del_vertex'):
+            # its cycles were dropped with its edges
+            v = args[0]
+            del self._tau[v]
+            self._searched.discard(v)
+        elif (event == 'add_edge'):
+            self._add_edge(args[0], args[1])
+        elif (event == 'del_edge'):
+            self._del_edge(args[0], args[1])
+        self._sccs = None
+        self._scc = None
+
+    def _del_edge(self, u, w):
+        """
+        drops the cycles through an edge that has been deleted.
+        :param u: the source of the edge
+        :param w: the range of the edge
+        """
+        if (w in self.graph.adj(u)[0]):
+            # a parallel edge supports the same cycles
+            return
+        for c in list(set_bits(self._tau[u] & self._tau[w])):
+            cycle = self.cycles[c]
+            n = len(cycle)
+            if any(((cycle[i] == u) and (cycle[(i+1) % n] == w))
+                   for i in range(n)):
+                self._del_cycle(c)
+
+    def _add_edge(self, u, w):
+        """
+        finds the cycles through an edge that has been added.
+        :param u: the source of the edge
+        :param w: the range of the edge
+        """
+        if (self.graph.adj(u)[0].count(w) > 1):
+            # a parallel edge supports the same cycles
+            return
+        if (u == w):
+            if (u in self._searched):
+                self._add_cycle([u])
+            return
+        # new cycles are paths from `w` to `u`, closed by the edge
+        region = self._region(w, u)
+        if ((u not in region) or region.isdisjoint(self._searched)):
+            # no new cycles, or none through a searched vertex
+            return
+        if (not self._close_paths(w, u, region)):
+            self._searched.difference_update(region)
+
+    def _region(self, w, u):
+        """
+        :param w: a vertex
+        :param u: a vertex
+        :return: the vertices on simple paths from `w` to `u`.
+        """
+        # search forward from `w` and backward from `u` in lockstep. the first
+        # search to finish bounds the other, so a new edge that hangs off a
+        # large component is resolved locally.
+        starts = [w, u]
+        stops = [u, w]
+        reached = [set([w]), set([u])]
+        deqs = [deque([w]), deque([u])]
+        i = 0
+        while ((len(deqs[0]) != 0) and (len(deqs[1]) != 0)):
+            x = deqs[i].popleft()
+            if (x != stops[i]):
+                for y in self.graph.adj(x)[i]:
+                    if (y not in reached[i]):
+                        reached[i].add(y)
+                        deqs[i].append(y)
+            i = 1 - i
+        bound = reached[0 if (len(deqs[0]) == 0) else 1]
+        i = 1 if (len(deqs[0]) == 0) else 0
+        region = set([starts[i]])
+        deq = deque([starts[i]])
+        while len(deq) != 0:
+            x = deq.popleft()
+            if (x != stops[i]):
+                for y in self.graph.adj(x)[i]:
+                    if ((y in bound) and (y not in region)):
+                        region.add(y)
+                        deq.append(y)
+        return region
+
+    def _close_paths(self, w, u, region):
+        """
+        indexes every cycle formed by a simple path from `w` to `u` and the
+        edge from `u` to `w`.
+        :param w: a vertex
+        :param u: a vertex
+        :param region: vertices to which the paths are restricted.
+        :return: False if the search exceeded `self.path_budget` steps.
+        """
+        out = lambda x: [y for y in set(self.graph.adj(x)[0]) if (y in region)]
+        budget = self.path_budget
+        path = [w]
+        on_path = set(path)
+        stack = [iter(out(w))]
+        while len(stack) != 0:
+            y = next(stack[-1], None)
+            if (y == None):
+                stack.pop()
+                on_path.discard(path.pop())
+                continue
+            budget -= 1
+            if (budget < 0):
+                return False
+            if (y == u):
+                self._add_cycle(path + [u])
+            elif (y not in on_path):
+                path.append(y)
+                on_path.add(y)
+                stack.append(iter(out(y)))
+        return True
+
+    def scc(self, v):
+        """
+        :param v: a vertex
+        :return: the index of the strongly connected component containing `v`.
+        """
+        self._components()
+        return self._scc[v]
+
+    def component(self, s):
+        """
+        :param s: the index of a strongly connected component.
+        :return: indices of the cycles in the component.
+        """
+        members = self._components()[s]
+        self._search(members[0])
+        bits = 0
+        for v in members:
+            bits |= self._tau[v]
+        return list(set_bits(bits))
+
+    def C(self):
+        """
+        :return: count cycles in `self.graph`. searches every component.
+        """
+        sccs = self._components()
+        unsearched = set(self._scc[v] for v in self.graph.vertices()
+                         if (v not in self._searched))
+        if (len(unsearched) > 0):
+            self._search_all(chain(*[sccs[s] for s in unsearched]))
+        return len(self.cycles)
+
+    def tau(self, v):
+        """
+        :param v: a vertex
+        :return: the bitset of the indices of the cycles supported by `v`.
+        """
+        self._search(v)
+        return self._tau[v]
+
+    def bits(self, c):
+        """
+        :param c: the index of a cycle.
+        :return: the bitset of the vertices of the cycle.
+        """
+        return self._bits[c]
+
+    def avoiding(self, v, omit):
+        """
+        :param v: a vertex
+        :param omit: vertices to avoid
+        :return: indices of the cycles supported by `v` which do not traverse
+        any vertex of `omit`.
+        """
+        bits = self.tau(v)
+        for o in omit:
+            bits &= ~self.tau(o)
+        return list(set_bits(bits))
+
+    def __getitem__(self, v):
+        return list(set_bits(self.tau(v)))
+
+class LocalCycleFinder(CycleFinder):
+    """
+    a CycleFinder that answers each query by a search from the vertex queried,
+    which stops after `limit` cycles. the conditions of the moves only tell
+    apart none, one, and two or more cycles at a vertex, so they are decided
+    with the default limit; unlike Johnson's algorithm on the whole strongly
+    connected component, the search is linear in the graph it reaches.
+    """
+
+    def __init__(self, skeleton, limit=2):
+        """
+        :param skeleton: a ColoredDigraph object.
+        :param limit: the number of cycles after which a search stops.
+        """
+        if (skeleton.k() != 1):
+            raise ValueError()
+        self.graph = skeleton
+        self.limit = limit
+        self.cycles = dict()
+        self._keys = dict()
+        self._next_cycle = 0
+        self._free = []
+        # \tau, over the cycles found so far only
+        self._tau = defaultdict(int)
+        self._bits = dict()
+        self._listeners = []
+        self.processes = None
+        self.incremental = False
+
+    def _circuits(self, v, omit):
+        """
+        Johnson's circuit search from a single vertex.
+        :param v: a vertex
+        :param omit: a set of vertices to avoid
+        :return: up to `limit` cycles through `v`, as lists of vertices.
+        """
+        successors = dict()
+        def out(x):
+            if (x not in successors):
+                successors[x] = [y for y in set(self.graph.adj(x, 0)[0])
+                                 if (y not in omit)]
+            return successors[x]
+        found = []
+        if (v in self.graph.adj(v, 0)[0]):
+            found.append([v])
+        # a vertex stays blocked until a cycle is found through it, and
+        # `unblock` lists the vertices to release with it
+        blocked = set([v])
+        unblock = dict()
+        path = [v]
+        stack = [iter([y for y in out(v) if (y != v)])]
+        closed = [False]
+        while ((len(stack) != 0) and (len(found) < self.limit)):
+            y = next(stack[-1], None)
+            if (y == None):
+                stack.pop()
+                x = path.pop()
+                if closed.pop():
+                    release = [x]
+                    while (len(release) != 0):
+                        z = release.pop()
+                        if (z in blocked):
+                            blocked.discard(z)
+                            release.extend(unblock.pop(z, ()))
+                    if (len(closed) != 0):
+                        closed[-1] = True
+                else:
+                    for z in out(x):
+                        unblock.setdefault(z, set()).add(x)
+            elif (y == v):
+                found.append(list(path))
+                closed[-1] = True
+            elif (y not in blocked):
+                blocked.add(y)
+                path.append(y)
+                stack.append(iter(out(y)))
+                closed.append(False)
+        return found[:self.limit]
+
+    def avoiding(self, v, omit):
+        """
+        :param v: a vertex
+        :param omit: vertices to avoid
+        :return: indices of up to `limit` cycles supported by `v` which do not
+        traverse any vertex of `omit`.
+        """
+        return [self._add_cycle(cycle)
+                for cycle in self._circuits(v, set(omit))]
+
+    def tau(self, v):
+        """
+        :param v: a vertex
+        :return: the bitset of the cycles found through `v`, after a search at
+        `v`.
+        """
+        self.avoiding(v, ())
+        return self._tau[v]
+
+    def __getitem__(self, v):
+        return self.avoiding(v, ())
+
+class CycleStatistics:
+    """
+    counts the cycles of a ColoredDigraph without materializing them. walks the
+    same search as `CycleFinder`, but keeps only aggregates, so memory is
+    O(V+E) rather than O(total length of all cycles).
     """
 
     def __init__(self, skeleton):
@@ -15,70 +476,84 @@ class CycleFinder:
         if (skeleton.k() != 1):
             raise ValueError()
         self.graph = skeleton
-        # find cycles
         skeleton_adj = dict((v,self.graph.adj(v)[0])
                             for v in self.graph.vertices())
-        self.cycles = tuple(simple_cycles(skeleton_adj))
-        # build \tau
-        self._tau = dict((v,set())
-                         for v in self.graph.vertices())
-        for c in range(self.C()):
-            for v in self.cycles[c]:
-                self._tau[v].add(c)
+        (self._counts, self._histogram,
+         self._scc_counts, self._sccs) = cycle_statistics(skeleton_adj)
 
     def C(self):
         """
         :return: count cycles in `self.graph`.
         """
-        return len(self.cycles)
+        return sum(self._scc_counts)
 
     def __getitem__(self, v):
-        return list(self._tau[v])
+        """
+        :param v: a vertex
+        :return: count cycles supported by `v`.
+        """
+        return self._counts[v]
+
+    def histogram(self):
+        """
+        :return: a dictionary associating cycle lengths to cycle counts.
+        """
+        return dict(self._histogram)
+
+    def components(self):
+        """
+        :return: a list of pairs (vertices, count), one for each strongly
+        connected component of `self.graph`, giving its vertices and the number
+        of cycles it supports.
+        """
+        return [(list(self._sccs[i]), self._scc_counts[i])
+                for i in range(len(self._sccs))]
 
 class CycleIntersection:
+    """
+    an undirected graph: nodes are cycles, edges correspond to cycles whose
+    paths intersect. the graph is implicit in the bitsets of the cycle finder,
+    as the neighbors of a cycle are the union of \tau over its vertices, and so
+    it follows the cycle finder as cycles are found or lost.
+    """
 
     def __init__(self, skeleton, cyclefinder):
         if (type(skeleton)!=ColoredDigraph):
             raise ValueError
         else:
             self.graph = skeleton
-        if (type(cyclefinder)!=CycleFinder):
+        if (not isinstance(cyclefinder, CycleFinder)):
             raise ValueError
         else:
             self.cyclefinder = cyclefinder
-        # find cycle intersections
-        self._intersections = set()
-        self._adj = [set() for c in range(self.C())]
-        for c in range(self.C()):
-            for v in self.cyclefinder.cycles[c]:
-                for d in self.cyclefinder[v]:
-                    if (c != d):
-                        self._adj[c].add((d,v))
-                        self._adj[d].add((c,v))
-                        self._intersections.add((min([c,d]),max([c,d])))
-        # find components in the cycle intersection graph
-        self._CC = CC(self._intersections, vertices=range(self.C()))
-        self._chains, self._connectivity = self._CC.components()
-        # initialize the intersection vector
-        self._loaded = []
-        self._intersection_vector = [0 for _ in self.graph.vertices()]
+
+    def _neighbors(self, c):
+        """
+        :param c: the index of a cycle.
+        :return: the bitset of the cycles that intersect `c`.
+        """
+        bits = 0
+        for v in self.cyclefinder.cycles[c]:
+            bits |= self.cyclefinder.tau(v)
+        return bits & ~(1 << c)
 
     def C(self):
         """
         :return: count cycles in `self.graph`.
         """
-        return len(self.cyclefinder.cycles)
+        return self.cyclefinder.C()
 
     def I(self):
         """
         :return: count pairs of intersecting cycles.
         """
-        return sum([len(self._adj(c))
-                    for c in range(self.C())]) // 2
+        self.C()
+        return sum([bin(self._neighbors(c)).count('1')
+                    for c in list(self.cyclefinder.cycles)]) // 2
 
     def intersect(self, c, restrict=None):
         """
-        :param c: the index of a cycle, between 0 and `self.C()`-1.
+        :param c: the index of a cycle.
         :param restrict: a map from vertices to
         boolean values, use to omit vertices from
         the intersection.
@@ -86,31 +561,21 @@ class CycleIntersection:
         """
         if (restrict==None):
             restrict = lambda v: True
-        return list(set(d for d,v in self._adj[c] if (not restrict(v))))
-
-    def _set_vector(self, X):
-        self._loaded = X
-        for x in self._loaded:
-            self._intersection_vector[x] += 1
-
-    def _reset_vector(self):
-        for x in self._loaded:
-            self._intersection_vector[x] -= 1
-        self._loaded = []
-
-    def _filter_by_vector(self, X):
-        return [x for x in X
-                if self._intersection_vector[x] > 0]
+        bits = 0
+        for v in self.cyclefinder.cycles[c]:
+            if (not restrict(v)):
+                bits |= self.cyclefinder.tau(v)
+        return list(set_bits(bits & ~(1 << c)))
 
     def intersect_vertices(self, c, d):
         """
-        :param c: the index of a cycle, between 0 and `self.C()`-1.
-        :param d: ""                                            "".
+        :param c: the index of a cycle.
+        :param d: ""                 "".
         :return: iterable, vertices shared between cycles `c` and `d`.
         """
-        self._reset_vector()
-        self._set_vector(self.cyclefinder.cycles[c])
-        return self._filter_by_vector(self.cyclefinder.cycles[d])
+        shared = self.cyclefinder.bits(c) & self.cyclefinder.bits(d)
+        return [v for v in self.cyclefinder.cycles[d]
+                if ((shared >> v) & 1)]
 
     def component(self, v, c):
         """
@@ -119,17 +584,16 @@ class CycleIntersection:
         :return: iterable, cycles traversed by the largest return path of `v`
         at `c`.
         """
-        # find all cycles connected to `c`.
-        chain = self._chains[self._connectivity[c]]
-        # restrict the chain to `c` and all cycles not including `v`.
-        filtered_chain = [0 for _ in range(self.C())]
-        filtered_chain[c] = 1
-        for d in chain:
-            self._reset_vector()
-            self._set_vector(self.cyclefinder.cycles[d])
-            if (self._intersection_vector[v] == 0):
-                filtered_chain[d] = 1
-        # recompute the component rooted at `c`
-        in_path = lambda d: filtered_chain[d]
-        restr_CC, restr_connectivity = self._CC.components(filter=in_path)
-        return restr_CC[restr_connectivity[c]]
+        # grow the component rooted at `c` through the cycles of its chain
+        # that do not include `v`, one breadth first layer at a time.
+        allowed = ~self.cyclefinder.tau(v) | (1 << c)
+        component = [c]
+        visited = frontier = (1 << c)
+        while frontier:
+            reached = 0
+            for d in set_bits(frontier):
+                reached |= self._neighbors(d)
+            frontier = reached & allowed & ~visited
+            visited |= frontier
+            component.extend(set_bits(frontier))
+        return component
@@ -0,0 +1,99 @@
+from collections import defaultdict
+
+class DegreeIndex:
+    """
+    an index of the vertices of a ColoredDigraph by degree signature: the
+    tuple (in-degree, out-degree, loop count), over every color. a loop counts
+    once toward each degree.
+    """
+
+    def __init__(self, skeleton, incremental=False):
+        """
+        :param skeleton: a ColoredDigraph object.
+        :param incremental: if True, subscribe to `skeleton` and keep the index
+        current as vertices and edges are added or removed. each mutation is
+        accounted for in constant time.
+        """
+        self.graph = skeleton
+        # the signature of each vertex, as a list [in, out, loops]
+        self._degrees = dict()
+        # signature -> the set of vertices with that signature
+        self._index = defaultdict(set)
+        for v in self.graph.vertices():
+            self._degrees[v] = self._count(v)
+            self._index[tuple(self._degrees[v])].add(v)
+        self.incremental = incremental
+        if (self.incremental):
+            self.graph.subscribe(self._update)
+
+    def detach(self):
+        """
+        stops tracking changes to `self.graph`.
+        """
+        if (self.incremental):
+            self.graph.unsubscribe(self._update)
+            self.incremental = False
+
+    def _count(self, v):
+        """
+        :param v: a vertex
+        :return: the signature of `v`, as a list, read from the raw adjacency
+        lists of the graph.
+        """
+        degrees = [0, 0, 0]
+        for color in self.graph.colors():
+            for w in self.graph._adj[color][v]:
+                if (w >= 0):
+                    degrees[1] += 1
+                    if (w == v):
+                        degrees[2] += 1
+                else:
+                    degrees[0] += 1
+        return degrees
+
+    def key(self, v):
+        """
+        :param v: a vertex
+        :return: the signature (in-degree, out-degree, loop count) of `v`.
+        """
+        return tuple(self._degrees[v])
+
+    def __getitem__(self, key):
+        """
+        :param key: a signature (in-degree, out-degree, loop count)
+        :return: the vertices with that signature, in the order of
+        `self.graph.vertices()`.
+        """
+        members = self._index.get(key, ())
+        return sorted(members, key=self.graph._index.__getitem__)
+
+    def _move(self, v, d_in, d_out, d_loops):
+        """
+        shifts the signature of a vertex, and rebuckets it.
+        """
+        degrees = self._degrees[v]
+        self._index[tuple(degrees)].discard(v)
+        degrees[0] += d_in
+        degrees[1] += d_out
+        degrees[2] += d_loops
+        self._index[tuple(degrees)].add(v)
+
+    def _update(self, event, *args):
+        """
+        applies a mutation of `self.graph` to the index.
+        :param event: a mutation, as given by `ColoredDigraph.subscribe`.
+        """
+        if (event == 'add_vertex'):
+            v = args[0]
+            self._degrees[v] = [0, 0, 0]
+            self._index[(0, 0, 0)].add(v)
+        elif (event == 'del_vertex'):
+            v = args[0]
+            self._index[tuple(self._degrees.pop(v))].discard(v)
+        else:
+            v, w = args[:2]
+            sign = (1 if (event == 'add_edge') else -1)
+            loop = (1 if (v == w) else 0)
+            self._move(v, loop*sign, sign, loop*sign)
+            if (not loop):
+                self._move(w, sign, 0, 0)
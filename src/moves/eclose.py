@@ -5,6 +5,12 @@ from itertools import chain
 class Eclose(CuntzSplice):
     # move (P)
 
+    # a vertex is viable by the cycles of its out-neighbors
+    radius = 1
+    # the splices at the out-neighbors of `u` add return paths to the vertices
+    # reaching them
+    local = False
+
     def condition_P(self, v):
         """
         :param v: a vertex
@@ -46,6 +52,13 @@ class Eclose(CuntzSplice):
         return [v for v in self.graph.vertices()
                 if self._viable(v)]
 
+    def _secondary_check_at(self, v):
+        """
+        :param v: a vertex
+        :return: `v`, if it is viable.
+        """
+        return ([v] if self._viable(v) else [])
+
     def _action(self, component):
         """
         :param component: a vertex
@@ -65,13 +78,25 @@ class Eclose(CuntzSplice):
                 graph.add_edge(w2,w1,color=0)
                 graph.add_edge(w2,w2,color=0)
                 # eclose the cycle at `u`
-                graph.add_edge(w2,u,color=0)
-                graph.add_edge(w2,u,color=0)
+                graph.add_edge(u,w2,color=0)
+                graph.add_edge(u,w2,color=0)
             return graph, u
         return _eclose
 
 class EcloseInverse(CuntzSpliceInverse):
 
+    # a bin is labeled by the entrance of its motifs, one step before `v`
+    radius = 3
+    # the signature of `v`, per c1: a loop, a 2-cycle and two entrances
+    motif_key = (4, 2, 1)
+
+    def __init__(self, skeleton, cyclefinder=None, cycleintersection=None,
+                 in_place=False, incremental=False, lazy=False,
+                 degreeindex=None, processes=None):
+        self._bins = dict()
+        super().__init__(skeleton, cyclefinder, cycleintersection,
+                         in_place, incremental, lazy, degreeindex, processes)
+
     def condition_P(self, v, omit):
         """
         :param v: a vertex
@@ -83,9 +108,7 @@ class EcloseInverse(CuntzSpliceInverse):
         nb_outgoing = len(outgoing_v)
         loops_at_v = [w for w in outgoing_v if w == v]
         nb_loops = len(loops_at_v)
-        cycles_at_v = [c for c in self.cyclefinder[v]
-                       if all((not (c in self.cyclefinder[o]))
-                              for o in omit)]
+        cycles_at_v = self.cyclefinder.avoiding(v, omit)
         nb_cycles = len(cycles_at_v)
         return ((nb_loops == 1) and             # supports a loop
                 (nb_cycles == nb_loops) and     # and no other return path,
@@ -97,19 +120,19 @@ class EcloseInverse(CuntzSpliceInverse):
         :param x: a vertex
         :param out_adj_x: vertices connected to x by outgoing edges
         :param in_adj_x: vertices connected to x by incoming edges
-        :return: boolean, true if x supports a loop, a 2-cycle, and an exit.
+        :return: boolean, true if x supports a loop, a 2-cycle, and two edges
+        from another vertex.
         """
-        # indegree = outdegree
-        if ((len(out_adj_x) == 4) and (len(in_adj_x) == 2)):
-            if x in out_adj_x:
-                i = out_adj_x.index(x)
+        if ((len(in_adj_x) == 4) and (len(out_adj_x) == 2)):
+            if x in in_adj_x:
+                i = in_adj_x.index(x)
             else:
                 i = -1
             # has a loop
-            if ((i >= 0) and (x in in_adj_x)):
-                z1 = out_adj_x[i-1]
-                z2 = out_adj_x[i-2]
-                z3 = out_adj_x[i-3]
+            if ((i >= 0) and (x in out_adj_x)):
+                z1 = in_adj_x[i-1]
+                z2 = in_adj_x[i-2]
+                z3 = in_adj_x[i-3]
                 if ((z1 == z2) and (z3 != z2)):
                     y = z3
                     u = z1
@@ -121,10 +144,10 @@ class EcloseInverse(CuntzSpliceInverse):
                     u = z2
                 else:
                     return False
-                # has a 2-cycle with y and an exit to elsewhere
+                # has a 2-cycle with y and two edges from elsewhere
                 return ((y!=x) and (y!=u) and
-                        (y in in_adj_x) and
-                        (not (u in in_adj_x)))
+                        (y in out_adj_x) and
+                        (not (u in out_adj_x)))
             else:
                 return False
         else:
@@ -134,7 +157,7 @@ class EcloseInverse(CuntzSpliceInverse):
         """
         tries to find a (P)-motif, a tuple of vertices (u,w,v) such that
          (i)    v has a self loop, two more edges going to and from a vertex w,
-                and two outgoing edges to z.
+                and two incoming edges from z.
          (ii)   w has a self loop, two edges going to and from v, and two
                 verties going to and from a vertex u.
          (iii)  u has at least two return paths that do not traverse v or w.
@@ -145,9 +168,9 @@ class EcloseInverse(CuntzSpliceInverse):
         # condition (i)
         #print(f"searching for a (P)-motif at {v} with adj {out_adj_v}, {in_adj_v}")
         if self.c1(v, out_adj_v, in_adj_v):
-            w = next(x for x in in_adj_v
+            w = next(x for x in out_adj_v
                      if (x!=v))
-            z = next(x for x in out_adj_v
+            z = next(x for x in in_adj_v
                      if ((x!=v) and (x!=w)))
             out_adj_w, in_adj_w = self.graph.adj(w)
             # condition (ii)
@@ -170,6 +193,9 @@ class EcloseInverse(CuntzSpliceInverse):
         """
         if (self.graph.is_vertex(component)):
             u = component
+            if (u not in self._bins):
+                # e.g. a lazy move, whose bins have not been filled
+                self._secondary_check_at(u)
             if (u in self._bins):
                 v2 = list(chain(m[2] for m in self._bins[u]))
                 return self.condition_P(u, omit=v2)
@@ -181,13 +207,13 @@ class EcloseInverse(CuntzSpliceInverse):
     def _secondary_check(self):
         """
         determines if there are any legal moves on the graph. every (P)-motif
-        is identified and bucket sorted by its exit vertex.
+        is identified and bucket sorted by its eclosed vertex.
         :return: list of vertices corresponding to the keys of `self._bins`.
         """
         self._bins = dict()
         motifs = []
         # first pass - find the motifs and construct the bins
-        for v in self.graph.vertices():
+        for v in self._candidates():
             #print("checking vertex",v)
             motif_at_v = self.motif(v)
             if (len(motif_at_v) == 4):
@@ -210,12 +236,49 @@ class EcloseInverse(CuntzSpliceInverse):
         #print("keys:", keys)
         return keys
 
+    def _secondary_check_at(self, u):
+        """
+        finds the (P)-motifs entered from a vertex, and keeps their bin.
+        :param u: a vertex
+        :return: `u`, if it labels a bin that satisfies condition (P).
+        """
+        motifs = []
+        for v in set(self.graph.adj(u)[0]):
+            if (not self._candidate(v)):
+                continue
+            motif_at_v = self.motif(v)
+            if ((len(motif_at_v) == 4) and (motif_at_v[3] == u)):
+                motifs.append(motif_at_v)
+        if (len(motifs) == 0):
+            self._bins.pop(u, None)
+            return []
+        self._bins[u] = motifs
+        v2 = list(chain(m[2] for m in motifs))
+        return ([u] if self.condition_P(u,omit=v2) else [])
+
+    def _anchors(self, component):
+        """
+        :param component: a vertex
+        :return: the vertex; its motifs lie within `radius`.
+        """
+        return [component]
+
+    def _recheck(self, component):
+        """
+        finds the motifs of the bin again, since they may have changed.
+        :param component: a vertex
+        :return: boolean, True iff the vertex is still viable.
+        """
+        return (component in self._check_at(component))
+
     def _action(self, component):
         """
         :param component: a vertex that has been eclosed.
         :return: a function which inverse ecloses a graph at the component.
         """
         def _ecloseinverse(graph, component=component):
+            if (component not in self._bins):
+                self._secondary_check_at(component)
             motifs = self._bins[component]
             for m in motifs:
                 _, v1, v2, u = m
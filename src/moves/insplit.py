@@ -1,8 +1,14 @@
 from .k1move import K1Move
 
+from itertools import chain
+from collections import defaultdict
+
 class Insplit(K1Move):
     # move (I)
 
+    shardable = True
+    vectorizable = True
+
     def splittable(self, v):
         """
         :param v: a vertex
@@ -35,20 +41,69 @@ class Insplit(K1Move):
         incoming edge sets. this list is sufficient, as all other partitions
         can be constructed by shuffling around the arbitrary partition.
         """
-        components = []
-        for v in self.graph.vertices():
-            if self.splittable(v):
-                E1, E2 = set(), set()
-                x = next(w for w in self.graph.adj(v)[1] if (w != v))
-                # the w!=v condition isn't strictly necessary, but since these
-                # partitions are arbitrary anways, i want them to look nice.
-                for w in self.graph.adj(v)[1]:
-                    if (w == x):
-                        E1.add(w)
-                    else:
-                        E2.add(w)
-                components.append((v,E1,E2))
-        return components
+        return list(chain(*[self._secondary_check_at(v)
+                            for v in self.graph.vertices()]))
+
+    def _vectorized_check(self):
+        """
+        :return: list of splittable vertices, found on `self.snapshot`, with
+        arbitrary partitions of their incoming edge sets.
+        """
+        splittable = self.snapshot.select(self.snapshot.splittable(True))
+        return list(chain(*[self._secondary_check_at(v)
+                            for v in splittable]))
+
+    def _secondary_check_at(self, v):
+        """
+        :param v: a vertex
+        :return: `v` with an arbitrary partition of its incoming edge set, if it
+        is splittable.
+        """
+        if self.splittable(v):
+            E1, E2 = set(), set()
+            x = next(w for w in self.graph.adj(v)[1] if (w != v))
+            # the w!=v condition isn't strictly necessary, but since these
+            # partitions are arbitrary anways, i want them to look nice.
+            for w in self.graph.adj(v)[1]:
+                if (w == x):
+                    E1.add(w)
+                else:
+                    E2.add(w)
+            return [(v,E1,E2)]
+        return []
+
+    def partitions(self, v):
+        """
+        enumerates, lazily, every partition of the incoming edge set of a vertex
+        into two nonempty parts. as in `_viable`, a part is a set of neighbors,
+        so parallel edges always fall in the same part and are never permuted.
+        a partition and its swap give the same graph, so only the one with the
+        least in-neighbor in E1 is produced.
+        :param v: a vertex
+        :return: a generator of components (v,E1,E2), empty if `v` is not
+        splittable.
+        """
+        if (not self.splittable(v)):
+            return
+        first, *rest = sorted(set(self.graph.adj(v)[1]))
+        # bit i of `mask` puts rest[i] in E1. every neighbor in E1 would leave
+        # E2 empty, so the last mask is skipped.
+        for mask in range((1 << len(rest)) - 1):
+            E1, E2 = set([first]), set()
+            for j, w in enumerate(rest):
+                if ((mask >> j) & 1):
+                    E1.add(w)
+                else:
+                    E2.add(w)
+            yield (v,E1,E2)
+
+    def _anchors(self, component):
+        """
+        :param component: a splittable vertex, and a partition of its incoming
+        edges.
+        :return: the vertex.
+        """
+        return [component[0]]
 
     def _action(self, component):
         """
@@ -74,8 +129,9 @@ class Insplit(K1Move):
             # add new incoming edges - eponymously, split the old incoming edges.
             for w in adj_in:
                 if (w == v):
-                    w = (v1 if (w in E1) else v2)
-                    x = (v2 if (w in E1) else v1)
+                    # the copy the loop is assigned to, and the other copy
+                    w = (v1 if (v in E1) else v2)
+                    x = (v2 if (w == v1) else v1)
                     graph.add_edge(x,w,color=0)
                     if (v in E1):
                         graph.add_edge(w,v1,color=0)
@@ -96,10 +152,14 @@ class Insplit(K1Move):
 
 class InsplitInverse(K1Move):
 
-    def __init__(self, skeleton):
-        self._out_adj_table = dict((v,0) for v in skeleton.vertices())
-        self._in_adj_table = dict((v,0) for v in skeleton.vertices())
-        super().__init__(skeleton)
+    # a pair is found from the in-neighbors of its vertices' out-neighbors
+    radius = 2
+
+    def __init__(self, skeleton, in_place=False, incremental=False,
+                 lazy=False, processes=None):
+        self._out_adj_table = defaultdict(int)
+        self._in_adj_table = defaultdict(int)
+        super().__init__(skeleton, in_place, incremental, lazy, processes)
 
     def split(self,v,w):
         """
@@ -111,13 +171,14 @@ class InsplitInverse(K1Move):
         :param w: one or more vertices
         :return: every vertex w such that (v,w) satisfies (i)-(iii).
         """
-        def c1(X, arr, omit):
+        def c1(X, arr):
             val = True
+            # an empty vector consumes nothing, and matches an empty table
+            if (len(X) == 0):
+                return val
             # consume the adjacency vector
             for i in range(len(X)):
                 x = X[i]
-                if (x==omit):
-                    continue
                 arr[x] -= 1
                 if (arr[x] < 0):
                     val = False
@@ -153,7 +214,7 @@ class InsplitInverse(K1Move):
                 and (len(out_adj_v) == len(out_adj_w))):
                 #print("\t\tpassed (iii)")
                 # apply conditions (i) and (ii)
-                if (not c1(out_adj_w, self._out_adj_table, v)):
+                if (not c1(out_adj_w, self._out_adj_table)):
                     #print("\t\tfailed on (i)")
                     continue
                 elif c2(in_adj_w, self._in_adj_table, v):
@@ -182,40 +243,65 @@ class InsplitInverse(K1Move):
         else:
             raise ValueError("expected a pair of vertices")
 
+    def signature(self, v):
+        """
+        :param v: a vertex
+        :return: the sorted multiset of out-neighbors of `v`. by condition (i),
+        the vertices of a pair have the same signature.
+        """
+        return tuple(sorted(self.graph.adj(v)[0]))
+
     def _secondary_check(self):
         """
-        determines if there are any legal moves on the graph.
+        determines if there are any legal moves on the graph. vertices are
+        bucketed by signature, and only pairs within a bucket are checked.
         :return: list of vertex pairs that have been split.
         """
-        pairs = set()
-        adj_table = dict((v,0) for v in self.graph.vertices())
-        #print("="*100)
-        #print("INSPLIT INVERSE SECONDARY CHECK")
+        buckets = defaultdict(list)
         for v in self.graph.vertices():
-            #print("checking candidates at", v)
-            out_adj = self.graph.adj(v)[0]
-            #print("\tout adj:", out_adj, len(out_adj))
-            # first pass - each out-neighbor votes to keep their in-neighbors
-            for x in out_adj:
-                for z in self.graph.adj(x)[1]:
-                    adj_table[z] += 1
-            #print("\tadj table", adj_table)
-            # second pass - filter each vertex that doesn't have 100% vote
-            candidates = set()
-            for x in out_adj:
-                candidates.update([z for z in self.graph.adj(x)[1]
-                                   if ((z != v) and
-                                       (adj_table[z] == len(out_adj)))])
-            for x in out_adj:
-                for z in self.graph.adj(x)[1]:
-                    adj_table[z] -= 1
-            #print("\tcandidates", candidates)
-            # find viable pairs
-            pairs.update([(min(v,w),max(v,w))
-                          for w in self.split(v,candidates)
-                          if self._viable((min(v,w),max(v,w)))])
-        #print("="*100)
-        return list(pairs)
+            key = self.signature(v)
+            # pairs are found through a common out-neighbor
+            if (len(key) > 0):
+                buckets[key].append(v)
+        pairs = []
+        for bucket in buckets.values():
+            bucket.sort()
+            for n, v in enumerate(bucket[:-1]):
+                pairs.extend((v,w) for w in sorted(self.split(v,bucket[n+1:])))
+        return pairs
+
+    def _secondary_check_at(self, v):
+        """
+        :param v: a vertex
+        :return: list of vertex pairs, containing `v`, that have been split.
+        """
+        key = self.signature(v)
+        if (len(key) == 0):
+            return []
+        # the bucket of `v` lies among the in-neighbors of any of its
+        # out-neighbors, so take the one with the fewest.
+        x = min(set(key), key=lambda x: len(self.graph.adj(x)[1]))
+        bucket = set(w for w in self.graph.adj(x)[1]
+                     if ((w != v) and (self.signature(w) == key)))
+        return [(min(v,w),max(v,w)) for w in bucket
+                if self._viable((min(v,w),max(v,w)))]
+
+    def _gather(self):
+        """
+        :return: the viable pairs anchored at every vertex, each pair once.
+        """
+        return list(set(chain(*[self._anchored[v]
+                                for v in self.graph.vertices()])))
+
+    def _iter_check(self):
+        """
+        :return: a generator of the viable pairs, each pair once.
+        """
+        pairs = set()
+        for pair in super()._iter_check():
+            if (pair not in pairs):
+                pairs.add(pair)
+                yield pair
 
     def _action(self, component):
         """
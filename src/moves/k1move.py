@@ -11,6 +11,10 @@ class K1Move(Move):
         """
         if (self.graph.k() != 1):
             return []
+        elif ((self.snapshot != None) and self.vectorizable):
+            return self._vectorized_check()
+        elif (self._sharded()):
+            return self._sharded_check()
         else:
             return self._secondary_check()
 
@@ -21,3 +25,20 @@ class K1Move(Move):
         :return: a list that is non-empty when there are viable subgraphs.
         """
         raise NotImplementedError()
+
+    def _check_at(self, v):
+        """
+        preliminary check against higher-rank graphs.
+        """
+        if (self.graph.k() != 1):
+            return []
+        else:
+            return self._secondary_check_at(v)
+
+    def _secondary_check_at(self, v):
+        """
+        the local counterpart of `_secondary_check`.
+        :param v: a vertex
+        :return: the viable components anchored at `v`.
+        """
+        raise NotImplementedError()
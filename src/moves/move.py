@@ -1,16 +1,178 @@
 from copy import copy
+from itertools import chain
+from multiprocessing import Pool
 
 class Move:
     """
     base class for a k-graph rewriting system
     """
-    def __init__(self, skeleton, in_place=False):
+    # the distance, along edges of either direction, within which a change to
+    # the graph can affect the components anchored at a vertex. see `_check_at`.
+    radius = 0
+    # True when viability depends only on the graph within `radius`, so that
+    # components far enough apart cannot invalidate each other.
+    local = True
+    # True when `_check` lists the components of `_check_at` at each vertex,
+    # in order, so that the vertices can be checked in separate processes.
+    shardable = False
+    # graphs with fewer vertices are checked in-process, even when a pool of
+    # processes is available
+    parallel_threshold = 1024
+    # True when `_vectorized_check` computes `_check` from a CSRSnapshot
+    vectorizable = False
+
+    def __init__(self, skeleton, in_place=False, incremental=False,
+                 lazy=False, processes=None, snapshot=None):
         """
         :param skeleton: a ColoredDigraph object.
+        :param in_place: if True, operators mutate the graph they are given.
+        otherwise they act on a `fork` of it, which shares every adjacency list
+        the move leaves untouched.
+        :param incremental: if True, subscribe to `skeleton` and keep `viable`
+        current as the graph is mutated. each mutation marks the vertices
+        within `radius` of it, and only those are checked again, the next time
+        `viable` is read. requires `_check_at`.
+        :param lazy: if True, defer `_check` until `viable` is first read, so
+        that `iter_viable` and `any_viable` can stop at the first viable
+        component. ignored by incremental moves.
+        :param processes: optional, the number of worker processes across which
+        a `shardable` move splits `_check` on large graphs.
+        :param snapshot: optional, a current CSRSnapshot of `skeleton`, with
+        which a `vectorizable` move checks every vertex at once.
         """
+        if ((snapshot != None) and (snapshot.graph is not skeleton)):
+            raise ValueError("the snapshot belongs to another graph")
         self.graph = skeleton
-        self.viable = self._check()
-        self.active = (len(self.viable) > 0)
+        self.in_place = in_place
+        self.processes = processes
+        self.snapshot = snapshot
+        self.incremental = incremental
+        self._touched = set()
+        if (self.incremental):
+            self._anchored = dict((v,self._check_at(v))
+                                  for v in self.graph.vertices())
+            self._viable_components = self._gather()
+            self.graph.subscribe(self._update)
+        elif (lazy):
+            self._viable_components = None
+        else:
+            self._viable_components = self._check()
+
+    @property
+    def viable(self):
+        """
+        :return: a list of viable components.
+        """
+        if (self.incremental):
+            self._refresh()
+        elif (self._viable_components == None):
+            self._viable_components = self._check()
+        return self._viable_components
+
+    @property
+    def active(self):
+        """
+        :return: boolean, True iff there are viable components.
+        """
+        return self.any_viable()
+
+    def iter_viable(self):
+        """
+        enumerates the viable components on demand. a lazy move checks one
+        vertex at a time, so stopping early skips the rest of the graph.
+        :return: a generator of viable components.
+        """
+        if (self.incremental or (self._viable_components != None)):
+            for component in self.viable:
+                yield component
+        else:
+            for component in self._iter_check():
+                yield component
+
+    def any_viable(self):
+        """
+        :return: boolean, True iff there are viable components. a lazy move
+        stops at the first one.
+        """
+        for _ in self.iter_viable():
+            return True
+        return False
+
+    def _iter_check(self):
+        """
+        :return: a generator of the viable components anchored at each vertex,
+        in turn. see `_check_at`.
+        """
+        for v in list(self.graph.vertices()):
+            for component in self._check_at(v):
+                yield component
+
+    def detach(self):
+        """
+        stops tracking changes to `self.graph`; `viable` is left as it stands.
+        """
+        if (self.incremental):
+            self._refresh()
+            self.graph.unsubscribe(self._update)
+            self.incremental = False
+
+    def _update(self, event, *args):
+        """
+        marks the vertices near a mutation of `self.graph`.
+        :param event: a mutation, as given by `ColoredDigraph.subscribe`.
+        """
+        if (event in ('add_vertex', 'del_vertex')):
+            self._touch(args[:1])
+        else:
+            self._touch(args[:2])
+
+    def _touch(self, vertices):
+        """
+        marks every vertex within `radius` of `vertices` to be checked again.
+        :param vertices: iterable of vertices
+        """
+        self._touched.update(self._ball(vertices, self.radius))
+
+    def _ball(self, vertices, radius):
+        """
+        :param vertices: iterable of vertices
+        :param radius: a distance, along edges of either direction.
+        :return: the set of vertices within `radius` of `vertices`.
+        """
+        ball = set(vertices)
+        frontier = [v for v in ball if self.graph.is_vertex(v)]
+        for _ in range(radius):
+            layer = []
+            for v in frontier:
+                for w in self.graph.adj(v, symmetric=True):
+                    if (w not in ball):
+                        ball.add(w)
+                        layer.append(w)
+            frontier = layer
+        return ball
+
+    def _refresh(self):
+        """
+        checks the marked vertices again, and gathers the viable components.
+        """
+        if (len(self._touched) > 0):
+            # checking a vertex may mark others, e.g. by finding cycles.
+            while (len(self._touched) > 0):
+                touched = self._touched
+                self._touched = set()
+                for v in touched:
+                    if self.graph.is_vertex(v):
+                        self._anchored[v] = self._check_at(v)
+                    else:
+                        self._anchored.pop(v, None)
+            self._viable_components = self._gather()
+
+    def _gather(self):
+        """
+        :return: the viable components anchored at every vertex.
+        """
+        return list(chain(*[self._anchored[v]
+                            for v in self.graph.vertices()]))
 
     def _viable(self, component):
         """
@@ -28,6 +190,52 @@ class Move:
         """
         raise NotImplementedError()
 
+    def _vectorized_check(self):
+        """
+        the counterpart of `_check` on `self.snapshot`.
+        :return: the list of viable components.
+        """
+        raise NotImplementedError()
+
+    def _sharded(self):
+        """
+        :return: boolean, True iff `_check` should be split across processes.
+        """
+        return (self.shardable and (self.processes != None) and
+                (self.graph.V() >= self.parallel_threshold))
+
+    def _prepare_shards(self):
+        """
+        completes any state that the workers would otherwise each compute, before
+        the move is copied to them.
+        """
+        pass
+
+    def _sharded_check(self):
+        """
+        the counterpart of `_check` for a pool of processes. the vertices are
+        split into contiguous shards, checked with `_check_at` by workers that
+        share one snapshot of the move, and the results are merged in order.
+        :return: the list of viable components.
+        """
+        self._prepare_shards()
+        vertices = list(self.graph.vertices())
+        # a few shards per process, to even out their costs
+        size = max(1, -(-len(vertices) // (4*self.processes)))
+        shards = [vertices[i:i+size] for i in range(0, len(vertices), size)]
+        with Pool(self.processes, initializer=_init_worker,
+                  initargs=(self,)) as pool:
+            return list(chain(*pool.map(_check_task, shards)))
+
+    def _check_at(self, v):
+        """
+        the local counterpart of `_check`, used to keep `viable` current.
+        :param v: a vertex
+        :return: the viable components anchored at `v`. they may depend only on
+        the graph within `radius` of `v`.
+        """
+        raise NotImplementedError()
+
     def _action(self, component):
         """
         performs an action on the graph, with respect to certain properties of
@@ -37,15 +245,126 @@ class Move:
         """
         raise NotImplementedError()
 
+    def _anchors(self, component):
+        """
+        :param component: a viable component
+        :return: the vertices the component is anchored at.
+        """
+        if (type(component) == int):
+            return [component]
+        else:
+            return list(component)
+
+    @classmethod
+    def _relabel(cls, component, mapping):
+        """
+        :param component: a component
+        :param mapping: a dictionary of vertex labels
+        :return: the component, with every vertex mapped by `mapping`.
+        """
+        if (type(component) == int):
+            return mapping[component]
+        else:
+            return type(component)(cls._relabel(x, mapping)
+                                   for x in component)
+
+    def _current(self, graph):
+        """
+        :param graph: a graph the move is being applied to.
+        :return: boolean, True iff viability can still be decided on `graph`.
+        """
+        return (graph is self.graph)
+
+    def _recheck(self, component):
+        """
+        decides viability again, after the graph has been mutated.
+        :param component: a component
+        :return: boolean, True iff the component is still viable.
+        """
+        return self._viable(component)
+
+    def _checker(self, graph):
+        """
+        :param graph: a graph the move is being applied to, other than
+        `self.graph`.
+        :return: a lazy move on `graph` that stays current as it is mutated,
+        with which a non-local move checks its components again; or None,
+        when there is no such move.
+        """
+        return None
+
+    def apply_many(self, graph, components):
+        """
+        performs the move at many components in one pass. components are taken
+        greedily, in order, when they are viable and their neighborhoods, of
+        radius `radius` (at least 1), are disjoint from those already taken; so
+        none can invalidate another. a non-local move must check each component
+        again before it is applied: on `self.graph` when it can, otherwise with
+        a `_checker` on the graph acted on. without either, a single component
+        is applied.
+        :param graph: the graph to act on, like the argument of an operator.
+        :param components: candidate components, in order of preference.
+        :return: the graph, and the list of inverse components.
+        """
+        if (self.incremental):
+            self._refresh()
+        claimed = set()
+        selected = []
+        for component in components:
+            if (self._viable(component)):
+                ball = self._ball(self._anchors(component),
+                                  max(self.radius, 1))
+                if (claimed.isdisjoint(ball)):
+                    claimed.update(ball)
+                    selected.append(component)
+        if (not self.in_place):
+            graph = graph.fork()
+        inverse_components = []
+        # the move that checks and applies each component
+        checker = self
+        for i, component in enumerate(selected):
+            if ((i > 0) and (not self.local)):
+                if (not checker._current(graph)):
+                    replacement = self._checker(graph)
+                    if (replacement == None):
+                        break
+                    checker = replacement
+                if (not checker._recheck(component)):
+                    continue
+            graph, inverse_component = checker._action(component)(graph)
+            inverse_components.append(inverse_component)
+        if (checker is not self):
+            checker.detach()
+        return graph, inverse_components
+
     def __call__(self, component):
         """
         performs the move if `component` is viable, and if the object is active.
         :param component: the subgraph on which the move is performed. must be
         viable, as defined by the implementation.
         :return: a function which performs the move to a graph, according to
-        the component.
+        the component. see `in_place`.
         """
+        if (self.incremental):
+            self._refresh()
         if (self._viable(component)):
-            return self._action(component)
+            action = self._action(component)
+            if (self.in_place):
+                return action
+            else:
+                def _forked(graph):
+                    return action(graph.fork())
+                return _forked
         else:
             raise ValueError("received a non-viable component.")
+
+_worker_move = None
+
+def _init_worker(move):
+    # share the snapshot of a move with a worker process once, not per shard
+    global _worker_move
+    _worker_move = move
+
+def _check_task(shard):
+    # the viable components anchored at each vertex of a shard, in order
+    return list(chain(*[_worker_move._check_at(v) for v in shard]))
@@ -0,0 +1,131 @@
+from .sinkdelete import SinkDelete
+from .reduction import Reduction
+from .insplit import InsplitInverse
+from .outsplit import OutsplitInverse
+from .cuntzsplice import CuntzSplice, CuntzSpliceInverse
+from .eclose import EcloseInverse
+from .cycles_interface import CycleFinder, CycleIntersection
+from .degree_index import DegreeIndex
+
+from collections import deque
+from time import time
+
+# the size-decreasing moves, cheapest first: (S), (R), (I)^{-1}, (O)^{-1},
+# (C)^{-1} and (P)^{-1}.
+REDUCING_MOVES = (SinkDelete, Reduction, InsplitInverse, OutsplitInverse,
+                  CuntzSpliceInverse, EcloseInverse)
+
+def reduce(skeleton, moves=REDUCING_MOVES, in_place=False, checkpoint=None,
+           interval=60):
+    """
+    applies size-decreasing moves until none is viable. every vertex starts on
+    a worklist for each move; a vertex is checked with `_check_at`, and each
+    mutation puts back only the vertices within `radius` of it. so iterated
+    sink deletion, say, runs in linear total time. the worklists are drained
+    in the order of `moves`, so cheap moves run before expensive ones.
+    :param skeleton: a ColoredDigraph object.
+    :param moves: the move classes to apply, in order of preference. each one
+    must reduce the number of vertices, so that the reduction terminates.
+    :param in_place: if True, reduce `skeleton` itself, else a `fork` of it.
+    :param checkpoint: optional, a function (graph, steps) called at most every
+    `interval` seconds with the partly reduced graph and the steps so far,
+    e.g. to save them.
+    :param interval: seconds between calls of `checkpoint`.
+    :return: the reduced graph, and the list of steps taken, as tuples
+    (move class, component, inverse component).
+    """
+    graph = skeleton if in_place else skeleton.fork()
+
+    # the cycle and degree indices are shared by (C)^{-1} and (P)^{-1}, and
+    # kept current.
+    cyclefinder = None
+    degreeindex = None
+    if any(issubclass(move, CuntzSplice) for move in moves):
+        cyclefinder = CycleFinder(graph, incremental=True)
+        cycleintersection = CycleIntersection(graph, cyclefinder)
+    if any(issubclass(move, CuntzSpliceInverse) for move in moves):
+        degreeindex = DegreeIndex(graph, incremental=True)
+    instances = []
+    for move in moves:
+        if issubclass(move, CuntzSpliceInverse):
+            instances.append(move(graph, cyclefinder, cycleintersection,
+                                  in_place=True, lazy=True,
+                                  degreeindex=degreeindex))
+        elif issubclass(move, CuntzSplice):
+            instances.append(move(graph, cyclefinder, cycleintersection,
+                                  in_place=True, lazy=True))
+        else:
+            instances.append(move(graph, in_place=True, lazy=True))
+    radius = max([m.radius for m in instances], default=0)
+
+    # one worklist per move, without repeats.
+    worklists = [deque(graph.vertices()) for _ in instances]
+    queued = [set(graph.vertices()) for _ in instances]
+    # vertices at which the graph, or its cycles, changed since the last flush
+    seeds = set()
+
+    def _mark(event, *args):
+        if (event in ('add_vertex', 'del_vertex')):
+            seeds.update(args[:1])
+        elif (event in ('add_cycle', 'del_cycle')):
+            seeds.update(cyclefinder.cycles[args[0]])
+        else:
+            seeds.update(args[:2])
+
+    def _flush():
+        # a single breadth first search from every seed, so each vertex is
+        # visited once per flush, however many edges were changed.
+        distance = dict((v,0) for v in seeds if graph.is_vertex(v))
+        seeds.clear()
+        frontier = list(distance)
+        for d in range(radius+1):
+            for i, m in enumerate(instances):
+                if (m.radius >= d):
+                    for v in frontier:
+                        if (v not in queued[i]):
+                            queued[i].add(v)
+                            worklists[i].append(v)
+            if (d == radius):
+                break
+            layer = []
+            for v in frontier:
+                for w in graph.adj(v, symmetric=True):
+                    if (w not in distance):
+                        distance[w] = d+1
+                        layer.append(w)
+            frontier = layer
+
+    graph.subscribe(_mark)
+    if (cyclefinder != None):
+        cyclefinder.listen(_mark)
+    steps = []
+    last = time()
+    try:
+        while True:
+            _flush()
+            i = next((i for i in range(len(instances))
+                      if (len(worklists[i]) > 0)), None)
+            if (i == None):
+                break
+            v = worklists[i].popleft()
+            queued[i].discard(v)
+            if (not graph.is_vertex(v)):
+                continue
+            components = instances[i]._check_at(v)
+            if (len(components) > 0):
+                component = components[0]
+                graph, inverse_component = instances[i](component)(graph)
+                steps.append((moves[i], component, inverse_component))
+                # other components may remain at v.
+                seeds.add(v)
+                if ((checkpoint != None) and (time() - last >= interval)):
+                    checkpoint(graph, list(steps))
+                    last = time()
+    finally:
+        graph.unsubscribe(_mark)
+        if (cyclefinder != None):
+            cyclefinder.unlisten(_mark)
+            cyclefinder.detach()
+        if (degreeindex != None):
+            degreeindex.detach()
+    return graph, steps
@@ -1,15 +1,22 @@
 from .k1move import K1Move
 
+from itertools import chain
+from collections import defaultdict
+
 class Outsplit(K1Move):
     # move (O)
 
+    shardable = True
+    vectorizable = True
+
     def splittable(self, v):
         """
         :param v: a vertex
-        :return: boolean, true when v has at least two out-adjacent neighbors.
+        :return: boolean, true when v has at least two out-adjacent neighbors,
+        and an incoming edge. splitting a source would add a source.
         """
-        adj_out = self.graph.adj(v)[0]
-        return (len(set(adj_out)) >= 2)
+        adj_out, adj_in = self.graph.adj(v)
+        return ((len(set(adj_out)) >= 2) and (len(adj_in) >= 1))
 
     def _viable(self, component):
         """
@@ -35,20 +42,69 @@ class Outsplit(K1Move):
         outgoing edge sets. this list is sufficient, as all other partitions
         can be constructed by shuffling around the arbitrary partition.
         """
-        components = []
-        for v in self.graph.vertices():
-            if self.splittable(v):
-                E1, E2 = set(), set()
-                x = next(w for w in self.graph.adj(v)[0] if (w != v))
-                # the w!=v condition isn't strictly necessary, but since these
-                # partitions are arbitrary anways, i want them to look nice.
-                for w in self.graph.adj(v)[0]:
-                    if (w == x):
-                        E1.add(w)
-                    else:
-                        E2.add(w)
-                components.append((v,E1,E2))
-        return components
+        return list(chain(*[self._secondary_check_at(v)
+                            for v in self.graph.vertices()]))
+
+    def _vectorized_check(self):
+        """
+        :return: list of splittable vertices, found on `self.snapshot`, with
+        arbitrary partitions of their outgoing edge sets.
+        """
+        splittable = self.snapshot.select(self.snapshot.splittable(False))
+        return list(chain(*[self._secondary_check_at(v)
+                            for v in splittable]))
+
+    def _secondary_check_at(self, v):
+        """
+        :param v: a vertex
+        :return: `v` with an arbitrary partition of its outgoing edge set, if it
+        is splittable.
+        """
+        if self.splittable(v):
+            E1, E2 = set(), set()
+            x = next(w for w in self.graph.adj(v)[0] if (w != v))
+            # the w!=v condition isn't strictly necessary, but since these
+            # partitions are arbitrary anways, i want them to look nice.
+            for w in self.graph.adj(v)[0]:
+                if (w == x):
+                    E1.add(w)
+                else:
+                    E2.add(w)
+            return [(v,E1,E2)]
+        return []
+
+    def partitions(self, v):
+        """
+        enumerates, lazily, every partition of the outgoing edge set of a vertex
+        into two nonempty parts. as in `_viable`, a part is a set of neighbors,
+        so parallel edges always fall in the same part and are never permuted.
+        a partition and its swap give the same graph, so only the one with the
+        least out-neighbor in E1 is produced.
+        :param v: a vertex
+        :return: a generator of components (v,E1,E2), empty if `v` is not
+        splittable.
+        """
+        if (not self.splittable(v)):
+            return
+        first, *rest = sorted(set(self.graph.adj(v)[0]))
+        # bit i of `mask` puts rest[i] in E1. every neighbor in E1 would leave
+        # E2 empty, so the last mask is skipped.
+        for mask in range((1 << len(rest)) - 1):
+            E1, E2 = set([first]), set()
+            for j, w in enumerate(rest):
+                if ((mask >> j) & 1):
+                    E1.add(w)
+                else:
+                    E2.add(w)
+            yield (v,E1,E2)
+
+    def _anchors(self, component):
+        """
+        :param component: a splittable vertex, and a partition of its outgoing
+        edges.
+        :return: the vertex.
+        """
+        return [component[0]]
 
     def _action(self, component):
         """
@@ -73,8 +129,9 @@ class Outsplit(K1Move):
             # add new outgoing edges - eponymously, split the old outgoing edges.
             for w in adj_out:
                 if (w == v):
-                    w = (v1 if (w in E1) else v2)
-                    x = (v2 if (w in E1) else v1)
+                    # the copy the loop is assigned to, and the other copy
+                    w = (v1 if (v in E1) else v2)
+                    x = (v2 if (w == v1) else v1)
                     graph.add_edge(w,x,color=0)
                     if (v in E1):
                         graph.add_edge(v1,w,color=0)
@@ -94,22 +151,27 @@ class Outsplit(K1Move):
 
 class OutsplitInverse(K1Move):
 
-    def __init__(self, skeleton):
-        self._out_adj_table = dict((v,0) for v in skeleton.vertices())
-        self._in_adj_table = dict((v,0) for v in skeleton.vertices())
-        super().__init__(skeleton)
+    # a pair is found from the out-neighbors of its vertices' in-neighbors
+    radius = 2
+
+    def __init__(self, skeleton, in_place=False, incremental=False,
+                 lazy=False, processes=None):
+        self._out_adj_table = defaultdict(int)
+        self._in_adj_table = defaultdict(int)
+        super().__init__(skeleton, in_place, incremental, lazy, processes)
 
     def split(self,v,w):
         """
         checks if a pair of vertices have been (in)split:
          (i)    v and w have identical incoming edges / in-neighbours,
          (ii)   v and w have no outgoing edges / out-neighbors in common,
-         (iii)  v and w have at least one outgoing edge each.
+         (iii)  v and w have at least one outgoing edge each, and at least one
+                incoming edge.
         :param v: a vertex
         :param w: one or more vertices
         :return: every vertex w such that (v,w) satisfies (i)-(iii).
         """
-        def c1(X, arr, omit):
+        def c1(X, arr):
             val = True
             #print(f"\t\t\tchecking {X} against {arr}; are they the same?")
             # consume the adjacency vector
@@ -117,8 +179,6 @@ class OutsplitInverse(K1Move):
             for i in range(len(X)):
                 x = X[i]
                 #print(x, arr[x])
-                if (x==omit):
-                    continue
                 arr[x] -= 1
                 if (arr[x] < 0):
                     val = False
@@ -155,10 +215,10 @@ class OutsplitInverse(K1Move):
             #print(f"\tout of {v}: {out_adj_v}\n\tout of {w}: {out_adj_w}")
             # condition (iii) and a preliminary of (i)
             if ((len(out_adj_v) >= 1 and len(out_adj_w) >= 1)
-                and (len(in_adj_v) == len(in_adj_w))):
+                and (len(in_adj_v) == len(in_adj_w) >= 1)):
                 #print("\t\tpassed (iii)")
                 # apply conditions (i) and (ii)
-                if (not c1(in_adj_w, self._in_adj_table, v)):
+                if (not c1(in_adj_w, self._in_adj_table)):
                     #print("\t\tfailed on (i)")
                     continue
                 elif c2(out_adj_w, self._out_adj_table, v):
@@ -186,40 +246,65 @@ class OutsplitInverse(K1Move):
         else:
             raise ValueError("expected a pair of vertices")
 
+    def signature(self, v):
+        """
+        :param v: a vertex
+        :return: the sorted multiset of in-neighbors of `v`. by condition (i),
+        the vertices of a pair have the same signature.
+        """
+        return tuple(sorted(self.graph.adj(v)[1]))
+
     def _secondary_check(self):
         """
-        determines if there are any legal moves on the graph.
+        determines if there are any legal moves on the graph. vertices are
+        bucketed by signature, and only pairs within a bucket are checked.
         :return: list of vertex pairs that have been split.
         """
-        pairs = set()
-        adj_table = dict((v,0) for v in self.graph.vertices())
-        #print("="*100)
-        #print("OUTSPLIT INVERSE SECONDARY CHECK")
+        buckets = defaultdict(list)
         for v in self.graph.vertices():
-            #print("checking candidates at", v)
-            in_adj = self.graph.adj(v)[1]
-            #print("\tout adj:", in_adj, len(in_adj))
-            # first pass - each out-neighbor votes to keep their in-neighbors
-            for x in in_adj:
-                for z in self.graph.adj(x)[0]:
-                    adj_table[z] += 1
-            #print("\tadj table", adj_table)
-            # second pass - filter each vertex that doesn't have 100% vote
-            candidates = set()
-            for x in in_adj:
-                candidates.update([z for z in self.graph.adj(x)[0]
-                                   if ((z!= v) and
-                                       (adj_table[z] == len(in_adj)))])
-            for x in in_adj:
-                for z in self.graph.adj(x)[0]:
-                    adj_table[z] -= 1
-            #print("\tcandidates", candidates)
-            # find viable pairs
-            pairs.update([(min(v,w),max(v,w))
-                          for w in self.split(v,candidates)
-                          if self._viable((min(v,w),max(v,w)))])
-        #print("="*100)
-        return list(pairs)
+            key = self.signature(v)
+            # pairs are found through a common in-neighbor
+            if (len(key) > 0):
+                buckets[key].append(v)
+        pairs = []
+        for bucket in buckets.values():
+            bucket.sort()
+            for n, v in enumerate(bucket[:-1]):
+                pairs.extend((v,w) for w in sorted(self.split(v,bucket[n+1:])))
+        return pairs
+
+    def _secondary_check_at(self, v):
+        """
+        :param v: a vertex
+        :return: list of vertex pairs, containing `v`, that have been split.
+        """
+        key = self.signature(v)
+        if (len(key) == 0):
+            return []
+        # the bucket of `v` lies among the out-neighbors of any of its
+        # in-neighbors, so take the one with the fewest.
+        x = min(set(key), key=lambda x: len(self.graph.adj(x)[0]))
+        bucket = set(w for w in self.graph.adj(x)[0]
+                     if ((w != v) and (self.signature(w) == key)))
+        return [(min(v,w),max(v,w)) for w in bucket
+                if self._viable((min(v,w),max(v,w)))]
+
+    def _gather(self):
+        """
+        :return: the viable pairs anchored at every vertex, each pair once.
+        """
+        return list(set(chain(*[self._anchored[v]
+                                for v in self.graph.vertices()])))
+
+    def _iter_check(self):
+        """
+        :return: a generator of the viable pairs, each pair once.
+        """
+        pairs = set()
+        for pair in super()._iter_check():
+            if (pair not in pairs):
+                pairs.add(pair)
+                yield pair
 
     def _action(self, component):
         """
@@ -1,2 +1,3 @@
 # https://github.com/qpwo/python-simple-cycles
-from .johnson import simple_cycles
+from .johnson import (simple_cycles, parallel_simple_cycles, cycle_statistics,
+                      strongly_connected_components)
@@ -3,10 +3,53 @@
 # Original paper: Donald B Johnson. "Finding all the elementary circuits of a directed graph." SIAM Journal on Computing. 1975.
 
 from collections import defaultdict
+from multiprocessing import Pool
 
 def simple_cycles(G):
     # Yield every elementary cycle in python graph G exactly once
     # Expects a dictionary mapping from vertices to iterables of vertices
+    for path in _simple_cycles(G):
+        yield path[:]
+
+def cycle_statistics(G):
+    # Count the elementary cycles in python graph G without storing them
+    # Expects a dictionary mapping from vertices to iterables of vertices
+    # Returns (per-vertex counts, cycle-length histogram, per-SCC counts, SCCs),
+    # where the SCCs are those of G and the per-SCC counts are aligned with them
+    sccs = strongly_connected_components(G)
+    scc_index = {}
+    for i in range(len(sccs)):
+        for v in sccs[i]:
+            scc_index[v] = i
+    counts = dict((v,0) for v in G)
+    histogram = defaultdict(int)
+    scc_counts = [0 for _ in sccs]
+    for path in _simple_cycles(G):
+        # `path` is the live search stack - read it, never keep it
+        for v in path:
+            counts[v] += 1
+        histogram[len(path)] += 1
+        scc_counts[scc_index[path[0]]] += 1
+    return counts, dict(histogram), scc_counts, sccs
+
+def _simple_cycles(G):
+    # Yield every elementary cycle in python graph G exactly once, as the
+    # search's own path list; the list is mutated once the generator resumes
+    G = {v: set(nbrs) for (v,nbrs) in G.items()} # make a copy of the graph
+    sccs = strongly_connected_components(G)
+    while sccs:
+        scc = sccs.pop()
+        startnode = scc.pop()
+        for path in _circuits(G, startnode):
+            yield path
+        remove_node(G, startnode)
+        H = subgraph(G, set(scc))
+        sccs.extend(strongly_connected_components(H))
+
+def _circuits(G, startnode):
+    # Yield every elementary cycle through startnode in python graph G, as the
+    # search's own path list
+    # Expects values of G to be sets
     def _unblock(thisnode, blocked, B):
         stack = set([thisnode])
         while stack:
@@ -15,42 +58,79 @@ def simple_cycles(G):
                 blocked.remove(node)
                 stack.update(B[node])
                 B[node].clear()
+    path=[startnode]
+    blocked = set()
+    closed = set()
+    blocked.add(startnode)
+    B = defaultdict(set)
+    stack = [ (startnode,list(G[startnode])) ]
+    while stack:
+        thisnode, nbrs = stack[-1]
+        if nbrs:
+            nextnode = nbrs.pop()
+            if nextnode == startnode:
+                yield path
+                closed.update(path)
+            elif nextnode not in blocked:
+                path.append(nextnode)
+                stack.append( (nextnode,list(G[nextnode])) )
+                closed.discard(nextnode)
+                blocked.add(nextnode)
+                continue
+        if not nbrs:
+            if thisnode in closed:
+                _unblock(thisnode,blocked,B)
+            else:
+                for nbr in G[thisnode]:
+                    if thisnode not in B[nbr]:
+                        B[nbr].add(thisnode)
+            stack.pop()
+            path.pop()
+
+def parallel_simple_cycles(G, processes=None, partition=32):
+    # Yield every elementary cycle in python graph G exactly once, enumerated by
+    # a pool of worker processes
+    # Expects a dictionary mapping from vertices to iterables of vertices
+    # Every SCC is a task. An SCC of at least `partition` vertices is split into
+    # one task per node instead: the i-th task finds the cycles through the
+    # i-th node of the SCC in the subgraph induced by the nodes from the i-th on,
+    # which are independent of one another. Results stream back in task order,
+    # so the order of the cycles is deterministic.
     G = {v: set(nbrs) for (v,nbrs) in G.items()} # make a copy of the graph
-    sccs = strongly_connected_components(G)
-    while sccs:
-        scc = sccs.pop()
-        startnode = scc.pop()
-        path=[startnode]
-        blocked = set()
-        closed = set()
-        blocked.add(startnode)
-        B = defaultdict(set)
-        stack = [ (startnode,list(G[startnode])) ]
-        while stack:
-            thisnode, nbrs = stack[-1]
-            if nbrs:
-                nextnode = nbrs.pop()
-                if nextnode == startnode:
-                    yield path[:]
-                    closed.update(path)
-                elif nextnode not in blocked:
-                    path.append(nextnode)
-                    stack.append( (nextnode,list(G[nextnode])) )
-                    closed.discard(nextnode)
-                    blocked.add(nextnode)
-                    continue
-            if not nbrs:
-                if thisnode in closed:
-                    _unblock(thisnode,blocked,B)
-                else:
-                    for nbr in G[thisnode]:
-                        if thisnode not in B[nbr]:
-                            B[nbr].add(thisnode)
-                stack.pop()
-                path.pop()
-        remove_node(G, startnode)
-        H = subgraph(G, set(scc))
-        sccs.extend(strongly_connected_components(H))
+    sccs = [scc for scc in strongly_connected_components(G)
+            if (len(scc) > 1) or (scc[0] in G[scc[0]])]
+    tasks = []
+    for s in range(len(sccs)):
+        if len(sccs[s]) < partition:
+            tasks.append((s, None))
+        else:
+            tasks.extend((s, i) for i in range(len(sccs[s])))
+    if not tasks:
+        return
+    with Pool(processes, initializer=_init_worker, initargs=(G, sccs)) as pool:
+        for cycles in pool.imap(_cycles_task, tasks):
+            for cycle in cycles:
+                yield cycle
+
+_worker_graph = None
+_worker_sccs = None
+
+def _init_worker(G, sccs):
+    # Share the graph and its SCCs with a worker process once, not per task
+    global _worker_graph, _worker_sccs
+    _worker_graph = G
+    _worker_sccs = sccs
+
+def _cycles_task(task):
+    # Find the cycles of an SCC, or the cycles through one of its nodes that
+    # avoid the nodes before it
+    s, i = task
+    scc = _worker_sccs[s]
+    if i is None:
+        H = subgraph(_worker_graph, set(scc))
+        return [path[:] for path in _simple_cycles(H)]
+    H = subgraph(_worker_graph, set(scc[i:]))
+    return [path[:] for path in _circuits(H, scc[i])]
 
 def strongly_connected_components(graph):
     # Tarjan's algorithm for finding SCC's
@@ -5,6 +5,9 @@ from itertools import chain
 class Reduction(K1Move):
     # move (R)
 
+    shardable = True
+    vectorizable = True
+
     def reducible(self, v):
         """
         :param v: a vertex
@@ -33,6 +36,19 @@ class Reduction(K1Move):
         """
         return [v for v in self.graph.vertices() if self.reducible(v)]
 
+    def _vectorized_check(self):
+        """
+        :return: list of reducible vertices, from `self.snapshot`.
+        """
+        return self.snapshot.select(self.snapshot.reducible())
+
+    def _secondary_check_at(self, v):
+        """
+        :param v: a vertex
+        :return: `v`, if it is reducible.
+        """
+        return ([v] if self.reducible(v) else [])
+
     def _action(self, component):
         """
         :param component: a reducible vertex
@@ -51,7 +67,7 @@ class Reduction(K1Move):
             # create new edges from w to x, for each edge v to x.
             for x in adj_out:
                 graph.add_edge(w,x,color=0)
-            inverse_component = (x,w,len(adj_out))
+            inverse_component = (w,x,len(adj_out))
             return graph, inverse_component
 
         return _reduction
@@ -62,14 +78,15 @@ class ReductionInverse(K1Move):
     def _viable(self, component):
         """
         :param component: an edge vw and its degree d, d >= 0.
-        :return: true iff the component is satisfies its definition.
+        :return: true iff the component is satisfies its definition: there are
+        at least d edges from v to w.
         """
         if (type(component) == tuple):
             if (len(component) == 3):
                 v,w,d = component
                 if (type(d) == int):
                     if (d > 0):
-                        return (w in self.graph.adj(v)[0])
+                        return (self.graph.adj(v)[0].count(w) >= d)
                     else:
                         raise ValueError("d must be a natural number")
                 else:
@@ -84,10 +101,33 @@ class ReductionInverse(K1Move):
         determines if there are any legal moves on the graph.
         :return: all edges of degree 1.
         """
-        return list(chain(*[[(v,w,1)
-                             for w in self.graph.adj(v)[0]]
+        return list(chain(*[self._secondary_check_at(v)
                             for v in self.graph.vertices()]))
 
+    def _secondary_check_at(self, v):
+        """
+        :param v: a vertex
+        :return: the edges sourced at `v`, with degree 1.
+        """
+        return [(v,w,1) for w in self.graph.adj(v)[0]]
+
+    def _anchors(self, component):
+        """
+        :param component: an edge vw and its degree d.
+        :return: the endpoints of the edge.
+        """
+        return list(component[:2])
+
+    @classmethod
+    def _relabel(cls, component, mapping):
+        """
+        :param component: an edge vw and its degree d.
+        :param mapping: a dictionary of vertex labels
+        :return: the edge, mapped by `mapping`, and its degree.
+        """
+        v,w,d = component
+        return (mapping[v],mapping[w],d)
+
     def _action(self, component):
         """
         :param component: an edge vw and its degree d.
@@ -96,7 +136,9 @@ class ReductionInverse(K1Move):
 
         def _reductioninverse(graph, component=component):
             v,w,d = component
-            graph.del_edge(v,w,color=0)
+            # the d edges from v to w are routed through a new vertex x
+            for _ in range(d):
+                graph.del_edge(v,w,color=0)
             x = graph.add_vertex()
             graph.add_edge(v,x,color=0)
             for _ in range(d):
@@ -0,0 +1,137 @@
+class MoveSequence:
+    """
+    a series of moves, recorded on one graph and replayed on others. each step
+    keeps its move class, its component, and the vertices it created, so that
+    the labels of a replay can be mapped onto those of the recording.
+    """
+
+    def __init__(self, skeleton, in_place=False):
+        """
+        :param skeleton: a ColoredDigraph object, the initial graph.
+        :param in_place: if True, moves are recorded by mutating `skeleton`,
+        else a `fork` of it.
+        """
+        self.graph = skeleton if in_place else skeleton.fork()
+        # the vertices of the initial graph
+        self.vertices = list(self.graph.vertices())
+        self._edges = self._edge_multiset(self.graph,
+                                          dict((v,v) for v in self.vertices))
+        # tuples (move class, component, created vertices)
+        self.steps = []
+        self.inverse_components = []
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __iter__(self):
+        """
+        :return: an iterator of the steps, as tuples (move class, component).
+        """
+        return ((move, component) for move, component, _ in self.steps)
+
+    def append(self, move, component):
+        """
+        performs a move on `self.graph`, and records it.
+        :param move: a Move class
+        :param component: a viable component of the move on `self.graph`.
+        :return: the inverse component.
+        """
+        self.graph, inverse_component, created = self._step(
+            self.graph, move, component, True)
+        self.steps.append((move, component, created))
+        self.inverse_components.append(inverse_component)
+        return inverse_component
+
+    def extend(self, steps):
+        """
+        :param steps: an iterable of tuples whose first two entries are a move
+        class and a component, e.g. the steps returned by `reduce`.
+        :return: the list of inverse components.
+        """
+        return [self.append(step[0], step[1]) for step in steps]
+
+    def replay(self, skeleton, mapping=None, validate=True, in_place=False):
+        """
+        performs the recorded moves on another graph.
+        :param skeleton: a ColoredDigraph object, isomorphic to the initial
+        graph of the sequence.
+        :param mapping: a dictionary from the initial vertices of the sequence
+        to the vertices of `skeleton`. defaults to the identity.
+        :param validate: if False, the caller asserts that `skeleton` is the
+        initial graph under `mapping`; neither the isomorphism nor the
+        viability of each step is then checked.
+        :param in_place: if True, mutate `skeleton`, else a `fork` of it.
+        :return: the final graph, the list of inverse components, and the
+        mapping extended to every vertex created by the moves.
+        """
+        if (mapping == None):
+            mapping = dict((v,v) for v in self.vertices)
+        else:
+            mapping = dict(mapping)
+        if (validate and
+            ((skeleton.k() != self.graph.k()) or
+             (skeleton.V() != len(self.vertices)) or
+             (set(skeleton.vertices()) !=
+              set(mapping[v] for v in self.vertices)) or
+             (self._edge_multiset(skeleton, mapping) != self._edges))):
+            raise ValueError("the graph is not the initial graph of the sequence")
+        graph = skeleton if in_place else skeleton.fork()
+        inverse_components = []
+        for move, component, created in self.steps:
+            component = move._relabel(component, mapping)
+            graph, inverse_component, new = self._step(graph, move, component,
+                                                       validate)
+            if (len(new) != len(created)):
+                raise ValueError("the replay diverged from the recording")
+            mapping.update(zip(created, new))
+            inverse_components.append(inverse_component)
+        return graph, inverse_components, mapping
+
+    def replay_many(self, skeletons, mappings=None, validate=True,
+                    in_place=False):
+        """
+        :param skeletons: an iterable of ColoredDigraph objects.
+        :param mappings: optional, an iterable of mappings, one per graph.
+        :return: the list of results of `replay`, one per graph.
+        """
+        skeletons = list(skeletons)
+        if (mappings == None):
+            mappings = [None for _ in skeletons]
+        return [self.replay(skeleton, mapping, validate, in_place)
+                for skeleton, mapping in zip(skeletons, mappings)]
+
+    def _step(self, graph, move, component, validate):
+        """
+        performs a move in place.
+        :return: the graph, the inverse component, and the vertices created.
+        """
+        # a lazy move does no check when it is constructed
+        instance = move(graph, in_place=True, lazy=True)
+        if (validate):
+            operator = instance(component)
+        else:
+            operator = instance._action(component)
+        created = []
+        def _created(event, *args):
+            if (event == 'add_vertex'):
+                created.append(args[0])
+        graph.subscribe(_created)
+        try:
+            graph, inverse_component = operator(graph)
+        finally:
+            graph.unsubscribe(_created)
+        return graph, inverse_component, created
+
+    def _edge_multiset(self, graph, mapping):
+        """
+        :return: a dictionary counting the edges (v,w,color) of `graph`, with
+        their endpoints labeled by the inverse of `mapping`.
+        """
+        inverse = dict((w,v) for v,w in mapping.items())
+        edges = dict()
+        for v in graph.vertices():
+            for color in graph.colors():
+                for w in graph.adj(v, color)[0]:
+                    edge = (inverse.get(v), inverse.get(w), color)
+                    edges[edge] = edges.get(edge, 0) + 1
+        return edges
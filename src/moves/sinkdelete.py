@@ -4,6 +4,9 @@ from itertools import chain
 class SinkDelete(K1Move):
     # move (S)
 
+    shardable = True
+    vectorizable = True
+
     def sink(self, v):
         """
         :param v: a vertex
@@ -28,6 +31,19 @@ class SinkDelete(K1Move):
         """
         return [v for v in self.graph.vertices() if self.sink(v)]
 
+    def _vectorized_check(self):
+        """
+        :return: list of sinks, from `self.snapshot`.
+        """
+        return self.snapshot.select(self.snapshot.sinks())
+
+    def _secondary_check_at(self, v):
+        """
+        :param v: a vertex
+        :return: `v`, if it is a sink.
+        """
+        return ([v] if self.sink(v) else [])
+
     def _action(self, component):
         """
         :param component: a sink
@@ -60,6 +76,13 @@ class SinkDeleteInverse(K1Move):
         """
         return [v for v in self.graph.vertices()]
 
+    def _secondary_check_at(self, v):
+        """
+        :param v: a vertex
+        :return: `v`.
+        """
+        return [v]
+
     def _action(self, component):
         """
         :param component: one or more vertices
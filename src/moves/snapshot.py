@@ -0,0 +1,145 @@
+from numpy import (arange, argsort, bincount, concatenate, cumsum, diff,
+                   fromiter, int64, lexsort, ones, repeat, searchsorted,
+                   zeros)
+from itertools import chain
+
+class CSRSnapshot:
+    """
+    a frozen copy of a ColoredDigraph, as compressed sparse rows of its
+    outgoing and incoming edges over every color, on which the degree and
+    multiset predicates of the moves are evaluated for all vertices at once.
+    vertices are indexed by their position in `skeleton.vertices()`. the
+    snapshot does not follow later changes to the graph.
+    """
+
+    def __init__(self, skeleton):
+        """
+        :param skeleton: a ColoredDigraph object.
+        """
+        self.graph = skeleton
+        vertices = list(skeleton.vertices())
+        n = len(vertices)
+        self.labels = fromiter(vertices, dtype=int64, count=n)
+        # the raw adjacency lists, flattened: w >= 0 is an edge to w, and
+        # -(w+1) an edge from w. see `ColoredDigraph._flip`.
+        rows, flat = [], []
+        for color in skeleton.colors():
+            adj = skeleton._adj[color]
+            lengths = fromiter((len(adj[v]) for v in vertices),
+                               dtype=int64, count=n)
+            rows.append(repeat(arange(n), lengths))
+            flat.append(fromiter(chain.from_iterable(adj[v] for v in vertices),
+                                 dtype=int64, count=int(lengths.sum())))
+        rows = concatenate(rows) if rows else zeros(0, dtype=int64)
+        flat = concatenate(flat) if flat else zeros(0, dtype=int64)
+        if (skeleton.k() > 1):
+            # gather the colors of each vertex together
+            order = argsort(rows, kind='stable')
+            rows, flat = rows[order], flat[order]
+        outgoing = (flat >= 0)
+        self._order = argsort(self.labels)
+        self.out_ptr, self.out_idx = self._rows(
+            n, rows[outgoing], self.positions(flat[outgoing]))
+        self.in_ptr, self.in_idx = self._rows(
+            n, rows[~outgoing], self.positions(-flat[~outgoing]-1))
+
+    def positions(self, labels):
+        """
+        :param labels: an array of vertex labels
+        :return: the positions of the vertices in `self.labels`.
+        """
+        return self._order[searchsorted(self.labels[self._order], labels)]
+
+    def _rows(self, n, rows, columns):
+        """
+        :param n: the number of rows
+        :param rows: sorted row index of each entry
+        :param columns: column index of each entry
+        :return: the offset and column arrays of the rows.
+        """
+        ptr = zeros(n+1, dtype=int64)
+        ptr[1:] = cumsum(bincount(rows, minlength=n))
+        return ptr, columns
+
+    def V(self):
+        """
+        :return: number of vertices
+        """
+        return len(self.labels)
+
+    def out_degree(self):
+        """
+        :return: the out-degree of every vertex.
+        """
+        return diff(self.out_ptr)
+
+    def in_degree(self):
+        """
+        :return: the in-degree of every vertex.
+        """
+        return diff(self.in_ptr)
+
+    def loops(self):
+        """
+        :return: the number of loops at every vertex.
+        """
+        rows = repeat(arange(self.V()), self.out_degree())
+        return bincount(rows[self.out_idx == rows], minlength=self.V())
+
+    def _distinct(self, ptr, idx):
+        """
+        :return: the number of distinct columns in every row.
+        """
+        rows = repeat(arange(self.V()), diff(ptr))
+        order = lexsort((idx, rows))
+        rows, idx = rows[order], idx[order]
+        first = ones(len(rows), dtype=bool)
+        first[1:] = (rows[1:] != rows[:-1]) | (idx[1:] != idx[:-1])
+        return bincount(rows[first], minlength=self.V())
+
+    def distinct_out(self):
+        """
+        :return: the number of distinct out-neighbors of every vertex.
+        """
+        return self._distinct(self.out_ptr, self.out_idx)
+
+    def distinct_in(self):
+        """
+        :return: the number of distinct in-neighbors of every vertex.
+        """
+        return self._distinct(self.in_ptr, self.in_idx)
+
+    def sinks(self):
+        """
+        :return: boolean mask, true at the vertices with no outgoing edges and
+        at least one incoming edge. see `SinkDelete.sink`.
+        """
+        return (self.out_degree() == 0) & (self.in_degree() >= 1)
+
+    def reducible(self):
+        """
+        :return: boolean mask, true at the vertices whose outgoing edges all go
+        to one other vertex, and with one incoming edge. see
+        `Reduction.reducible`.
+        """
+        return ((self.distinct_out() == 1) & (self.in_degree() == 1) &
+                (self.loops() == 0))
+
+    def splittable(self, incoming):
+        """
+        :param incoming: if True, count in-neighbors, else out-neighbors.
+        :return: boolean mask, true at the vertices with at least two distinct
+        such neighbors, and with an incoming edge when splitting outgoing ones.
+        see `Insplit.splittable` and `Outsplit.splittable`.
+        """
+        if (incoming):
+            return (self.distinct_in() >= 2)
+        else:
+            return ((self.distinct_out() >= 2) & (self.in_degree() >= 1))
+
+    def select(self, mask):
+        """
+        :param mask: a boolean array over the vertices
+        :return: the labels of the vertices where `mask` is true, in order.
+        """
+        return self.labels[mask].tolist()
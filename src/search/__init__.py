@@ -0,0 +1,13 @@
+from .canonical import canonical_form, canonical_hash, isomorphism
+from .engine import MOVES, INVERSES, expand, MoveSearch
+from .bidirectional import find_move_path
+from .bestfirst import (BestFirstSearch, unit_cost, growth_cost,
+                        size_distance, degree_distance, invariant_distance)
+from .parallel import ParallelMoveSearch
+from .storage import BloomFilter, DiskStates, DiskFrontier, DiskMoveSearch
+from .checkpoint import save, load, reduce_checkpointed, resume
+from .invariants import (Invariants, smith_normal_form, bowen_franks,
+                         det_sign, singular, ideals, invariants, invariant_key,
+                         distinguishes)
+from .classify import Classification, classify
+from .witness import verify, optimize
@@ -0,0 +1,206 @@
+from .canonical import canonical_hash
+from .engine import MOVES, expand, MoveSearch
+
+from heapq import heappush, heappop, heapify, nsmallest
+
+def unit_cost(move, component, graph, child):
+    """
+    every move costs one.
+    :param move: the move class
+    :param component: the component of the move on `graph`
+    :param graph: the graph the move is applied to
+    :param child: the result of the move
+    :return: the cost of the step.
+    """
+    return 1
+
+def growth_cost(move, component, graph, child):
+    """
+    a move costs one, plus the number of vertices it adds, so that (S)^{-1},
+    (R)^{-1} and (C), which only grow the graph, are tried last.
+    """
+    return 1 + max(0, child.V() - graph.V())
+
+def _degrees(graph):
+    """
+    :return: the sorted list of (in-degree, out-degree) of the vertices.
+    """
+    degrees = []
+    for v in graph.vertices():
+        adj_out, adj_in = graph.adj(v)
+        degrees.append((len(adj_in), len(adj_out)))
+    return sorted(degrees)
+
+def size_distance(graph, target):
+    """
+    :param graph: a ColoredDigraph object.
+    :param target: the ColoredDigraph searched for, or None.
+    :return: the difference in vertex and edge counts to `target`, or the
+    size of `graph` without a target.
+    """
+    if (target == None):
+        return graph.V() + graph.E()
+    return abs(graph.V() - target.V()) + abs(graph.E() - target.E())
+
+def degree_distance(graph, target):
+    """
+    :return: the distance between the sorted degree sequences of `graph` and
+    `target`, padded with isolated vertices to the same length; or the
+    distance to the empty graph without a target.
+    """
+    degrees = _degrees(graph)
+    other = (_degrees(target) if (target != None) else [])
+    n = max(len(degrees), len(other))
+    degrees = [(0,0)]*(n - len(degrees)) + degrees
+    other = [(0,0)]*(n - len(other)) + other
+    return sum(abs(a[0] - b[0]) + abs(a[1] - b[1])
+               for a, b in zip(degrees, other))
+
+def cheap_invariants(graph):
+    """
+    :return: a tuple of counts that are quick to compute: sinks, sources, and
+    vertices with loops.
+    """
+    sinks, sources, loops = 0, 0, 0
+    for v in graph.vertices():
+        adj_out, adj_in = graph.adj(v)
+        sinks += (len(adj_out) == 0)
+        sources += (len(adj_in) == 0)
+        loops += (v in adj_out)
+    return (sinks, sources, loops)
+
+def invariant_distance(graph, target):
+    """
+    :return: the total difference between the `cheap_invariants` of `graph`
+    and `target`, or 0 without a target.
+    """
+    if (target == None):
+        return 0
+    return sum(abs(a - b) for a, b in zip(cheap_invariants(graph),
+                                          cheap_invariants(target)))
+
+class BestFirstSearch(MoveSearch):
+    """
+    best first search of the graphs reachable from a skeleton by moves. the
+    graph expanded next is the one with the least path cost plus heuristic
+    estimate, as in A*. an expanded graph is never expanded again, so the
+    paths found are the cheapest when the heuristic is consistent. states are
+    recorded as in `MoveSearch`; `costs` keeps the path cost of each one that
+    is expanded or in the frontier.
+    """
+
+    def __init__(self, skeleton, target=None, cost=unit_cost,
+                 heuristic=size_distance, max_open=None, moves=MOVES,
+                 max_depth=None, max_vertices=None, max_states=None):
+        """
+        :param skeleton: a ColoredDigraph object, the root of the search.
+        :param target: optional, a ColoredDigraph object. the search stops
+        when a graph isomorphic to it is expanded.
+        :param cost: a function (move class, component, graph, child) giving
+        the cost of a step, e.g. `unit_cost` or `growth_cost`.
+        :param heuristic: a function (graph, target) estimating the cost from
+        a graph to the target, e.g. `size_distance`, `degree_distance` or
+        `invariant_distance`.
+        :param max_open: optional, the number of graphs kept in the frontier.
+        beyond it, only the best ones are kept, as in a beam search.
+        :param moves, max_depth, max_vertices, max_states: see `MoveSearch`.
+        """
+        super().__init__(skeleton, moves, max_depth, max_vertices, max_states)
+        self.target = target
+        self.goal = (canonical_hash(target) if (target != None) else None)
+        self.cost = cost
+        self.heuristic = heuristic
+        self.max_open = max_open
+        self.costs = {self.root: 0}
+        # expanded graphs
+        self.closed = set()
+        self.pruned = 0
+        # heap of (estimate, tiebreak, cost, hash, graph, depth)
+        self._tiebreak = 0
+        self.frontier = []
+        self._push(self.root, self.graph, 0)
+
+    def done(self):
+        """
+        :return: boolean, True when nothing is left to expand, the state bound
+        is reached, or the target has been expanded.
+        """
+        return (super().done() or
+                ((self.goal != None) and (self.goal in self.closed)))
+
+    def _push(self, h, graph, depth):
+        c = self.costs[h]
+        self._tiebreak += 1
+        heappush(self.frontier, (c + self.heuristic(graph, self.target),
+                                 self._tiebreak, c, h, graph, depth))
+
+    def _pop(self):
+        """
+        :return: the next tuple (hash, graph, depth) to expand, skipping the
+        entries made stale by a cheaper path.
+        """
+        while True:
+            _, _, c, h, graph, depth = heappop(self.frontier)
+            if ((h not in self.closed) and (c == self.costs.get(h))):
+                return h, graph, depth
+            if (len(self.frontier) == 0):
+                return None
+
+    def step(self):
+        """
+        expands the graph of the frontier with the least estimate.
+        :return: the list of hashes discovered.
+        """
+        popped = self._pop()
+        discovered = []
+        if (popped == None):
+            return discovered
+        h, graph, depth = popped
+        self.closed.add(h)
+        self.expanded += 1
+        if ((h == self.goal) or
+            ((self.max_depth != None) and (depth >= self.max_depth))):
+            return discovered
+        for move, component, child in expand(graph, self.moves):
+            if (not self._admit(child, depth+1)):
+                continue
+            c = canonical_hash(child)
+            cost = self.costs[h] + self.cost(move, component, graph, child)
+            if ((c in self.closed) or
+                ((c in self.costs) and (self.costs[c] <= cost))):
+                continue
+            if (c not in self.states):
+                discovered.append(c)
+            # the graph is not expanded yet, so no state depends on its path
+            self.states[c] = (h, move, component, depth+1)
+            self.costs[c] = cost
+            self._push(c, child, depth+1)
+        if ((self.max_open != None) and (len(self.frontier) > self.max_open)):
+            self.pruned += len(self.frontier) - self.max_open
+            kept = nsmallest(self.max_open, self.frontier)
+            # a pruned graph forgets its cost, so that it is pushed again when
+            # it is reached by any path
+            live = set((entry[3], entry[2]) for entry in kept)
+            for _, _, c, h, _, _ in self.frontier:
+                if (((h, c) not in live) and (self.costs.get(h) == c)):
+                    del self.costs[h]
+            self.frontier = kept
+            heapify(self.frontier)
+        return discovered
+
+    def run(self, checkpoint=None, interval=60):
+        """
+        expands graphs until the target is found, the frontier is empty, or a
+        bound is reached.
+        :param checkpoint, interval: see `MoveSearch.run`. the cost and
+        heuristic functions are saved by name, so they must be defined at the
+        top level of a module.
+        :return: the path to the target, as in `path`, or None if it was not
+        found. without a target, the dictionary of states.
+        """
+        super().run(checkpoint, interval)
+        if (self.goal == None):
+            return self.states
+        if (self.goal in self.closed):
+            return self.path(self.goal)
+        return None
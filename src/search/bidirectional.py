@@ -0,0 +1,64 @@
+from ..moves import MoveSequence
+from .canonical import isomorphism
+from .engine import MOVES, INVERSES, MoveSearch
+
+def find_move_path(skeleton, other, moves=MOVES, max_depth=None,
+                   max_vertices=None, max_states=None):
+    """
+    searches for a sequence of moves from one graph to another, by breadth
+    first searches from both graphs at once that meet on a canonical hash.
+    the side with the smaller frontier is expanded next, so each search only
+    goes about half the distance. the path found from `other` is walked
+    backwards with the inverse moves.
+    :param skeleton: a ColoredDigraph object, the initial graph.
+    :param other: a ColoredDigraph object, the target graph.
+    :param moves: the move classes by which graphs are expanded.
+    :param max_depth: optional, see `MoveSearch`. bounds each search.
+    :param max_vertices: optional, see `MoveSearch`.
+    :param max_states: optional, see `MoveSearch`. bounds each search.
+    :return: the witness, a list of steps (move class, component) that takes
+    `skeleton` to a graph isomorphic to `other`, or None if the searches end
+    without meeting.
+    """
+    forward = MoveSearch(skeleton, moves, max_depth, max_vertices, max_states)
+    backward = MoveSearch(other, moves, max_depth, max_vertices, max_states)
+    meet = (forward.root if (forward.root in backward) else None)
+    while ((meet == None) and not (forward.done() and backward.done())):
+        if (backward.done() or
+            ((not forward.done()) and
+             (len(forward.frontier) <= len(backward.frontier)))):
+            search, opposite = forward, backward
+        else:
+            search, opposite = backward, forward
+        meet = next((h for h in search.step() if (h in opposite)), None)
+    if (meet == None):
+        return None
+    return _witness(forward, backward, meet)
+
+def _witness(forward, backward, meet):
+    """
+    :param forward: the search from the initial graph
+    :param backward: the search from the target graph
+    :param meet: a hash discovered by both searches
+    :return: the steps of the forward path to `meet`, followed by the inverse
+    of the backward path.
+    """
+    witness = MoveSequence(forward.graph)
+    witness.extend(forward.path(meet))
+    # the graphs along the backward path, with the inverse component of the
+    # step that leads to each one
+    graphs, inverse_components = [backward.graph], []
+    for move, component in backward.path(meet):
+        graph, inverse_component = move(graphs[-1], lazy=True)(component)(
+            graphs[-1])
+        graphs.append(graph)
+        inverse_components.append(inverse_component)
+    steps = backward.path(meet)
+    for i in range(len(steps)-1, -1, -1):
+        # the labels of the backward graph may differ from those of the
+        # witness: any isomorphism between the two will do.
+        mapping = isomorphism(graphs[i+1], witness.graph)
+        inverse = INVERSES[steps[i][0]]
+        witness.append(inverse, inverse._relabel(inverse_components[i],
+                                                 mapping))
+    return list(witness)
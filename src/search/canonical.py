@@ -0,0 +1,202 @@
+from itertools import chain
+from hashlib import sha1
+
+def _refine(cells, out_adj, in_adj):
+    """
+    splits the cells of an ordered partition until every vertex of a cell has
+    the same number of edges, of each color and direction, to every cell.
+    cells are split, and ordered, by label-independent signatures only.
+    :param cells: an ordered partition, as a list of lists of vertex indices
+    :param out_adj: per vertex, the list of its out-edges (w, color)
+    :param in_adj: per vertex, the list of its in-edges (w, color)
+    :return: the refined ordered partition.
+    """
+    while True:
+        cell_of = dict()
+        for i, cell in enumerate(cells):
+            for v in cell:
+                cell_of[v] = i
+        refined = []
+        for cell in cells:
+            if (len(cell) == 1):
+                refined.append(cell)
+                continue
+            signatures = dict()
+            for v in cell:
+                signature = (
+                    tuple(sorted((cell_of[w], c) for w, c in out_adj[v])),
+                    tuple(sorted((cell_of[w], c) for w, c in in_adj[v])))
+                signatures.setdefault(signature, []).append(v)
+            for signature in sorted(signatures):
+                refined.append(signatures[signature])
+        if (len(refined) == len(cells)):
+            return refined
+        cells = refined
+
+def _union(parent, p):
+    """
+    joins the orbits of a permutation, in a union-find forest.
+    :param parent: dictionary, the forest, from vertex to parent
+    :param p: a permutation, as a dictionary of the points it moves
+    """
+    for x, y in p.items():
+        rx, ry = _find(parent, x), _find(parent, y)
+        if (rx != ry):
+            parent[max(rx, ry)] = min(rx, ry)
+
+def _find(parent, x):
+    """
+    :return: the representative of the orbit of x.
+    """
+    root = x
+    while (parent.get(root, root) != root):
+        root = parent[root]
+    while (x != root):
+        parent[x], x = root, parent[x]
+    return root
+
+def _canonical_order(members, out_adj, in_adj, edges):
+    """
+    individualization and refinement: the least edge list over every discrete
+    ordering reached by refining and individualizing vertices. branches that
+    an automorphism found so far maps onto an explored branch are skipped,
+    and a branch is left as soon as one of its leaves gives the best form
+    again.
+    :param members: the vertex indices of a connected component
+    :param out_adj: per vertex, the list of its out-edges (w, color)
+    :param in_adj: per vertex, the list of its in-edges (w, color)
+    :param edges: the edges (v, w, color) of the component
+    :return: the least edge list, over positions in the component, and the
+    ordering of `members` that gives it.
+    """
+    best = dict(form=None, order=None, prefix=None)
+    automorphisms = []
+
+    def leaf(cells, prefix):
+        order = [cell[0] for cell in cells]
+        position = dict()
+        for i, v in enumerate(order):
+            position[v] = i
+        form = tuple(sorted((position[v], position[w], c)
+                            for v, w, c in edges))
+        if ((best['form'] == None) or (form < best['form'])):
+            best['form'] = form
+            best['order'] = order
+            best['prefix'] = prefix
+        elif (form == best['form']):
+            # both orderings give the same form: an automorphism. it fixes the
+            # individualized vertices the two leaves share, and maps the
+            # explored branch of the best leaf where they part onto this one.
+            p = dict((x, y) for x, y in zip(best['order'], order)
+                     if (x != y))
+            automorphisms.append(p)
+            return next(i for i, (x, y) in enumerate(zip(best['prefix'],
+                                                         prefix))
+                        if (x != y))
+        return None
+
+    def search(cells, prefix):
+        """
+        :return: None, or the depth to jump back to, when a leaf of this
+        branch is equivalent to the best leaf.
+        """
+        cells = _refine(cells, out_adj, in_adj)
+        t = next((i for i, cell in enumerate(cells) if (len(cell) > 1)),
+                 None)
+        if (t == None):
+            return leaf(cells, prefix)
+        explored = []
+        # orbits of the automorphisms found so far that fix the prefix
+        orbits, seen = dict(), 0
+        fixed = set(prefix)
+        for w in cells[t]:
+            for p in automorphisms[seen:]:
+                if fixed.isdisjoint(p):
+                    _union(orbits, p)
+            seen = len(automorphisms)
+            # automorphisms fixing the prefix map explored branches to others
+            if any((_find(orbits, w) == _find(orbits, u)) for u in explored):
+                continue
+            explored.append(w)
+            depth = search(cells[:t] + [[w], [x for x in cells[t]
+                                              if (x != w)]] + cells[t+1:],
+                           prefix + [w])
+            if ((depth != None) and (depth < len(prefix))):
+                return depth
+        return None
+
+    search([list(members)], [])
+    return best['form'], best['order']
+
+def canonical_form(skeleton):
+    """
+    computes a form of the graph that is equal for two graphs iff they are
+    isomorphic. each weakly connected component is put in canonical order by
+    `_canonical_order`, and the components are then sorted by their forms, so
+    that disjoint copies of a symmetric component are not permuted.
+    :param skeleton: a ColoredDigraph object.
+    :return: the form, a tuple (V, k, edges), and the canonical ordering of the
+    vertices: the vertex at each position of the form.
+    """
+    vertices = list(skeleton.vertices())
+    n = len(vertices)
+    index = dict((v,i) for i, v in enumerate(vertices))
+    out_adj = [[] for _ in vertices]
+    in_adj = [[] for _ in vertices]
+    edges = []
+    for v in vertices:
+        for color in skeleton.colors():
+            for w in skeleton.adj(v, color)[0]:
+                out_adj[index[v]].append((index[w], color))
+                in_adj[index[w]].append((index[v], color))
+                edges.append((index[v], index[w], color))
+
+    # weakly connected components
+    component = [None for _ in vertices]
+    members = []
+    for root in range(n):
+        if (component[root] != None):
+            continue
+        component[root] = len(members)
+        stack, found = [root], [root]
+        while stack:
+            v = stack.pop()
+            for w, _ in chain(out_adj[v], in_adj[v]):
+                if (component[w] == None):
+                    component[w] = len(members)
+                    stack.append(w)
+                    found.append(w)
+        members.append(found)
+    component_edges = [[] for _ in members]
+    for v, w, c in edges:
+        component_edges[component[v]].append((v, w, c))
+
+    forms = sorted((len(found), _canonical_order(found, out_adj, in_adj,
+                                                 component_edges[i]))
+                   for i, found in enumerate(members))
+    order, form = [], []
+    for size, (edge_list, ordering) in forms:
+        offset = len(order)
+        form.extend((offset+v, offset+w, c) for v, w, c in edge_list)
+        order.extend(ordering)
+    return (n, skeleton.k(), tuple(form)), [vertices[i] for i in order]
+
+def canonical_hash(skeleton):
+    """
+    :param skeleton: a ColoredDigraph object.
+    :return: a hex digest of the canonical form; equal for isomorphic graphs.
+    """
+    return sha1(repr(canonical_form(skeleton)[0]).encode()).hexdigest()
+
+def isomorphism(skeleton, other):
+    """
+    :param skeleton: a ColoredDigraph object.
+    :param other: a ColoredDigraph object.
+    :return: a dictionary from the vertices of `skeleton` to those of `other`
+    that maps edges onto edges, or None if the graphs are not isomorphic.
+    """
+    form, order = canonical_form(skeleton)
+    other_form, other_order = canonical_form(other)
+    if (form != other_form):
+        return None
+    return dict(zip(order, other_order))
@@ -0,0 +1,65 @@
+from ..moves.normalform import REDUCING_MOVES, reduce
+
+import gzip
+import os
+import pickle
+
+def save(state, path):
+    """
+    writes a compressed pickle of a search or reduction. the file is replaced
+    only once the new one is complete, so a run stopped while saving leaves
+    the previous checkpoint.
+    :param state: a picklable object, e.g. a MoveSearch.
+    :param path: the path of the checkpoint file.
+    """
+    partial = path + '.partial'
+    with gzip.open(partial, 'wb', compresslevel=6) as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(partial, path)
+
+def load(path):
+    """
+    :param path: the path of a checkpoint file written by `save`.
+    :return: the saved object.
+    """
+    with gzip.open(path, 'rb') as f:
+        return pickle.load(f)
+
+def reduce_checkpointed(skeleton, path, moves=REDUCING_MOVES, interval=60,
+                        steps=()):
+    """
+    `reduce`, saving the partly reduced graph and the steps taken so far to a
+    checkpoint every `interval` seconds. see `resume`.
+    :param skeleton: a ColoredDigraph object. it is not modified.
+    :param path: the path of the checkpoint file.
+    :param moves: see `reduce`.
+    :param interval: seconds between checkpoints.
+    :param steps: the steps that led to `skeleton`, kept at the head of the
+    list of steps.
+    :return: the reduced graph, and every step taken, as in `reduce`.
+    """
+    steps = list(steps)
+    def _save(graph, taken):
+        save(dict(graph=graph, steps=steps + taken, moves=moves), path)
+    graph, taken = reduce(skeleton, moves, checkpoint=_save,
+                          interval=interval)
+    _save(graph, taken)
+    return graph, steps + taken
+
+def resume(path, interval=60):
+    """
+    continues a search or reduction from its checkpoint, saving to the same
+    file as it goes.
+    :param path: the path of a checkpoint file.
+    :param interval: seconds between checkpoints.
+    :return: what the interrupted run would have returned: the states of a
+    search, the classes of a classification, or the reduced graph and steps of
+    `reduce_checkpointed`.
+    """
+    state = load(path)
+    if isinstance(state, dict):
+        # a reduction restarts from the partly reduced graph. every vertex is
+        # checked again, at the cost of one pass over the graph.
+        return reduce_checkpointed(state['graph'], path, state['moves'],
+                                   interval, state['steps'])
+    return state.run(checkpoint=path, interval=interval)
@@ -0,0 +1,199 @@
+from ..io import load_skeletons
+from .canonical import canonical_hash, _union, _find
+from .checkpoint import save
+from .engine import MOVES, MoveSearch
+from .invariants import invariant_key
+
+from multiprocessing import Pool, cpu_count
+from time import time
+
+def _key(item):
+    # the bucket of a named graph. graphs of higher rank have no moves, so
+    # they are only ever equivalent to isomorphic graphs.
+    name, graph, moves = item
+    if (graph.k() != 1):
+        return name, (graph.k(), canonical_hash(graph))
+    return name, invariant_key(graph, moves)
+
+def _bucket(item):
+    """
+    merges the graphs of one bucket: first the isomorphic ones, then those
+    found by a bounded search from one graph of each class not yet searched.
+    :param item: a tuple (key, list of (name, graph), moves, max_depth,
+    max_vertices, max_states).
+    :return: the key, and the list of links (source, target, steps), where the
+    steps lead from the source graph to a graph isomorphic to the target.
+    """
+    key, members, moves, max_depth, max_vertices, max_states = item
+    hashes = dict((name, canonical_hash(graph)) for name, graph in members)
+    parent, links = dict(), []
+    first = dict()
+    for name, _ in members:
+        h = hashes[name]
+        if (h in first):
+            _union(parent, {first[h]: name})
+            links.append((first[h], name, []))
+        else:
+            first[h] = name
+    # the classes from which a search has been run
+    searched = set()
+    for name, graph in members:
+        if (_find(parent, name) in searched):
+            continue
+        roots = set(_find(parent, other) for other, _ in members)
+        if (len(roots) == 1):
+            break
+        search = MoveSearch(graph, moves, max_depth, max_vertices,
+                            max_states)
+        search.run()
+        for other, _ in members:
+            if ((_find(parent, other) != _find(parent, name)) and
+                (hashes[other] in search.states)):
+                _union(parent, {name: other})
+                links.append((name, other, search.path(hashes[other])))
+        searched.add(_find(parent, name))
+    return key, links
+
+class Classification:
+    """
+    sorts a collection of graphs into classes connected by moves. graphs are
+    bucketed by `invariant_key`, and only graphs of one bucket are compared,
+    by bounded searches from each of their classes in turn. the classes are
+    kept in a union-find forest, with the witness paths that merged them.
+    graphs left in different classes of a bucket may still be equivalent,
+    past the bounds of the searches. buckets are classified in a process
+    pool, and the classification can be saved and resumed between buckets.
+    """
+
+    def __init__(self, skeletons, moves=MOVES, max_depth=4, max_vertices=None,
+                 max_states=10**4, processes=None):
+        """
+        :param skeletons: a list of (name, ColoredDigraph), e.g. from
+        `load_skeletons`. the names are distinct strings.
+        :param moves: the move classes by which graphs are connected.
+        :param max_depth, max_vertices, max_states: the bounds of each search,
+        see `MoveSearch`.
+        :param processes: optional, the number of worker processes. defaults
+        to the number of cpus.
+        """
+        self.graphs = dict(skeletons)
+        self.names = [name for name, _ in skeletons]
+        self.moves = moves
+        self.max_depth = max_depth
+        self.max_vertices = max_vertices
+        self.max_states = max_states
+        self.processes = (processes if (processes != None) else cpu_count())
+        # name -> bucket key
+        self.keys = dict()
+        # bucket key -> names
+        self.buckets = dict()
+        # the buckets classified so far
+        self.done = set()
+        # union-find forest of the names
+        self.parent = dict()
+        # tuples (source, target, steps), see `_bucket`
+        self.links = []
+        # seconds spent in `run`
+        self.elapsed = 0.0
+
+    def _merge(self, links):
+        for source, target, steps in links:
+            _union(self.parent, {source: target})
+            self.links.append((source, target, steps))
+
+    def run(self, checkpoint=None, interval=60):
+        """
+        buckets the graphs, then classifies every bucket not yet done.
+        :param checkpoint: optional, the path of a file to which the
+        classification is saved every `interval` seconds, as buckets finish,
+        and when it ends. see `resume`.
+        :param interval: seconds between checkpoints.
+        :return: the classes, see `classes`.
+        """
+        start, elapsed = time(), self.elapsed
+        last = start
+        with Pool(self.processes) as pool:
+            if (len(self.keys) < len(self.names)):
+                items = [(name, self.graphs[name], self.moves)
+                         for name in self.names if (name not in self.keys)]
+                for name, key in pool.imap(_key, items, chunksize=16):
+                    self.keys[name] = key
+                self.buckets = dict()
+                for name in self.names:
+                    self.buckets.setdefault(self.keys[name], []).append(name)
+            items = [(key, [(name, self.graphs[name]) for name in names],
+                      self.moves, self.max_depth, self.max_vertices,
+                      self.max_states)
+                     for key, names in self.buckets.items()
+                     if ((key not in self.done) and (len(names) > 1))]
+            # the largest buckets first, so that they do not finish last
+            items.sort(key=lambda item: -len(item[1]))
+            for key, links in pool.imap_unordered(_bucket, items):
+                self._merge(links)
+                self.done.add(key)
+                if ((checkpoint != None) and (time() - last >= interval)):
+                    self.elapsed = elapsed + (time() - start)
+                    self.save(checkpoint)
+                    last = time()
+        self.done.update(self.buckets)
+        self.elapsed = elapsed + (time() - start)
+        if (checkpoint != None):
+            self.save(checkpoint)
+        return self.classes()
+
+    def save(self, path):
+        """
+        writes the classification to a checkpoint file. see `resume`.
+        """
+        save(self, path)
+
+    def classes(self):
+        """
+        :return: the list of classes, each a list of names in input order.
+        the classes are in the order of their first names.
+        """
+        classes = dict()
+        for name in self.names:
+            classes.setdefault(_find(self.parent, name), []).append(name)
+        return list(classes.values())
+
+    def witness(self, name, other):
+        """
+        :param name, other: the names of two graphs.
+        :return: the chain of links (source, target, steps) joining the graphs,
+        in order from `name` to `other`, or None if they are not in one class.
+        each link's steps lead from its source graph to a graph isomorphic to
+        its target; a link may be traversed from target to source.
+        """
+        if (_find(self.parent, name) != _find(self.parent, other)):
+            return None
+        adjacent = dict()
+        for link in self.links:
+            adjacent.setdefault(link[0], []).append((link[1], link))
+            adjacent.setdefault(link[1], []).append((link[0], link))
+        # breadth first search of the tree of links
+        previous = {name: None}
+        queue = [name]
+        for x in queue:
+            for y, link in adjacent.get(x, []):
+                if (y not in previous):
+                    previous[y] = (x, link)
+                    queue.append(y)
+        chain = []
+        while (other != name):
+            other, link = previous[other]
+            chain.append(link)
+        return chain[::-1]
+
+def classify(path, moves=MOVES, max_depth=4, max_vertices=None,
+             max_states=10**4, processes=None, checkpoint=None, interval=60):
+    """
+    classifies the skeletons of a directory or archive, see `Classification`.
+    :param path: the path of a directory or archive, see `load_skeletons`.
+    :param checkpoint, interval: see `Classification.run`.
+    :return: the Classification, run to the end.
+    """
+    classification = Classification(load_skeletons(path), moves, max_depth,
+                                    max_vertices, max_states, processes)
+    classification.run(checkpoint, interval)
+    return classification
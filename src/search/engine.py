@@ -0,0 +1,191 @@
+from ..moves import (S, SInverse, R, RInverse, I, IInverse, O, OInverse,
+                     C, CInverse, P, PInverse, MoveSequence)
+from ..moves.cuntzsplice import CuntzSplice
+from ..moves.cycles_interface import CycleFinder, CycleIntersection
+from .canonical import canonical_hash
+from .checkpoint import save
+
+from itertools import chain
+from collections import deque
+from time import time
+
+# the six moves and their inverses
+MOVES = (S, SInverse, R, RInverse, I, IInverse, O, OInverse, C, CInverse,
+         P, PInverse)
+# each move class, to the class of its inverse
+INVERSES = {S: SInverse, SInverse: S, R: RInverse, RInverse: R,
+            I: IInverse, IInverse: I, O: OInverse, OInverse: O,
+            C: CInverse, CInverse: C, P: PInverse, PInverse: P}
+
+def components(move):
+    """
+    :param move: a Move object.
+    :return: the components at which the move is expanded: for (I) and (O),
+    every partition of every splittable vertex, see `Insplit.partitions`; for
+    the other moves, `move.viable`.
+    """
+    if hasattr(move, 'partitions'):
+        return chain(*[move.partitions(v) for v in move.graph.vertices()])
+    return move.viable
+
+def expand(skeleton, moves=MOVES):
+    """
+    applies every viable move to a graph.
+    :param skeleton: a ColoredDigraph object. it is not modified.
+    :param moves: the move classes to apply.
+    :return: a generator of tuples (move class, component, graph), where the
+    graph is the result of the move on a `fork` of `skeleton`.
+    """
+    # every move is defined on 1-graphs only
+    if (skeleton.k() != 1):
+        return
+    # the cycle based moves share one cycle finder
+    cyclefinder = None
+    for move in moves:
+        if issubclass(move, CuntzSplice):
+            if (cyclefinder == None):
+                cyclefinder = CycleFinder(skeleton)
+                cycleintersection = CycleIntersection(skeleton, cyclefinder)
+            instance = move(skeleton, cyclefinder, cycleintersection,
+                            lazy=True)
+        else:
+            instance = move(skeleton, lazy=True)
+        for component in components(instance):
+            graph, _ = instance._action(component)(skeleton.fork())
+            yield move, component, graph
+
+class MoveSearch:
+    """
+    breadth first search of the graphs reachable from a skeleton by moves,
+    identified up to isomorphism by their canonical hash. every graph is
+    reported with the shortest sequence of moves that reaches it. states are
+    records (parent hash, move class, component, depth), where the component is
+    labeled as in the graph reached by the parent's path.
+    """
+
+    def __init__(self, skeleton, moves=MOVES, max_depth=None,
+                 max_vertices=None, max_states=None):
+        """
+        :param skeleton: a ColoredDigraph object, the root of the search.
+        :param moves: the move classes by which graphs are expanded.
+        :param max_depth: optional, graphs this many moves from the root are
+        not expanded.
+        :param max_vertices: optional, graphs with more vertices are discarded.
+        :param max_states: optional, the search stops once this many graphs
+        are discovered. the graph being expanded is expanded completely, so
+        that the search can be continued, and a few more may be discovered.
+        """
+        self.graph = skeleton.fork()
+        self.moves = moves
+        self.max_depth = max_depth
+        self.max_vertices = max_vertices
+        self.max_states = max_states
+        self.root = canonical_hash(self.graph)
+        # canonical hash -> (parent hash, move class, component, depth)
+        self.states = {self.root: (None, None, None, 0)}
+        # tuples (hash, graph, depth) of the graphs left to expand
+        self.frontier = deque([(self.root, self.graph, 0)])
+        self.expanded = 0
+        # seconds spent in `run`
+        self.elapsed = 0.0
+
+    def __len__(self):
+        return len(self.states)
+
+    def __contains__(self, h):
+        return (h in self.states)
+
+    def done(self):
+        """
+        :return: boolean, True when nothing is left to expand, or the state
+        bound is reached.
+        """
+        return ((len(self.frontier) == 0) or
+                ((self.max_states != None) and
+                 (len(self.states) >= self.max_states)))
+
+    def _pop(self):
+        """
+        :return: the next tuple (hash, graph, depth) to expand.
+        """
+        return self.frontier.popleft()
+
+    def _push(self, h, graph, depth):
+        self.frontier.append((h, graph, depth))
+
+    def _admit(self, graph, depth):
+        """
+        :return: boolean, True iff a discovered graph is within the bounds.
+        """
+        return ((self.max_vertices == None) or
+                (graph.V() <= self.max_vertices))
+
+    def step(self):
+        """
+        expands the next graph of the frontier.
+        :return: the list of hashes discovered.
+        """
+        h, graph, depth = self._pop()
+        self.expanded += 1
+        discovered = []
+        if ((self.max_depth != None) and (depth >= self.max_depth)):
+            return discovered
+        for move, component, child in expand(graph, self.moves):
+            if (not self._admit(child, depth+1)):
+                continue
+            c = canonical_hash(child)
+            if (c in self.states):
+                continue
+            self.states[c] = (h, move, component, depth+1)
+            self._push(c, child, depth+1)
+            discovered.append(c)
+        return discovered
+
+    def run(self, checkpoint=None, interval=60):
+        """
+        expands graphs until the frontier is empty, or a bound is reached.
+        :param checkpoint: optional, the path of a file to which the search is
+        saved every `interval` seconds, and when it ends. see `resume`.
+        :param interval: seconds between checkpoints.
+        :return: the dictionary of states, keyed by canonical hash.
+        """
+        start, elapsed = time(), self.elapsed
+        last = start
+        while (not self.done()):
+            self.step()
+            if ((checkpoint != None) and (time() - last >= interval)):
+                self.elapsed = elapsed + (time() - start)
+                self.save(checkpoint)
+                last = time()
+        self.elapsed = elapsed + (time() - start)
+        if (checkpoint != None):
+            self.save(checkpoint)
+        return self.states
+
+    def save(self, path):
+        """
+        writes the search, with its frontier, states and counts, to a
+        checkpoint file. see `resume`.
+        :param path: the path of the file.
+        """
+        save(self, path)
+
+    def path(self, h):
+        """
+        :param h: the canonical hash of a discovered graph.
+        :return: the list of steps (move class, component) from the root.
+        """
+        steps = []
+        while (h != self.root):
+            h, move, component, _ = self.states[h]
+            steps.append((move, component))
+        return steps[::-1]
+
+    def replay(self, h):
+        """
+        :param h: the canonical hash of a discovered graph.
+        :return: the graph, rebuilt by moves from the root.
+        """
+        sequence = MoveSequence(self.graph)
+        sequence.extend(self.path(h))
+        return sequence.graph
@@ -0,0 +1,250 @@
+from ..kgraph import ColoredDigraph
+from ..moves import C, CInverse, P, PInverse
+from .canonical import canonical_hash
+from .engine import MOVES
+
+from collections import namedtuple
+
+# invariants of a graph under the moves. a graph's vertices are regular when
+# they have an incoming edge, as in the moves, and singular otherwise.
+#  bowen_franks: the torsion of the Bowen-Franks group, as its invariant
+#                factors greater than one, and its free rank.
+#  k1:           the rank of the kernel of the same map.
+#  det_sign:     the sign of det(I - A). it is flipped by (C) and (P), so it
+#                only tells graphs apart under the other moves.
+#  singular:     the number of singular vertices.
+#  ideals:       the canonical hash of the ideal structure, see `ideals`.
+Invariants = namedtuple('Invariants',
+                        ['bowen_franks', 'k1', 'det_sign', 'singular',
+                         'ideals'])
+
+# canonical hash -> Invariants
+_cache = dict()
+
+def _matrix(graph):
+    """
+    :param graph: a ColoredDigraph object with one color.
+    :return: the list of vertices, and the adjacency matrix A over them, with
+    A[i][j] the number of edges from the i-th vertex to the j-th.
+    """
+    vertices = list(graph.vertices())
+    index = {v: i for i, v in enumerate(vertices)}
+    A = [[0]*len(vertices) for _ in vertices]
+    for v in vertices:
+        for w in graph.adj(v)[0]:
+            A[index[v]][index[w]] += 1
+    return vertices, A
+
+def smith_normal_form(matrix):
+    """
+    the diagonal of the Smith normal form of an integer matrix, by row and
+    column operations over the integers.
+    :param matrix: a list of rows, lists of ints. it is not modified.
+    :return: the nonzero invariant factors d1 | d2 | ..., positive and in
+    order; their number is the rank of the matrix.
+    """
+    M = [list(row) for row in matrix if any(row)]
+    factors = []
+    while M:
+        n = len(M[0])
+        # the pivot is an entry of least absolute value
+        _, i, j = min((abs(x), i, j) for i, row in enumerate(M)
+                      for j, x in enumerate(row) if (x != 0))
+        while True:
+            p = M[i][j]
+            # reduce the pivot's row and column by it; a nonzero remainder
+            # is a smaller pivot
+            for r in range(len(M)):
+                if ((r != i) and (M[r][j] != 0)):
+                    q = M[r][j] // p
+                    M[r] = [a - q*b for a, b in zip(M[r], M[i])]
+            for c in range(n):
+                if ((c != j) and (M[i][c] != 0)):
+                    q = M[i][c] // p
+                    for row in M:
+                        row[c] -= q*row[j]
+            rest = [(abs(M[r][j]), r, j) for r in range(len(M))
+                    if ((r != i) and (M[r][j] != 0))]
+            rest += [(abs(M[i][c]), i, c) for c in range(n)
+                     if ((c != j) and (M[i][c] != 0))]
+            if rest:
+                _, i, j = min(rest)
+                continue
+            # the pivot must divide every other entry; if not, adding the
+            # row of an entry it misses gives a smaller remainder
+            r = next((r for r, row in enumerate(M)
+                      if ((r != i) and any(x % p for x in row))), None)
+            if (r == None):
+                break
+            M[i] = [a + b for a, b in zip(M[i], M[r])]
+        factors.append(abs(p))
+        M = [row[:j] + row[j+1:] for r, row in enumerate(M) if (r != i)]
+        M = [row for row in M if any(row)]
+    return factors
+
+def bowen_franks(graph):
+    """
+    the Bowen-Franks group of a graph, the cokernel of the map taking each
+    regular vertex v to v minus the sum of the sources of the edges into it;
+    i.e. of I - A^t, restricted to the regular vertices. it is the K0 group of
+    the graph's C*-algebra.
+    :param graph: a ColoredDigraph object with one color.
+    :return: the torsion of the group, as a tuple of its invariant factors
+    greater than one, its free rank, and the rank of the kernel of the map.
+    """
+    vertices, A = _matrix(graph)
+    n = len(vertices)
+    regular = [j for j in range(n) if any(A[i][j] for i in range(n))]
+    # the map, as the rows of its transpose, one per regular vertex
+    rows = [[int(i == j) - A[i][j] for i in range(n)] for j in regular]
+    factors = smith_normal_form(rows)
+    rank = len(factors)
+    return (tuple(d for d in factors if (d > 1)), n - rank,
+            len(regular) - rank)
+
+def det_sign(graph):
+    """
+    :param graph: a ColoredDigraph object with one color.
+    :return: the sign of det(I - A), by fraction free elimination.
+    """
+    _, A = _matrix(graph)
+    n = len(A)
+    M = [[int(i == j) - A[i][j] for j in range(n)] for i in range(n)]
+    sign, previous = 1, 1
+    for t in range(n):
+        p = next((r for r in range(t, n) if (M[r][t] != 0)), None)
+        if (p == None):
+            return 0
+        if (p != t):
+            M[t], M[p] = M[p], M[t]
+            sign = -sign
+        # Bareiss: every entry stays an integer, the minor of its rows and
+        # columns so far
+        for r in range(t+1, n):
+            M[r] = [(M[t][t]*M[r][c] - M[r][t]*M[t][c]) // previous
+                    for c in range(n)]
+        previous = M[t][t]
+    return sign * ((previous > 0) - (previous < 0))
+
+def singular(graph):
+    """
+    :param graph: a ColoredDigraph object with one color.
+    :return: the number of singular vertices, those with no incoming edge.
+    """
+    return sum((len(graph.adj(v)[1]) == 0) for v in graph.vertices())
+
+def _components(graph):
+    """
+    the strongly connected components of a graph, by Tarjan's algorithm
+    without recursion.
+    :return: a dictionary from each vertex to the index of its component.
+    components are numbered so that edges go to lower or equal indices.
+    """
+    index, low, component = dict(), dict(), dict()
+    stack, count = [], 0
+    for root in graph.vertices():
+        if (root in index):
+            continue
+        work = [(root, iter(graph.adj(root)[0]))]
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        while work:
+            v, successors = work[-1]
+            w = next((w for w in successors if (w not in index)), None)
+            if (w != None):
+                index[w] = low[w] = len(index)
+                stack.append(w)
+                work.append((w, iter(graph.adj(w)[0])))
+                continue
+            work.pop()
+            for w in graph.adj(v)[0]:
+                if (w not in component):
+                    low[v] = min(low[v], low[w])
+            if (low[v] == index[v]):
+                while True:
+                    w = stack.pop()
+                    component[w] = count
+                    if (w == v):
+                        break
+                count += 1
+    return component
+
+def ideals(graph):
+    """
+    a summary of the ideal structure of a graph's C*-algebra, as a graph of
+    its strongly connected components. there is a vertex per component with a
+    cycle, with one loop if the component is a single cycle and two
+    otherwise, and a vertex without loops per singular vertex; and an edge
+    between two of them when the first reaches the second. the components
+    through which no cycle passes are left out, since moves remove them.
+    :param graph: a ColoredDigraph object with one color.
+    :return: the summary, as a ColoredDigraph object.
+    """
+    component = _components(graph)
+    # per component, its vertices, its inner edges, and whether it is a
+    # singular vertex
+    vertices, edges, singular = dict(), dict(), dict()
+    for v in graph.vertices():
+        c = component[v]
+        vertices[c] = vertices.get(c, 0) + 1
+        edges.setdefault(c, 0)
+        for w in graph.adj(v)[0]:
+            edges[c] += (component[w] == c)
+        singular[c] = (len(graph.adj(v)[1]) == 0)
+    kept = [c for c in vertices if ((edges[c] > 0) or singular[c])]
+    # the components reached from each, in increasing order of index, so that
+    # every component reached is done first
+    successors = {c: set() for c in vertices}
+    for v in graph.vertices():
+        for w in graph.adj(v)[0]:
+            if (component[w] != component[v]):
+                successors[component[v]].add(component[w])
+    reached = dict()
+    for c in sorted(vertices):
+        reached[c] = set(successors[c])
+        for d in successors[c]:
+            reached[c] |= reached[d]
+    label = {c: i for i, c in enumerate(kept)}
+    summary = []
+    for c in kept:
+        if (edges[c] > 0):
+            loops = (1 if (edges[c] == vertices[c]) else 2)
+            summary += [(label[c], label[c], 0)]*loops
+        summary += [(label[c], label[d], 0) for d in reached[c]
+                    if (d in label)]
+    return ColoredDigraph(list(range(len(kept))), summary, 1)
+
+def invariants(graph):
+    """
+    the invariants of a graph under the moves, cached by its canonical hash so
+    that graphs met again, up to isomorphism, are not computed twice.
+    :param graph: a ColoredDigraph object with one color.
+    :return: an Invariants tuple.
+    """
+    h = canonical_hash(graph)
+    if (h not in _cache):
+        torsion, rank, k1 = bowen_franks(graph)
+        _cache[h] = Invariants((torsion, rank), k1, det_sign(graph),
+                               singular(graph), canonical_hash(ideals(graph)))
+    return _cache[h]
+
+def invariant_key(graph, moves=MOVES):
+    """
+    :param graph: a ColoredDigraph object with one color.
+    :param moves: the move classes allowed.
+    :return: the invariants preserved by every one of `moves`. graphs with
+    different keys are not connected by those moves.
+    """
+    result = invariants(graph)
+    if any((move in (C, CInverse, P, PInverse)) for move in moves):
+        result = result._replace(det_sign=None)
+    return result
+
+def distinguishes(graph, other, moves=MOVES):
+    """
+    :param graph, other: ColoredDigraph objects with one color.
+    :param moves: the move classes allowed.
+    :return: boolean, True when the invariants show that no sequence of
+    `moves` connects the graphs. False is inconclusive.
+    """
+    return (invariant_key(graph, moves) != invariant_key(other, moves))
@@ -0,0 +1,150 @@
+from .canonical import canonical_hash
+from .engine import MOVES, expand, MoveSearch
+
+from multiprocessing import Manager, Process, Queue, Value, cpu_count
+from queue import Empty
+from time import time
+
+class ParallelMoveSearch(MoveSearch):
+    """
+    a `MoveSearch` run by a pool of worker processes. the frontier is one
+    shared queue, from which idle workers pull the next graph; each worker
+    expands it, hashes the children, and claims the new ones in a visited set
+    sharded by hash across several manager processes. expansion dominates
+    the cost of a state, so the search scales with the number of workers.
+    workers expand graphs in no fixed order, so a graph may be recorded with
+    a longer path than the shortest one, and `max_depth` bounds the recorded
+    paths rather than the distance from the root.
+    """
+
+    # seconds a worker waits on an empty frontier before checking whether the
+    # search has ended
+    poll_interval = 0.05
+
+    def __init__(self, skeleton, moves=MOVES, max_depth=None,
+                 max_vertices=None, max_states=None, processes=None,
+                 shards=None):
+        """
+        :param processes: optional, the number of worker processes. defaults
+        to the number of cpus.
+        :param shards: optional, the number of shards of the visited set.
+        defaults to the number of worker processes.
+        :param moves, max_depth, max_vertices, max_states: see `MoveSearch`.
+        """
+        super().__init__(skeleton, moves, max_depth, max_vertices, max_states)
+        self.processes = (processes if (processes != None) else cpu_count())
+        self.shards = (shards if (shards != None) else self.processes)
+
+    def run(self, checkpoint=None, interval=60):
+        """
+        expands graphs in the worker processes until the frontier is empty, or
+        a bound is reached. graphs discovered but not expanded are left in
+        `self.frontier`.
+        :param checkpoint: optional, the path of a file to which the search is
+        saved when it ends. the shared frontier cannot be read without taking
+        it from the workers, so no checkpoint is written while they run;
+        raising `max_states` between runs gives periodic checkpoints.
+        :param interval: unused, see `MoveSearch.run`.
+        :return: the dictionary of states, keyed by canonical hash.
+        """
+        if self.done():
+            if (checkpoint != None):
+                self.save(checkpoint)
+            return self.states
+        start = time()
+        managers = [Manager() for _ in range(self.shards)]
+        try:
+            shards = [manager.dict() for manager in managers]
+            for h, record in self.states.items():
+                _shard(h, shards)[h] = record
+            frontier = Queue()
+            # graphs queued or being expanded; the search ends at zero
+            pending = Value('l', len(self.frontier))
+            count = Value('l', len(self.states))
+            expanded = Value('l', 0)
+            while self.frontier:
+                frontier.put(self.frontier.popleft())
+            workers = [Process(target=_worker,
+                               args=(frontier, shards, pending, count,
+                                     expanded, self.moves, self.max_depth,
+                                     self.max_vertices, self.max_states,
+                                     self.poll_interval))
+                       for _ in range(self.processes)]
+            for worker in workers:
+                worker.start()
+            while any(worker.is_alive() for worker in workers):
+                for worker in workers:
+                    worker.join(self.poll_interval)
+                if self._full(count):
+                    # the workers stop pulling, and cannot exit before the
+                    # graphs they queued are read
+                    self._drain(frontier)
+            self._drain(frontier)
+            self.expanded += expanded.value
+            for shard in shards:
+                self.states.update(shard.copy())
+        finally:
+            for manager in managers:
+                manager.shutdown()
+        self.elapsed += time() - start
+        if (checkpoint != None):
+            self.save(checkpoint)
+        return self.states
+
+    def _full(self, count):
+        return ((self.max_states != None) and (count.value >= self.max_states))
+
+    def _drain(self, frontier):
+        """
+        moves the graphs left in the shared queue to `self.frontier`.
+        """
+        while True:
+            try:
+                self.frontier.append(frontier.get(timeout=self.poll_interval))
+            except Empty:
+                return
+
+def _shard(h, shards):
+    # the shard holding a canonical hash
+    return shards[int(h[:8], 16) % len(shards)]
+
+def _worker(frontier, shards, pending, count, expanded, moves, max_depth,
+            max_vertices, max_states, poll_interval):
+    # pulls graphs from the frontier until the search ends
+    while True:
+        if ((max_states != None) and (count.value >= max_states)):
+            return
+        try:
+            h, graph, depth = frontier.get(timeout=poll_interval)
+        except Empty:
+            if (pending.value == 0):
+                return
+            continue
+        try:
+            if ((max_depth != None) and (depth >= max_depth)):
+                continue
+            with expanded.get_lock():
+                expanded.value += 1
+            # the hashes of the children seen so far; a move may list the
+            # same component more than once
+            children = set()
+            for move, component, child in expand(graph, moves):
+                if ((max_vertices != None) and (child.V() > max_vertices)):
+                    continue
+                c = canonical_hash(child)
+                if (c in children):
+                    continue
+                children.add(c)
+                record = (h, move, component, depth+1)
+                # only the first record of a hash is stored, and only the
+                # worker that stored it queues the graph
+                if (_shard(c, shards).setdefault(c, record) != record):
+                    continue
+                with count.get_lock():
+                    count.value += 1
+                with pending.get_lock():
+                    pending.value += 1
+                frontier.put((c, child, depth+1))
+        finally:
+            with pending.get_lock():
+                pending.value -= 1
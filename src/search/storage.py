@@ -0,0 +1,210 @@
+from .engine import MOVES, MoveSearch
+
+from math import log
+import pickle
+import sqlite3
+
+class BloomFilter:
+    """
+    a set of hex digests, such as canonical hashes, in a fixed number of
+    bits. membership may be a false positive, at about `error_rate` once
+    `capacity` keys are added, but never a false negative.
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        """
+        :param capacity: the number of keys expected.
+        :param error_rate: the rate of false positives at `capacity` keys.
+        """
+        self.size = max(8, int(-capacity * log(error_rate) / log(2)**2))
+        self.hashes = max(1, round(self.size / capacity * log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        """
+        :param key: a hex digest of at least 32 digits
+        :return: the bits of the key, by double hashing on two of its words.
+        """
+        a, b = int(key[:16], 16), (int(key[16:32], 16) | 1)
+        return [(a + i*b) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for i in self._positions(key):
+            self._bits[i >> 3] |= (1 << (i & 7))
+
+    def __contains__(self, key):
+        return all((self._bits[i >> 3] >> (i & 7)) & 1
+                   for i in self._positions(key))
+
+class DiskStates:
+    """
+    the states of a search, keyed by canonical hash, in a sqlite table. a
+    Bloom filter of the stored hashes answers most lookups of new graphs
+    without reading the table.
+    """
+
+    def __init__(self, connection, capacity=10**6, error_rate=0.01):
+        """
+        :param connection: a sqlite3 connection.
+        :param capacity, error_rate: see `BloomFilter`.
+        """
+        self._db = connection
+        self._db.execute("CREATE TABLE IF NOT EXISTS states "
+                         "(hash TEXT PRIMARY KEY, record BLOB)")
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._len = 0
+        for (h,) in self._db.execute("SELECT hash FROM states"):
+            self._bloom.add(h)
+            self._len += 1
+
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, h):
+        if (h not in self._bloom):
+            return False
+        return (self._db.execute("SELECT 1 FROM states WHERE hash = ?",
+                                 (h,)).fetchone() != None)
+
+    def __getitem__(self, h):
+        row = self._db.execute("SELECT record FROM states WHERE hash = ?",
+                               (h,)).fetchone()
+        if (row == None):
+            raise KeyError(h)
+        return pickle.loads(row[0])
+
+    def __setitem__(self, h, record):
+        if (h not in self):
+            self._len += 1
+        self._bloom.add(h)
+        self._db.execute("INSERT OR REPLACE INTO states VALUES (?, ?)",
+                         (h, pickle.dumps(record)))
+
+    def __iter__(self):
+        return (h for (h,) in self._db.execute("SELECT hash FROM states"))
+
+    def items(self):
+        return ((h, pickle.loads(record)) for h, record in
+                self._db.execute("SELECT hash, record FROM states"))
+
+    def update(self, states):
+        for h, record in states.items():
+            self[h] = record
+
+class DiskFrontier:
+    """
+    a first in, first out queue of the graphs left to expand, in a sqlite
+    table. it has the methods of `collections.deque` used by the searches.
+    """
+
+    def __init__(self, connection):
+        """
+        :param connection: a sqlite3 connection.
+        """
+        self._db = connection
+        self._db.execute("CREATE TABLE IF NOT EXISTS frontier "
+                         "(id INTEGER PRIMARY KEY AUTOINCREMENT, item BLOB)")
+        self._len = self._db.execute(
+            "SELECT COUNT(*) FROM frontier").fetchone()[0]
+
+    def __len__(self):
+        return self._len
+
+    def append(self, item):
+        self._db.execute("INSERT INTO frontier (item) VALUES (?)",
+                         (pickle.dumps(item),))
+        self._len += 1
+
+    def popleft(self):
+        row = self._db.execute("SELECT id, item FROM frontier "
+                               "ORDER BY id LIMIT 1").fetchone()
+        if (row == None):
+            raise IndexError("pop from an empty frontier")
+        self._db.execute("DELETE FROM frontier WHERE id = ?", (row[0],))
+        self._len -= 1
+        return pickle.loads(row[1])
+
+    def __iter__(self):
+        return (pickle.loads(item) for (item,) in
+                self._db.execute("SELECT item FROM frontier ORDER BY id"))
+
+class DiskMoveSearch(MoveSearch):
+    """
+    a `MoveSearch` whose states and frontier are kept in a sqlite database
+    rather than in memory, so that its size is bounded by disk. only the
+    Bloom filter of the visited hashes stays in memory, at about 10 bits per
+    state for a 1% false positive rate.
+    """
+
+    # steps between commits of the database
+    commit_interval = 256
+
+    def __init__(self, skeleton, path, moves=MOVES, max_depth=None,
+                 max_vertices=None, max_states=None, capacity=10**6,
+                 error_rate=0.01):
+        """
+        :param path: the path of the database file. its tables are emptied.
+        :param capacity, error_rate: see `BloomFilter`. a larger search still
+        runs, with more lookups of the table.
+        :param skeleton, moves, max_depth, max_vertices, max_states: see
+        `MoveSearch`.
+        """
+        super().__init__(skeleton, moves, max_depth, max_vertices, max_states)
+        self.database = path
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._connect()
+        self._db.execute("DROP TABLE IF EXISTS states")
+        self._db.execute("DROP TABLE IF EXISTS frontier")
+        states, frontier = self.states, self.frontier
+        self.states = DiskStates(self._db, capacity, error_rate)
+        self.states.update(states)
+        self.frontier = DiskFrontier(self._db)
+        for item in frontier:
+            self.frontier.append(item)
+        self._db.commit()
+
+    def _connect(self):
+        self._db = sqlite3.connect(self.database)
+        # writes need not survive a power loss, only the process
+        self._db.execute("PRAGMA synchronous = OFF")
+        self._db.execute("PRAGMA journal_mode = WAL")
+
+    def __getstate__(self):
+        # the states and frontier are saved by the database itself
+        state = self.__dict__.copy()
+        del state['_db'], state['states'], state['frontier']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._connect()
+        self.states = DiskStates(self._db, self.capacity, self.error_rate)
+        self.frontier = DiskFrontier(self._db)
+
+    def step(self):
+        discovered = super().step()
+        if ((self.expanded % self.commit_interval) == 0):
+            self._db.commit()
+        return discovered
+
+    def run(self, checkpoint=None, interval=60):
+        super().run(checkpoint, interval)
+        self._db.commit()
+        return self.states
+
+    def save(self, path):
+        """
+        commits the database, and writes the rest of the search to a
+        checkpoint file. the checkpoint refers to the database, which must be
+        kept with it; a resumed search continues from the last commit.
+        """
+        self._db.commit()
+        super().save(path)
+
+    def close(self):
+        """
+        commits and closes the database.
+        """
+        self._db.commit()
+        self._db.close()
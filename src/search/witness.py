@@ -0,0 +1,197 @@
+from ..moves.cuntzsplice import CuntzSplice
+from ..moves.cycles_interface import LocalCycleFinder
+from .canonical import canonical_hash, isomorphism
+from .engine import INVERSES
+
+# the errors of a move given a malformed component
+_MALFORMED = (ValueError, KeyError, IndexError, TypeError, StopIteration)
+
+def _instance(move, graph):
+    """
+    :return: a lazy move on `graph`, acting in place, whose cycle conditions
+    are decided by searches local to the vertices checked.
+    """
+    if issubclass(move, CuntzSplice):
+        return move(graph, LocalCycleFinder(graph), in_place=True, lazy=True)
+    return move(graph, in_place=True, lazy=True)
+
+def _viable(graph, move, component):
+    """
+    :return: boolean, True iff the component is viable for the move on
+    `graph`, by the move's own `_viable`.
+    """
+    try:
+        return _instance(move, graph)._viable(component)
+    except _MALFORMED:
+        # e.g. a component with vertices not in the graph
+        return False
+
+def _apply(graph, move, component):
+    """
+    performs a move in place, without checking it.
+    :return: the graph, the inverse component, and the lists of the vertices
+    created and deleted.
+    """
+    created, deleted = [], []
+    def _record(event, *args):
+        if (event == 'add_vertex'):
+            created.append(args[0])
+        elif (event == 'del_vertex'):
+            deleted.append(args[0])
+    graph.subscribe(_record)
+    try:
+        graph, inverse_component = _instance(move, graph)._action(
+            component)(graph)
+    finally:
+        graph.unsubscribe(_record)
+    return graph, inverse_component, created, deleted
+
+def _frozen(component):
+    """
+    :return: the component, hashable, with its sets frozen.
+    """
+    if (type(component) == int):
+        return component
+    elif isinstance(component, (set, frozenset)):
+        return frozenset(_frozen(x) for x in component)
+    else:
+        return tuple(_frozen(x) for x in component)
+
+def verify(skeleton, steps, target=None):
+    """
+    replays a witness, checking every step with the `_viable` of its move. no
+    move runs its full `_check`, and the cycles of the cycle based moves are
+    sought only from the vertices checked, so the cost of a step does not
+    grow with the rest of the graph.
+    :param skeleton: a ColoredDigraph object, the start of the witness. it is
+    not modified.
+    :param steps: an iterable of tuples whose first two entries are a move
+    class and a component, as in `MoveSequence.extend`.
+    :param target: optional, a ColoredDigraph object the witness should end
+    at, up to isomorphism.
+    :return: boolean, True iff every step is viable, and the last graph is
+    isomorphic to `target`.
+    """
+    graph = skeleton.fork()
+    for step in steps:
+        move, component = step[0], step[1]
+        if (not _viable(graph, move, component)):
+            return False
+        try:
+            graph = _apply(graph, move, component)[0]
+        except _MALFORMED:
+            # viable, but not a component the move acts on
+            return False
+    return ((target == None) or
+            (canonical_hash(graph) == canonical_hash(target)))
+
+def optimize(skeleton, steps):
+    """
+    shortens a witness. the steps are replayed in order, and
+      (i)   a step that undoes an earlier one, as (C)^{-1} at the motif of a
+            (C), drops both. the steps between them are commuted past the
+            pair, and replayed with local checks as in `verify`; if one is no
+            longer viable, or the result differs, the pair is kept.
+      (ii)  a step that returns to a graph met before, up to isomorphism,
+            drops the steps since.
+    the witness returned ends at a graph isomorphic to the end of `steps`.
+    :param skeleton: a ColoredDigraph object, the start of the witness. it is
+    not modified.
+    :param steps: an iterable of tuples whose first two entries are a move
+    class and a component, viable in turn from `skeleton`.
+    :return: the shorter list of steps (move class, component).
+    """
+    # the witness as given, and the witness kept, followed along
+    original = skeleton.fork()
+    graph = skeleton.fork()
+    # from the vertices of `original` to those of `graph`
+    mapping = dict((v,v) for v in graph.vertices())
+    # the steps kept, as dictionaries of the move, its component, the graph
+    # before it, its inverse component, and the vertices it created
+    kept = []
+    # the canonical hash of the graph after each prefix of `kept`, and the
+    # shortest prefix reaching each hash
+    hashes = [canonical_hash(graph)]
+    seen = {hashes[0]: 0}
+    # (move, component) of the step that would undo a kept step -> its index
+    partners = dict()
+
+    def _record(move, component, before, inverse, created):
+        kept.append(dict(move=move, component=component, before=before,
+                         inverse=inverse, created=created))
+        if (move in INVERSES):
+            partners[(INVERSES[move], _frozen(inverse))] = len(kept) - 1
+
+    def _truncate(n):
+        del kept[n:]
+        del hashes[n+1:]
+        seen.clear()
+        for k, h in enumerate(hashes):
+            seen.setdefault(h, k)
+
+    def _cancel(i):
+        """
+        replays the steps after `kept[i]` without it, from the graph before
+        it, relabeling their components.
+        :return: the graph reached, and the list of steps replayed, or None
+        when one of them acts on a vertex of the cancelled step, or is not
+        viable.
+        """
+        replay = kept[i]['before'].fork()
+        relabel = dict((v,v) for v in replay.vertices())
+        replayed = []
+        for step in kept[i+1:]:
+            move = step['move']
+            try:
+                component = move._relabel(step['component'], relabel)
+            except KeyError:
+                return None
+            if (not _viable(replay, move, component)):
+                return None
+            before = replay.fork()
+            _, inverse, created, _ = _apply(replay, move, component)
+            if (len(created) != len(step['created'])):
+                return None
+            relabel.update(zip(step['created'], created))
+            replayed.append((move, component, before, inverse, created))
+        return replay, replayed
+
+    for step in steps:
+        move, component = step[0], step[1]
+        _, _, created, deleted = _apply(original, move, component)
+        component = move._relabel(component, mapping)
+        i = partners.get((move, _frozen(component)))
+        cancelled = None
+        if ((i != None) and (i < len(kept)) and
+            (INVERSES.get(kept[i]['move']) == move) and
+            (_frozen(kept[i]['inverse']) == _frozen(component))):
+            cancelled = _cancel(i)
+        p = (isomorphism(original, cancelled[0])
+             if (cancelled != None) else None)
+        if (p != None):
+            graph, replayed = cancelled
+            _truncate(i)
+            for record in replayed:
+                if (record is not replayed[0]):
+                    hashes.append(canonical_hash(record[2]))
+                    seen.setdefault(hashes[-1], len(hashes) - 1)
+                _record(*record)
+            mapping = p
+        else:
+            before = graph.fork()
+            _, inverse, new, _ = _apply(graph, move, component)
+            # a label may be deleted, then created again
+            for v in deleted:
+                mapping.pop(v, None)
+            mapping.update(zip(created, new))
+            _record(move, component, before, inverse, new)
+        h = canonical_hash(graph)
+        if (seen.get(h, len(kept)) < len(kept)):
+            # back at a graph met before: drop the steps since
+            graph = kept[seen[h]]['before']
+            mapping = isomorphism(original, graph)
+            _truncate(seen[h])
+        else:
+            hashes.append(h)
+            seen.setdefault(h, len(kept))
+    return [(step['move'], step['component']) for step in kept]
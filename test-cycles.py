@@ -0,0 +1,223 @@
+from src.kgraph import ColoredDigraph
+from src.moves.cycles_interface import (CycleFinder, CycleIntersection,
+                                       CycleStatistics)
+from src.moves.python_simple_cycles import parallel_simple_cycles
+
+import random
+
+def key(cycle):
+    """
+    :return: the cycle as a tuple, rotated to start at its least vertex.
+    """
+    i = cycle.index(min(cycle))
+    return tuple(cycle[i:] + cycle[:i])
+
+def cycles_at(cyclefinder, vertices):
+    """
+    :return: a dictionary from each vertex to the sorted keys of its cycles.
+    """
+    return dict((v, sorted(key(cyclefinder.cycles[c])
+                           for c in cyclefinder[v]))
+                for v in vertices)
+
+def brute_cycles(graph):
+    """
+    :return: the set of keys of the simple cycles of the graph, found by
+    extending every path from its least vertex.
+    """
+    found = set()
+    def extend(path):
+        for w in set(graph.adj(path[-1])[0]):
+            if (w == path[0]):
+                found.add(tuple(path))
+            elif ((w > path[0]) and (w not in path)):
+                extend(path + [w])
+    for v in graph.vertices():
+        extend([v])
+    return found
+
+def random_graph(rng, V, E):
+    return ColoredDigraph(vertices=list(range(V)),
+                          edges=[(rng.randrange(V),rng.randrange(V),0)
+                                 for _ in range(E)],
+                          k=1)
+
+def mutate(rng, graph):
+    """
+    adds or deletes a random edge or vertex.
+    """
+    vertices = graph.vertices()
+    op = rng.random()
+    if (op < 0.35):
+        graph.add_edge(rng.choice(vertices), rng.choice(vertices), 0)
+    elif ((op < 0.6) and (graph.E() > 0)):
+        v = rng.choice([v for v in vertices if (len(graph.adj(v)[0]) > 0)])
+        graph.del_edge(v, rng.choice(graph.adj(v)[0]), 0)
+    elif ((op < 0.75) and (len(vertices) > 1)):
+        graph.del_vertex(rng.choice(vertices))
+    else:
+        graph.add_vertex()
+
+def test_incremental():
+    """
+    an incremental cycle finder, queried at random vertices along random
+    mutations, agrees with a cycle finder built on each graph. a small path
+    budget makes some added edges fall back to a search of their component.
+    """
+    rng = random.Random(28)
+    for trial in range(100):
+        g = random_graph(rng, rng.randint(1,6), rng.randint(0,10))
+        cyclefinder = CycleFinder(g, incremental=True)
+        cyclefinder.path_budget = rng.choice([2, 5, 4096])
+        for step in range(12):
+            mutate(rng, g)
+            probe = rng.sample(g.vertices(), rng.randint(0, g.V()))
+            assert (cycles_at(cyclefinder, probe) ==
+                    cycles_at(CycleFinder(g), probe))
+        cyclefinder.detach()
+
+def test_recycled_indices():
+    """
+    the index of a lost cycle is given to the next cycle found, so the
+    bitsets do not grow over a long incremental session.
+    """
+    # two triangles through 0, and an edge that closes and opens a third
+    g = ColoredDigraph(vertices=[0,1,2,3,4,5],
+                       edges=[(0,1,0),(1,2,0),(2,0,0),
+                              (0,3,0),(3,4,0),(4,0,0),(0,5,0)],
+                       k=1)
+    cyclefinder = CycleFinder(g, incremental=True)
+    assert cyclefinder.C() == 2
+    for _ in range(1000):
+        g.add_edge(5,0,color=0)
+        g.del_edge(5,0,color=0)
+        g.del_edge(1,2,color=0)
+        g.add_edge(1,2,color=0)
+    assert cyclefinder.C() == 2
+    assert sorted(cyclefinder.cycles) == [0,1]
+    assert cyclefinder.tau(0) == 0b11
+    g.add_edge(5,0,color=0)
+    assert sorted(cyclefinder.cycles) == [0,1,2]
+    cyclefinder.detach()
+
+def test_statistics():
+    """
+    the counts of cycle statistics, per vertex, per length, and per strongly
+    connected component, are those of the cycles.
+    """
+    rng = random.Random(26)
+    for trial in range(100):
+        g = random_graph(rng, rng.randint(1,7), rng.randint(0,14))
+        cycles = brute_cycles(g)
+        statistics = CycleStatistics(g)
+        assert statistics.C() == len(cycles)
+        for v in g.vertices():
+            assert statistics[v] == sum((v in c) for c in cycles)
+        histogram = dict()
+        for c in cycles:
+            histogram[len(c)] = histogram.get(len(c), 0) + 1
+        assert statistics.histogram() == histogram
+        components = statistics.components()
+        assert sorted(v for vertices, _ in components for v in vertices) == \
+               sorted(g.vertices())
+        for vertices, count in components:
+            assert count == sum((c[0] in vertices) for c in cycles)
+
+def test_lazy():
+    """
+    a query at a vertex searches the strongly connected component of the
+    vertex only, and finds the same cycles as a search of the whole graph.
+    """
+    rng = random.Random(27)
+    for trial in range(100):
+        g = random_graph(rng, rng.randint(1,8), rng.randint(0,12))
+        cycles = brute_cycles(g)
+        cyclefinder = CycleFinder(g)
+        v = rng.choice(g.vertices())
+        s = cyclefinder.scc(v)
+        scc = set(w for w in g.vertices() if (cyclefinder.scc(w) == s))
+        assert sorted(key(cyclefinder.cycles[c]) for c in cyclefinder[v]) == \
+               sorted(c for c in cycles if (v in c))
+        assert all(set(cycle) <= scc for cycle in cyclefinder.cycles.values())
+        assert sorted(key(cyclefinder.cycles[c])
+                      for c in cyclefinder.component(s)) == \
+               sorted(c for c in cycles if (c[0] in scc))
+        assert cyclefinder.C() == len(cycles)
+        assert sorted(map(key, cyclefinder.cycles.values())) == sorted(cycles)
+
+def test_intersection():
+    """
+    the intersections read from the bitsets are those of the cycles.
+    """
+    rng = random.Random(29)
+    for trial in range(100):
+        g = random_graph(rng, rng.randint(1,7), rng.randint(0,14))
+        cyclefinder = CycleFinder(g)
+        cycleintersection = CycleIntersection(g, cyclefinder)
+        cycleintersection.C()
+        cycles = dict((c, set(cycle))
+                      for c, cycle in cyclefinder.cycles.items())
+        meets = lambda c, d: (c != d) and (len(cycles[c] & cycles[d]) > 0)
+        assert cycleintersection.I() == \
+               sum(meets(c, d) for c in cycles for d in cycles) // 2
+        omit = set(rng.sample(g.vertices(), rng.randint(0, g.V())))
+        for c in cycles:
+            assert sorted(cycleintersection.intersect(c, lambda v: False)) == \
+                   sorted(d for d in cycles if meets(c, d))
+            # only the vertices mapped to False are intersected
+            assert sorted(cycleintersection.intersect(
+                c, lambda v: (v not in omit))) == \
+                   sorted(d for d in cycles
+                          if ((c != d) and (len(cycles[c] & cycles[d] & omit)
+                                            > 0)))
+            for d in cycles:
+                assert sorted(cycleintersection.intersect_vertices(c, d)) == \
+                       sorted(cycles[c] & cycles[d])
+            for v in g.vertices():
+                # the cycles reached from c through cycles avoiding v
+                reached, stack = set([c]), [c]
+                while stack:
+                    d = stack.pop()
+                    for e in cycles:
+                        if ((e not in reached) and (v not in cycles[e]) and
+                            meets(d, e)):
+                            reached.add(e)
+                            stack.append(e)
+                component = cycleintersection.component(v, c)
+                assert (component[0] == c) and \
+                       (sorted(component) == sorted(reached))
+
+def test_parallel():
+    """
+    a pool of processes finds each cycle once, whether it searches whole
+    components or splits them by start node, in the same order every time.
+    """
+    rng = random.Random(30)
+    for trial in range(4):
+        g = random_graph(rng, rng.randint(4,8), rng.randint(8,16))
+        adj = dict((v, g.adj(v)[0]) for v in g.vertices())
+        for partition in [1, 3, 32]:
+            cycles = list(parallel_simple_cycles(adj, 2, partition))
+            assert sorted(map(key, cycles)) == sorted(brute_cycles(g))
+            assert cycles == list(parallel_simple_cycles(adj, 2, partition))
+        cyclefinder = CycleFinder(g, processes=2)
+        cyclefinder.parallel_threshold = 2
+        assert sorted(map(key, cyclefinder.cycles.values())) == []
+        assert cyclefinder.C() == len(brute_cycles(g))
+        assert sorted(map(key, cyclefinder.cycles.values())) == \
+               sorted(brute_cycles(g))
+
+def main():
+    print("="*100)
+    print("cycles_interface test\n")
+    for test in [test_incremental,
+                 test_recycled_indices,
+                 test_statistics,
+                 test_lazy,
+                 test_intersection,
+                 test_parallel]:
+        test()
+        print(test.__name__, "passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+from src.kgraph import ColoredDigraph
+from src.moves import *
+from src.search import *
+
+import itertools
+import random
+
+def det(M):
+    """
+    :return: the determinant of a small square matrix, by the Leibniz formula.
+    """
+    total = 0
+    for p in itertools.permutations(range(len(M))):
+        term = (-1)**sum((p[i] > p[j]) for i in range(len(p))
+                         for j in range(i+1, len(p)))
+        for i, j in enumerate(p):
+            term *= M[i][j]
+        total += term
+    return total
+
+def loops(n):
+    """
+    :return: a graph of one vertex with n loops, the full n-shift.
+    """
+    return ColoredDigraph(vertices=[0], edges=[(0,0,0)]*n, k=1)
+
+def test_smith_normal_form():
+    matrix = [[2,4,4],[-6,6,12],[10,-4,-16]]
+    assert smith_normal_form(matrix) == [2,6,12]
+    assert matrix == [[2,4,4],[-6,6,12],[10,-4,-16]]
+    assert smith_normal_form([[2,0],[0,3]]) == [1,6]
+    assert smith_normal_form([[1,2],[2,4]]) == [1]
+    assert smith_normal_form([[0,0],[0,0]]) == []
+    assert smith_normal_form([[0,6,0,4]]) == [2]
+    # the factors divide each other, and their product is |det|
+    rng = random.Random(48)
+    for trial in range(200):
+        n = rng.randint(1,4)
+        M = [[rng.randint(-5,5) for _ in range(n)] for _ in range(n)]
+        factors = smith_normal_form(M)
+        assert all((b % a == 0) for a, b in zip(factors, factors[1:]))
+        product = (1 if (len(factors) == n) else 0)
+        for d in factors:
+            product *= d
+        assert product == abs(det(M))
+
+def test_bowen_franks():
+    """
+    the full n-shift has the group Z/(n-1), a cycle has Z, and a vertex with
+    no edges, singular, Z with no kernel.
+    """
+    assert bowen_franks(loops(1)) == ((), 1, 1)
+    assert bowen_franks(loops(2)) == ((), 0, 0)
+    assert bowen_franks(loops(5)) == ((4,), 0, 0)
+    cycle = ColoredDigraph(vertices=[0,1,2],
+                           edges=[(0,1,0),(1,2,0),(2,0,0)], k=1)
+    assert bowen_franks(cycle) == ((), 1, 1)
+    point = ColoredDigraph(vertices=[0], edges=[], k=1)
+    assert bowen_franks(point) == ((), 1, 0)
+    assert [det_sign(loops(n)) for n in range(1,4)] == [0, -1, -1]
+    assert det_sign(point) == 1
+    square = ColoredDigraph(vertices=[0,1],
+                            edges=[(0,0,0),(0,1,0),(1,0,0),(1,1,0)], k=1)
+    assert det_sign(square) == -1
+    assert singular(square) == 0
+    assert singular(point) == 1
+
+def test_ideals():
+    """
+    a singular vertex 0 reaches a loop at 1 through 5, and 1 reaches a
+    component {2,3} of more than a cycle. 5 is on no cycle, and is left out.
+    """
+    g = ColoredDigraph(vertices=[0,1,2,3,5],
+                       edges=[(0,5,0),(5,1,0),(1,1,0),(1,2,0),
+                              (2,3,0),(3,2,0),(3,3,0)],
+                       k=1)
+    expected = ColoredDigraph(vertices=[0,1,2],
+                              edges=[(0,1,0),(0,2,0),(1,1,0),(1,2,0),
+                                     (2,2,0),(2,2,0)],
+                              k=1)
+    assert canonical_hash(ideals(g)) == canonical_hash(expected)
+    # and kept by (R) at 5
+    h, _ = R(g)(5)(g)
+    assert canonical_hash(ideals(h)) == canonical_hash(expected)
+
+def test_invariant_key():
+    """
+    the key of a graph is preserved along random moves; and without (C) and
+    (P), the sign of det(I - A) is kept as well.
+    """
+    rng = random.Random(48)
+    without_flips = (S, SInverse, R, RInverse, I, IInverse, O, OInverse)
+    for moves in [MOVES, without_flips]:
+        for trial in range(25):
+            V = rng.randint(2,4)
+            g = ColoredDigraph(vertices=list(range(V)),
+                               edges=[(rng.randrange(V),rng.randrange(V),0)
+                                      for _ in range(rng.randint(V,2*V))],
+                               k=1)
+            key = invariant_key(g, moves)
+            assert (key.det_sign == None) == (moves == MOVES)
+            for step in range(60):
+                # keep the graphs small
+                allowed = [move for move in moves
+                           if ((g.V() < 8) or (move in (S, R, IInverse,
+                                                        OInverse)))]
+                move = rng.choice(allowed)
+                viable = move(g).viable
+                if (len(viable) == 0):
+                    continue
+                g, _ = move(g)(rng.choice(viable))(g)
+                assert invariant_key(g, moves) == key
+
+def test_distinguishes():
+    assert distinguishes(loops(2), loops(3))
+    assert not distinguishes(loops(2), loops(2))
+    # (C) flips the sign of det(I - A), so only the other moves see it
+    g = ColoredDigraph(vertices=[0,1],
+                       edges=[(0,0,0),(0,1,0),(1,0,0),(1,1,0)], k=1)
+    h, _ = C(g)(0)(g)
+    assert det_sign(g) == -det_sign(h)
+    assert not distinguishes(g, h)
+    assert distinguishes(g, h, moves=(S, R, I, O))
+
+def main():
+    print("="*100)
+    print("search/ invariants test\n")
+    for test in [test_smith_normal_form,
+                 test_bowen_franks,
+                 test_ideals,
+                 test_invariant_key,
+                 test_distinguishes]:
+        test()
+        print(test.__name__, "passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+from src.kgraph import ColoredDigraph
+from src.moves import *
+from src.moves.snapshot import CSRSnapshot
+from src.moves.cycles_interface import CycleFinder
+
+def signature(graph, v):
+    """
+    :return: the in-degree, out-degree and loop count of `v`.
+    """
+    adj_out, adj_in = graph.adj(v)
+    return (len(adj_in), len(adj_out), adj_out.count(v))
+
+def isomorphic(graph, other):
+    """
+    :return: true iff the 1-graphs are isomorphic, by a search for a bijection
+    of their vertices that keeps the signature of each vertex and the number
+    of edges between each pair.
+    """
+    if (sorted(signature(graph, v) for v in graph.vertices()) !=
+        sorted(signature(other, w) for w in other.vertices())):
+        return False
+    vertices = graph.vertices()
+    mapping = dict()
+    def extend(i):
+        if (i == len(vertices)):
+            return True
+        v = vertices[i]
+        for w in other.vertices():
+            if ((w in mapping.values()) or
+                (signature(graph, v) != signature(other, w))):
+                continue
+            mapping[v] = w
+            if all(((graph.adj(v)[0].count(x) ==
+                     other.adj(w)[0].count(mapping[x])) and
+                    (graph.adj(x)[0].count(v) ==
+                     other.adj(mapping[x])[0].count(w)))
+                   for x in vertices[:i+1]):
+                if extend(i+1):
+                    return True
+            del mapping[v]
+        return False
+    return extend(0)
+
+def round_trip(graph, move, inverse, component):
+    """
+    applies a move, then its inverse at the inverse component, and checks
+    that the graph is back to `graph`, up to isomorphism. the inverse raises a
+    ValueError if the inverse component is not viable.
+    :return: the graph after the move.
+    """
+    moved, inverse_component = move(graph)(component)(graph)
+    back, _ = inverse(moved)(inverse_component)(moved)
+    assert isomorphic(back, graph)
+    return moved
+
+def test_split_tables():
+    """
+    the inverse splits count neighbors in tables kept by the move. a check
+    must leave them as it found them, or later pairs are checked against
+    stale counts: here (1,2) was reported as insplit, though 1 and 2 have
+    different out-neighbors.
+    """
+    edges = [(2,0),(0,0),(1,0),(2,0),(1,1),(0,2)]
+    g = ColoredDigraph(vertices=[0,1,2],
+                       edges=[(v,w,0) for v,w in edges],
+                       k=1)
+    move = IInverse(g)
+    assert (1,2) not in move.viable
+    assert not any(move._out_adj_table.values())
+    assert not any(move._in_adj_table.values())
+    # the same graph, reversed, for (O)^{-1}
+    g = ColoredDigraph(vertices=[0,1,2],
+                       edges=[(w,v,0) for v,w in edges],
+                       k=1)
+    move = OInverse(g)
+    assert (1,2) not in move.viable
+    assert not any(move._out_adj_table.values())
+    assert not any(move._in_adj_table.values())
+
+def test_split_edges():
+    """
+    a pair is split only if its vertices share every edge on the duplicated
+    side. the edge 1 -> 0 used to be skipped as an edge to the other vertex
+    of the pair, so (0,1) was taken for an insplit though 0 -> 2 and 1 -> 0.
+    """
+    edges = [(0,2),(1,0),(3,1)]
+    g = ColoredDigraph(vertices=[0,1,2,3],
+                       edges=[(v,w,0) for v,w in edges],
+                       k=1)
+    assert not IInverse(g)._viable((0,1))
+    # the same graph, reversed, for (O)^{-1}
+    g = ColoredDigraph(vertices=[0,1,2,3],
+                       edges=[(w,v,0) for v,w in edges],
+                       k=1)
+    assert not OInverse(g)._viable((0,1))
+
+def test_split_sinks():
+    """
+    an insplit of a vertex without outgoing edges gives two such vertices,
+    which trivially share their outgoing edges. (I)^{-1} checks them with
+    an empty adjacency vector.
+    """
+    g = ColoredDigraph(vertices=[0,1,2],
+                       edges=[(0,2,0),(1,2,0),(1,0,0)],
+                       k=1)
+    moved = round_trip(g, I, IInverse, (2, {0}, {1}))
+    assert (moved.V(), moved.E()) == (4, 3)
+
+def test_split_loops():
+    """
+    a loop at a split vertex is both an incoming and an outgoing edge, so
+    each copy keeps an edge to the copy the loop is assigned to. both copies
+    then have the same neighbors on the duplicated side, and the inverse
+    split finds them.
+    """
+    g = ColoredDigraph(vertices=[0,1],
+                       edges=[(0,0,0),(1,0,0),(0,1,0)],
+                       k=1)
+    for E1, E2 in [({0},{1}), ({1},{0})]:
+        round_trip(g, I, IInverse, (0,E1,E2))
+        round_trip(g, O, OInverse, (0,E1,E2))
+
+def test_outsplit_sources():
+    """
+    an outsplit copies the incoming edges of a vertex to both halves, so
+    splitting a source would leave two sources, one more singular vertex
+    than before. (O) splits, and (O)^{-1} merges, only vertices with an
+    incoming edge.
+    """
+    # 0 is a source with two out-neighbors
+    g = ColoredDigraph(vertices=[0,1,2],
+                       edges=[(0,1,0),(0,2,0),(1,1,0),(2,2,0)],
+                       k=1)
+    assert O(g).viable == []
+    assert O(g, snapshot=CSRSnapshot(g)).viable == []
+    # 0 and 1 are sources with the same (empty) in-neighbors
+    h = ColoredDigraph(vertices=[0,1,2,3],
+                       edges=[(0,2,0),(1,3,0),(2,2,0),(3,3,0)],
+                       k=1)
+    assert not OInverse(h)._viable((0,1))
+    # once 0 has an incoming edge, it splits, and the halves merge back
+    g.add_edge(1,0,color=0)
+    assert 0 in [c[0] for c in O(g).viable]
+    moved = round_trip(g, O, OInverse, (0,{1},{2}))
+    assert all(len(moved.adj(v)[1]) > 0 for v in moved.vertices())
+
+def test_eclose():
+    """
+    (P) splices every out-neighbor of `u` and enters each splice twice from
+    `u`. the splices are reached from `u` but do not reach it, so `u` keeps
+    its loop as its only return path, and (P)^{-1} finds the motifs again.
+    """
+    # 0 has a loop and an exit to 1, which has two loops
+    g = ColoredDigraph(vertices=[0,1],
+                       edges=[(0,0,0),(0,1,0),(1,1,0),(1,1,0)],
+                       k=1)
+    assert P(g).viable == [0]
+    moved = round_trip(g, P, PInverse, 0)
+    assert len(CycleFinder(moved)[0]) == 1
+    assert moved.adj(0)[0].count(3) == 2
+
+def test_reduction():
+    """
+    (R) at v replaces the path w -> v => x, with d parallel edges out of v,
+    by d edges from w to x. its inverse component is the edge wx and d, at
+    which (R)^{-1} routes the d edges back through a new vertex.
+    """
+    # 1 has one edge in, from 0, and two edges out, to 2
+    g = ColoredDigraph(vertices=[0,1,2],
+                       edges=[(0,1,0),(1,2,0),(1,2,0),(2,0,0),(2,2,0)],
+                       k=1)
+    assert 1 in R(g).viable
+    moved = round_trip(g, R, RInverse, 1)
+    assert moved.adj(0)[0] == [2,2]
+    # (R)^{-1} needs d edges from v to w
+    assert not RInverse(g)._viable((1,2,3))
+
+def main():
+    print("="*100)
+    print("moves/ inverse test\n")
+    for test in [test_split_tables,
+                 test_split_edges,
+                 test_split_sinks,
+                 test_split_loops,
+                 test_outsplit_sources,
+                 test_eclose,
+                 test_reduction]:
+        test()
+        print(test.__name__, "passed")
+
+if __name__ == "__main__":
+    main()
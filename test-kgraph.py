@@ -0,0 +1,101 @@
+from src.kgraph import ColoredDigraph
+from src.moves import *
+
+import random
+
+MOVES = (S, SInverse, R, RInverse, I, IInverse, O, OInverse, C, CInverse, P,
+         PInverse)
+
+def touched(graph, move, component):
+    """
+    :return: the set of vertices whose edges a move changes, or which it adds
+    or deletes, found by applying it in place to a fork of `graph`.
+    """
+    vertices = set()
+    def _record(event, *args):
+        if (event in ('add_edge', 'del_edge')):
+            vertices.update(args[:2])
+        else:
+            vertices.update(args[:1])
+    fork = graph.fork()
+    fork.subscribe(_record)
+    move(fork, in_place=True)(component)(fork)
+    return vertices
+
+def check_shared(graph, child, touched):
+    """
+    checks that a fork of `graph` owns the lists of touched vertices only,
+    and shares the lists of every other vertex with `graph`.
+    """
+    assert child._owned[0] <= touched
+    for v in child.vertices():
+        if (v not in child._owned[0]):
+            assert child._adj[0][v] is graph._adj[0][v]
+
+def test_del_vertex():
+    """
+    vertices are deleted in constant time, by moving the last vertex into
+    the place of the deleted one; the vertices stay those added and not
+    deleted, and their positions stay current.
+    """
+    rng = random.Random(33)
+    g = ColoredDigraph(vertices=list(range(10)), edges=[], k=2)
+    expected = set(range(10))
+    for _ in range(500):
+        if ((len(expected) > 0) and (rng.random() < 0.5)):
+            v = rng.choice(sorted(expected))
+            g.del_vertex(v)
+            expected.discard(v)
+            assert not g.is_vertex(v)
+        else:
+            expected.add(g.add_vertex())
+        assert sorted(g.vertices()) == sorted(expected)
+        assert all(g._index[v] == i for i, v in enumerate(g.vertices()))
+    fork = g.fork()
+    v = fork.add_vertex()
+    assert (v in fork._index) and (v not in g._index)
+
+def test_fork_moves():
+    """
+    every move, applied to a fork, either by an operator with in_place=False
+    or to a fork made by the caller with in_place=True, copies only the
+    adjacency lists of the vertices it touches, and leaves the parent graph
+    as it was. in place on a graph never forked, nothing is copied.
+    """
+    rng = random.Random(38)
+    for trial in range(30):
+        V = rng.randint(2,6)
+        edges = [(rng.randrange(V),rng.randrange(V),0)
+                 for _ in range(rng.randint(V,3*V))]
+        g = ColoredDigraph(vertices=list(range(V)), edges=edges, k=1)
+        before = g.to_string()
+        for move in MOVES:
+            for component in move(g).viable:
+                vertices = touched(g, move, component)
+                child, _ = move(g)(component)(g)
+                check_shared(g, child, vertices)
+                fork = g.fork()
+                fork, _ = move(fork, in_place=True)(component)(fork)
+                check_shared(g, fork, vertices)
+                assert g.to_string() == before
+                assert g._owned == [set()]
+            # in place, on a graph never forked
+            h = ColoredDigraph(vertices=list(range(V)), edges=edges, k=1)
+            lists = dict(h._adj[0])
+            for component in move(h).viable[:1]:
+                vertices = touched(g, move, component)
+                move(h, in_place=True)(component)(h)
+                assert h._owned == None
+                assert all((h._adj[0][v] is lists[v])
+                           for v in h.vertices() if (v not in vertices))
+
+def main():
+    print("="*100)
+    print("kgraph test\n")
+    for test in [test_del_vertex,
+                 test_fork_moves]:
+        test()
+        print(test.__name__, "passed")
+
+if __name__ == "__main__":
+    main()
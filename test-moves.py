@@ -2,7 +2,6 @@ from src.kgraph import ColoredDigraph
 from src.moves import *
 from src.io import load_kgraph
 
-from copy import deepcopy
 import sys
 
 cases = [(S, "(S)",
@@ -40,7 +39,7 @@ for template, token, inverse_template, inverse_token in cases:
     viable_components = move.viable
     for c in viable_components:
         operator = move(c)
-        m_g, inverse_c = operator(deepcopy(g))
+        m_g, inverse_c = operator(g)
         print(f"{token} at {c}:\n{m_g.to_string()}")
         print("inverse token:", inverse_c)
         inverse_move = inverse_template(m_g)
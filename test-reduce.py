@@ -0,0 +1,54 @@
+from src.kgraph import ColoredDigraph
+from src.moves import *
+from src.moves.normalform import REDUCING_MOVES
+
+import random
+
+def check_normal_form(g, moves=REDUCING_MOVES):
+    """
+    reduces a graph, and checks that no move is left, that the graph given
+    is unchanged, and that replaying the steps reproduces the normal form.
+    :return: the normal form.
+    """
+    before = g.to_string()
+    h, steps = reduce(g, moves)
+    assert g.to_string() == before
+    for move in moves:
+        assert move(h).viable == []
+    graph = g
+    for move, component, _ in steps:
+        graph, _ = move(graph)(component)(graph)
+    assert graph.to_string() == h.to_string()
+    return h
+
+def test_sink_chain():
+    """
+    iterated sink deletion takes a path to its source.
+    """
+    n = 2000
+    g = ColoredDigraph(vertices=list(range(n)),
+                       edges=[(i,i+1,0) for i in range(n-1)],
+                       k=1)
+    h = check_normal_form(g, (S,))
+    assert (h.vertices(), h.E()) == ([0], 0)
+
+def test_random():
+    rng = random.Random(33)
+    for trial in range(100):
+        V = rng.randint(1,9)
+        g = ColoredDigraph(vertices=list(range(V)),
+                           edges=[(rng.randrange(V),rng.randrange(V),0)
+                                  for _ in range(rng.randint(1,16))],
+                           k=1)
+        check_normal_form(g)
+
+def main():
+    print("="*100)
+    print("moves/ normal form test\n")
+    for test in [test_sink_chain,
+                 test_random]:
+        test()
+        print(test.__name__, "passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,482 @@
+from src.kgraph import ColoredDigraph
+from src.moves import *
+from src.moves.normalform import REDUCING_MOVES
+from src.search import *
+from src.io import save_kgraph
+
+from hashlib import sha1
+import itertools
+import os
+import random
+import tarfile
+import tempfile
+
+def replay(skeleton, steps):
+    """
+    :return: the graph at the end of a witness, replayed with validation.
+    """
+    sequence = MoveSequence(skeleton)
+    sequence.extend(steps)
+    return sequence.graph
+
+def search_graph():
+    return ColoredDigraph(vertices=[0,1,2],
+                          edges=[(0,1,0),(1,2,0),(2,0,0),(1,1,0)],
+                          k=1)
+
+def bfs(skeleton, moves, max_depth, max_vertices):
+    """
+    :return: a dictionary from the hash of each graph within the bounds to
+    its distance from `skeleton`, by a plain breadth first search.
+    """
+    depths = {canonical_hash(skeleton): 0}
+    layer = [skeleton]
+    for depth in range(max_depth):
+        children = []
+        for graph in layer:
+            for _, _, child in expand(graph, moves):
+                h = canonical_hash(child)
+                if ((child.V() <= max_vertices) and (h not in depths)):
+                    depths[h] = depth + 1
+                    children.append(child)
+        layer = children
+    return depths
+
+def test_move_search():
+    """
+    a breadth first search finds every graph within its bounds, at its
+    distance from the root, and its path rebuilds it.
+    """
+    g = search_graph()
+    search = MoveSearch(g, max_depth=3, max_vertices=5)
+    states = search.run()
+    depths = bfs(g, MOVES, 3, 5)
+    assert dict((h, state[3]) for h, state in states.items()) == depths
+    for h in states:
+        assert len(search.path(h)) == depths[h]
+        assert canonical_hash(search.replay(h)) == h
+    bounded = MoveSearch(g, max_depth=3, max_vertices=5, max_states=50)
+    bounded.run()
+    assert 50 <= len(bounded) < len(search)
+    assert all((states[h][3] == bounded.states[h][3]) for h in bounded.states)
+
+def relabel(skeleton, rng):
+    """
+    :return: a copy of the graph with its vertices renamed at random, and
+    added in a random order, with the renaming.
+    """
+    vertices = list(skeleton.vertices())
+    names = rng.sample(range(100, 100+4*len(vertices)), len(vertices))
+    rename = dict(zip(vertices, names))
+    edges = edge_multiset(skeleton, rename)
+    rng.shuffle(names)
+    rng.shuffle(edges)
+    return ColoredDigraph(vertices=names, edges=edges, k=skeleton.k()), rename
+
+def edge_multiset(skeleton, rename=None):
+    """
+    :return: the sorted edges (v, w, color) of the graph, with the vertices
+    renamed by `rename` if given.
+    """
+    if (rename == None):
+        rename = dict((v, v) for v in skeleton.vertices())
+    return sorted((rename[v], rename[w], color)
+                  for v in skeleton.vertices() for color in skeleton.colors()
+                  for w in skeleton.adj(v, color)[0])
+
+def undirected(n, pairs):
+    return ColoredDigraph(vertices=list(range(n)),
+                          edges=[e for v, w in pairs
+                                 for e in [(v,w,0),(w,v,0)]],
+                          k=1)
+
+def brute_form(skeleton):
+    """
+    :return: the least edge list over all orderings of the vertices.
+    """
+    vertices = list(skeleton.vertices())
+    best = None
+    for order in itertools.permutations(range(len(vertices))):
+        position = dict(zip(vertices, order))
+        form = tuple(sorted((position[v], position[w], c)
+                            for v, w, c in edge_multiset(skeleton)))
+        if ((best == None) or (form < best)):
+            best = form
+    return (len(vertices), best)
+
+def test_canonical_relabel():
+    """
+    relabeled copies of a graph, with loops, multiple edges and two colors,
+    hash equal, and `isomorphism` maps the edges of one onto the other.
+    """
+    rng = random.Random(42)
+    for trial in range(200):
+        V = rng.randint(1,8)
+        g = ColoredDigraph(vertices=list(range(V)),
+                           edges=[(rng.randrange(V),rng.randrange(V),
+                                   rng.randrange(2))
+                                  for _ in range(rng.randint(0,3*V))],
+                           k=2)
+        h, _ = relabel(g, rng)
+        assert canonical_hash(g) == canonical_hash(h)
+        mapping = isomorphism(g, h)
+        assert sorted(mapping.values()) == sorted(h.vertices())
+        assert edge_multiset(g, mapping) == edge_multiset(h)
+
+def test_canonical_brute():
+    """
+    on small graphs, two hashes are equal iff the least edge lists over all
+    orderings of the vertices are.
+    """
+    rng = random.Random(42)
+    graphs = []
+    for trial in range(300):
+        V = rng.randint(1,6)
+        graphs.append(ColoredDigraph(vertices=list(range(V)),
+                                     edges=[(rng.randrange(V),
+                                             rng.randrange(V),0)
+                                            for _ in range(rng.randint(0,2*V))],
+                                     k=1))
+    for n in range(2,7):
+        graphs.append(undirected(n, [(i,(i+1)%n) for i in range(n)]))
+        graphs.append(undirected(n, itertools.combinations(range(n), 2)))
+    forms = dict()
+    for g in graphs:
+        forms.setdefault(brute_form(g), set()).add(canonical_hash(g))
+    assert all(len(hashes) == 1 for hashes in forms.values())
+    assert len(set.union(*forms.values())) == len(forms)
+
+def test_canonical_hard_pairs():
+    """
+    graphs that colour refinement alone does not tell apart hash differently,
+    and each hashes as its relabelings do.
+    """
+    cells = [(a,b) for a in range(4) for b in range(4)]
+    index = dict((cell, i) for i, cell in enumerate(cells))
+    # the shrikhande graph and the 4x4 rook's graph, both srg(16,6,2,2)
+    shrikhande = undirected(16, [(index[(a,b)], index[((a+da)%4,(b+db)%4)])
+                                 for a, b in cells
+                                 for da, db in [(0,1),(1,0),(1,1)]])
+    rook = undirected(16, [(index[(a,b)], index[(c,d)])
+                           for (a,b), (c,d) in itertools.combinations(cells, 2)
+                           if ((a == c) or (b == d))])
+    # a directed 6-cycle and two directed triangles
+    hexagon = ColoredDigraph(vertices=list(range(6)),
+                             edges=[(i,(i+1)%6,0) for i in range(6)], k=1)
+    triangles = ColoredDigraph(vertices=list(range(6)),
+                               edges=[(i,3*(i//3)+(i+1)%3,0)
+                                      for i in range(6)], k=1)
+    # co-spectral: the star K_{1,4}, and a 4-cycle with an isolated vertex
+    star = undirected(5, [(0,i) for i in range(1,5)])
+    square = undirected(5, [(i,(i+1)%4) for i in range(4)])
+    rng = random.Random(42)
+    for g, h in [(shrikhande, rook), (hexagon, triangles), (star, square)]:
+        assert canonical_hash(g) != canonical_hash(h)
+        assert isomorphism(g, h) == None
+        for graph in [g, h]:
+            for _ in range(5):
+                assert canonical_hash(relabel(graph, rng)[0]) == \
+                       canonical_hash(graph)
+
+def test_find_move_path_reduction():
+    """
+    with (R) alone, the search from the target does all the work, and the
+    witness walks its path back with (R)^{-1} at the inverse components of
+    (R). here d is 1, then 2.
+    """
+    g = ColoredDigraph(vertices=[0,1,2],
+                       edges=[(0,0,0),(1,2,0),(1,1,0),(1,2,0),(2,0,0)],
+                       k=1)
+    for d in [1, 2]:
+        target = g.fork()
+        target, _ = RInverse(target, in_place=True)((1,2,d))(target)
+        target, _ = RInverse(target, in_place=True)((1,1,1))(target)
+        witness = find_move_path(g, target, moves=(R,))
+        assert [move for move, _ in witness] == [RInverse, RInverse]
+        assert canonical_hash(replay(g, witness)) == canonical_hash(target)
+        witness = find_move_path(g, target, moves=(R, RInverse))
+        assert canonical_hash(replay(g, witness)) == canonical_hash(target)
+
+def zero(graph, target):
+    return 0
+
+def test_best_first():
+    """
+    with unit costs and no heuristic, a best first search finds the graphs
+    of a breadth first search at their distances, and the shortest path to a
+    target. any heuristic finds some path, whose cost is recorded.
+    """
+    g = search_graph()
+    depths = bfs(g, MOVES, 3, 5)
+    search = BestFirstSearch(g, cost=unit_cost, heuristic=zero, max_depth=3,
+                             max_vertices=5)
+    search.run()
+    assert search.costs == depths
+    rng = random.Random(44)
+    for h in rng.sample(sorted(depths), 5):
+        target = search.replay(h)
+        for cost, heuristic in [(unit_cost, zero),
+                                (growth_cost, size_distance),
+                                (unit_cost, degree_distance),
+                                (unit_cost, invariant_distance)]:
+            found = BestFirstSearch(g, target, cost=cost, heuristic=heuristic,
+                                    max_vertices=5, max_states=5000)
+            path = found.run()
+            graph, total = g, 0
+            for move, component in path:
+                child, _ = move(graph)(component)(graph)
+                total += cost(move, component, graph, child)
+                graph = child
+            assert canonical_hash(graph) == h
+            assert found.costs[h] == total
+            if (heuristic == zero):
+                assert len(path) == depths[h]
+
+def test_beam_pruning():
+    """
+    a graph pruned from a best first frontier forgets its cost, so it is
+    pushed again when another path reaches it. every graph with a cost is
+    expanded, or has an entry in the frontier at that cost.
+    """
+    g = ColoredDigraph(vertices=[0,1,2],
+                       edges=[(0,2,0),(1,1,0),(1,2,0)],
+                       k=1)
+    search = BestFirstSearch(g, cost=growth_cost, max_open=3, max_vertices=5,
+                             max_states=200)
+    pruned = set()
+    while (not search.done()):
+        costs = dict(search.costs)
+        search.step()
+        pruned.update(h for h in costs if (h not in search.costs))
+        live = set((entry[3], entry[2]) for entry in search.frontier)
+        assert all((h in search.closed) or ((h, c) in live)
+                   for h, c in search.costs.items())
+    assert search.pruned > 0
+    assert any((h in search.costs) for h in pruned)
+
+# moves under which the graphs with a bounded number of vertices are finitely
+# many
+BOUNDED_MOVES = (S, SInverse, R, RInverse, IInverse, OInverse)
+
+def test_parallel_search():
+    """
+    a search by a pool of processes finds the graphs of a search in one
+    process, each with a path that rebuilds it. stopped at a bound, it
+    continues where it stopped.
+    """
+    g = search_graph()
+    expected = MoveSearch(g, moves=BOUNDED_MOVES, max_vertices=5).run()
+    search = ParallelMoveSearch(g, moves=BOUNDED_MOVES, max_vertices=5,
+                                processes=2)
+    assert set(search.run()) == set(expected)
+    for h, state in search.states.items():
+        assert len(search.path(h)) == state[3]
+        assert canonical_hash(search.replay(h)) == h
+    search = ParallelMoveSearch(g, moves=BOUNDED_MOVES, max_vertices=5,
+                                max_states=40, processes=2)
+    search.run()
+    assert 40 <= len(search) < len(expected)
+    search.max_states = None
+    assert set(search.run()) == set(expected)
+    search = ParallelMoveSearch(g, moves=BOUNDED_MOVES, max_depth=2,
+                                processes=2)
+    search.run()
+    assert all((state[3] <= 2) for state in search.states.values())
+
+def test_disk_search():
+    """
+    a search kept in a database finds the graphs of a search in memory, with
+    the same states, and can be reopened from its checkpoint.
+    """
+    g = search_graph()
+    expected = MoveSearch(g, moves=BOUNDED_MOVES, max_vertices=5).run()
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, 'search.db')
+        checkpoint = os.path.join(directory, 'search.ck')
+        search = DiskMoveSearch(g, database, moves=BOUNDED_MOVES,
+                                max_vertices=5, max_states=40, capacity=64)
+        search.commit_interval = 7
+        search.run(checkpoint=checkpoint, interval=0)
+        assert 40 <= len(search) < len(expected)
+        search.close()
+        search = load(checkpoint)
+        search.max_states = None
+        states = search.run()
+        assert sorted(states.items()) == sorted(expected.items())
+        assert all((h in states) for h in expected)
+        assert canonical_hash(search.replay(sorted(expected)[-1])) == \
+               sorted(expected)[-1]
+        search.close()
+    # no false negatives, and few false positives
+    bloom = BloomFilter(1000, 0.01)
+    keys = [sha1(str(n).encode()).hexdigest() for n in range(2000)]
+    for key in keys[:1000]:
+        bloom.add(key)
+    assert all((key in bloom) for key in keys[:1000])
+    assert sum((key in bloom) for key in keys[1000:]) < 50
+
+def test_checkpoint():
+    """
+    a search saved at a bound, loaded and continued, finds what a search run
+    through does; and so does a reduction stopped after a checkpoint.
+    """
+    g = search_graph()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'search.ck')
+        expected = MoveSearch(g, max_vertices=5, max_depth=3).run()
+        search = MoveSearch(g, max_vertices=5, max_depth=3, max_states=40)
+        search.run(checkpoint=path, interval=0)
+        search = load(path)
+        search.max_states = None
+        search.save(path)
+        assert resume(path) == expected
+        assert load(path).states == expected
+        expected = BestFirstSearch(g, cost=growth_cost, max_vertices=5,
+                                   max_states=200).run()
+        search = BestFirstSearch(g, cost=growth_cost, max_vertices=5,
+                                 max_states=100)
+        search.run(checkpoint=path, interval=0)
+        search = load(path)
+        search.max_states = 200
+        assert search.run() == expected
+        # a reduction, stopped after its first checkpoint
+        rng = random.Random(47)
+        n = 200
+        h = ColoredDigraph(vertices=list(range(n)),
+                           edges=[(rng.randrange(n),rng.randrange(n),0)
+                                  for _ in range(int(1.3*n))],
+                           k=1)
+        reduced, steps = reduce(h)
+        assert [step[:2] for step in reduce_checkpointed(h, path)[1]] == \
+               [step[:2] for step in steps]
+        def _stop(graph, taken):
+            save(dict(graph=graph, steps=taken, moves=REDUCING_MOVES), path)
+            raise KeyboardInterrupt()
+        try:
+            reduce(h, checkpoint=_stop, interval=0)
+            assert False
+        except KeyboardInterrupt:
+            pass
+        assert 0 < len(load(path)['steps']) < len(steps)
+        resumed, taken = resume(path)
+        assert canonical_hash(resumed) == canonical_hash(reduced)
+        assert canonical_hash(replay(h, taken)) == canonical_hash(reduced)
+
+def test_classify():
+    """
+    graphs one move from a few seeds are classified by seed, in a directory
+    and in an archive, and the witness between two graphs of a class leads
+    from one to the other. a classification resumed from its checkpoint
+    gives the same classes.
+    """
+    seeds = [ColoredDigraph(vertices=[0], edges=[(0,0,0)]*2, k=1),
+             ColoredDigraph(vertices=[0], edges=[(0,0,0)]*3, k=1),
+             ColoredDigraph(vertices=[0,1], edges=[(0,1,0),(1,1,0)], k=1)]
+    rng = random.Random(49)
+    seed_of = dict()
+    with tempfile.TemporaryDirectory() as directory:
+        root = os.path.join(directory, 'graphs')
+        os.makedirs(os.path.join(root, 'sub'))
+        for i, seed in enumerate(seeds):
+            children = [child for _, _, child in expand(seed)
+                        if (child.V() <= 3)]
+            for j, graph in enumerate([seed] + rng.sample(children, 3)):
+                name = ('sub/' if (j % 2) else '') + 'g%d_%d.sk' % (i, j)
+                save_kgraph(graph, os.path.join(root, name))
+                seed_of[name] = i
+        archive = os.path.join(directory, 'graphs.tar')
+        with tarfile.open(archive, 'w') as f:
+            for name in seed_of:
+                f.add(os.path.join(root, name), arcname=name)
+        checkpoint = os.path.join(directory, 'classes.ck')
+        classification = classify(root, max_depth=3, max_states=2000,
+                                  processes=2, checkpoint=checkpoint,
+                                  interval=0)
+        classes = classification.classes()
+        assert sorted(sorted(c) for c in classes) == \
+               sorted(sorted(name for name in seed_of if (seed_of[name] == i))
+                      for i in range(len(seeds)))
+        assert resume(checkpoint) == classes
+        assert [sorted(c) for c in classify(archive, max_depth=3,
+                                            max_states=2000,
+                                            processes=1).classes()] == \
+               [sorted(c) for c in classes]
+        graphs = classification.graphs
+        for c in classes:
+            for other in c[1:]:
+                chain = classification.witness(c[0], other)
+                names = [c[0]]
+                for source, target, steps in chain:
+                    assert names[-1] in (source, target)
+                    names.append(target if (names[-1] == source) else source)
+                    assert canonical_hash(replay(graphs[source], steps)) == \
+                           canonical_hash(graphs[target])
+                assert names[-1] == other
+        assert classification.witness(classes[0][0], classes[1][0]) == None
+
+def test_verify():
+    """
+    `verify` accepts a witness, and rejects one with a step that is not
+    viable or malformed, or that ends at another graph.
+    """
+    g = ColoredDigraph(vertices=[0,1,2],
+                       edges=[(0,1,0),(1,2,0),(1,2,0),(2,0,0),(2,2,0)],
+                       k=1)
+    before = g.to_string()
+    sequence = MoveSequence(g)
+    w = sequence.append(RInverse, (1,2,1))
+    sequence.append(C, 0)
+    sequence.append(R, w)
+    steps = list(sequence)
+    assert verify(g, steps)
+    assert verify(g, steps, sequence.graph)
+    assert not verify(g, steps, g)
+    # (C) at 0 is viable only after (R)^{-1} gives it a second cycle
+    assert not verify(g, steps[1:])
+    for component in [9, (1,2), (1,9,1), (1,2,3)]:
+        assert not verify(g, [(RInverse, component)])
+    assert not verify(g, [(O, (2, {0}, {9}))])
+    assert g.to_string() == before
+
+def test_optimize_reduction():
+    """
+    (R)^{-1} at an edge vw creates a vertex x, and (R) at x undoes it. the
+    pair is dropped, and the steps between them commuted past it, unless
+    one of them is viable only with x.
+    """
+    g = ColoredDigraph(vertices=[0,1,2],
+                       edges=[(0,1,0),(1,2,0),(1,2,0),(2,0,0),(2,2,0)],
+                       k=1)
+    for middle, expected in [([], []),
+                             ([(C, 2)], [(C, 2)]),
+                             ([(C, 0)], None)]:
+        sequence = MoveSequence(g)
+        x = sequence.append(RInverse, (1,2,1))
+        sequence.extend(middle)
+        sequence.append(R, x)
+        steps = list(sequence)
+        shorter = optimize(g, steps)
+        assert shorter == (steps if (expected == None) else expected)
+        assert verify(g, shorter, sequence.graph)
+
+def main():
+    print("="*100)
+    print("search/ module test\n")
+    for test in [test_move_search,
+                 test_canonical_relabel,
+                 test_canonical_brute,
+                 test_canonical_hard_pairs,
+                 test_find_move_path_reduction,
+                 test_best_first,
+                 test_beam_pruning,
+                 test_parallel_search,
+                 test_disk_search,
+                 test_checkpoint,
+                 test_classify,
+                 test_verify,
+                 test_optimize_reduction]:
+        test()
+        print(test.__name__, "passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+from src.kgraph import ColoredDigraph
+from src.moves import *
+
+import random
+
+MOVES = (S, SInverse, R, RInverse, I, IInverse, O, OInverse, C, CInverse, P,
+         PInverse)
+
+def edges(graph, mapping=None):
+    """
+    :return: the sorted edges of the graph, with their endpoints mapped by
+    `mapping` if given.
+    """
+    if (mapping == None):
+        mapping = dict((v,v) for v in graph.vertices())
+    return sorted((mapping[v], mapping[w], color)
+                  for v in graph.vertices() for color in graph.colors()
+                  for w in graph.adj(v, color)[0])
+
+def record(rng, g, n):
+    """
+    :return: a sequence of up to n random moves from `g`.
+    """
+    sequence = MoveSequence(g)
+    for _ in range(n):
+        options = [(move, component) for move in MOVES
+                   for component in move(sequence.graph).viable]
+        if ((len(options) == 0) or (sequence.graph.V() > 12)):
+            break
+        sequence.append(*rng.choice(options))
+    return sequence
+
+def test_replay():
+    """
+    a sequence replayed on a relabeled copy of its initial graph ends at its
+    final graph, relabeled by the mapping returned.
+    """
+    rng = random.Random(39)
+    for trial in range(40):
+        V = rng.randint(1,5)
+        g = ColoredDigraph(vertices=list(range(V)),
+                           edges=[(rng.randrange(V),rng.randrange(V),0)
+                                  for _ in range(rng.randint(1,10))],
+                           k=1)
+        sequence = record(rng, g, 6)
+        names = rng.sample(range(10, 10+2*V), V)
+        mapping = dict(zip(g.vertices(), names))
+        h = ColoredDigraph(vertices=names, edges=edges(g, mapping), k=1)
+        before = h.to_string()
+        for validate in [True, False]:
+            graph, inverses, extended = sequence.replay(h, mapping, validate)
+            assert h.to_string() == before
+            assert len(inverses) == len(sequence)
+            assert edges(graph) == edges(sequence.graph, extended)
+        results = sequence.replay_many([h, g], [mapping, None])
+        assert [edges(graph) for graph, _, _ in results] == \
+               [edges(sequence.graph, extended) for _, _, extended in results]
+        graph, _, extended = sequence.replay(h, mapping, in_place=True)
+        assert graph is h
+        assert edges(h) == edges(sequence.graph, extended)
+
+def test_replay_other():
+    """
+    a sequence is not replayed on a graph other than its initial graph.
+    """
+    g = ColoredDigraph(vertices=[0,1,2],
+                       edges=[(0,1,0),(1,2,0),(2,0,0),(2,2,0)],
+                       k=1)
+    sequence = MoveSequence(g)
+    sequence.append(C, 2)
+    other = ColoredDigraph(vertices=[0,1,2],
+                           edges=[(0,1,0),(1,2,0),(2,0,0),(1,1,0)],
+                           k=1)
+    for skeleton, mapping in [(other, None),
+                              (g, {0: 1, 1: 0, 2: 2}),
+                              (ColoredDigraph(vertices=[0,1], edges=[], k=1),
+                               None)]:
+        try:
+            sequence.replay(skeleton, mapping)
+            assert False
+        except ValueError:
+            pass
+
+def main():
+    print("="*100)
+    print("moves/ sequence test\n")
+    for test in [test_replay,
+                 test_replay_other]:
+        test()
+        print(test.__name__, "passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+from src.kgraph import ColoredDigraph
+from src.moves import *
+from src.moves.degree_index import DegreeIndex
+from src.moves.snapshot import CSRSnapshot
+
+import random
+
+MOVES = (S, SInverse, R, RInverse, I, IInverse, O, OInverse, C, CInverse, P,
+         PInverse)
+
+# each move, to the move that undoes it
+INVERSES = {S: SInverse, SInverse: S, R: RInverse, RInverse: R,
+            I: IInverse, IInverse: I, O: OInverse, OInverse: O,
+            C: CInverse, CInverse: C, P: PInverse, PInverse: P}
+
+def norm(component):
+    """
+    :return: the component, comparable, with its sets sorted.
+    """
+    if isinstance(component, tuple):
+        return tuple(norm(x) for x in component)
+    elif isinstance(component, (set, frozenset, list)):
+        return tuple(sorted(component))
+    return component
+
+def view(move):
+    """
+    :return: the viable components of a move, sorted.
+    """
+    return sorted(repr(norm(component)) for component in move.viable)
+
+def random_graph(rng, V, E):
+    return ColoredDigraph(vertices=list(range(V)),
+                          edges=[(rng.randrange(V),rng.randrange(V),0)
+                                 for _ in range(E)],
+                          k=1)
+
+def signature(graph, v):
+    """
+    :return: the in-degree, out-degree and loop count of `v`, over every
+    color, read from its adjacency lists.
+    """
+    signature = [0, 0, 0]
+    for color in graph.colors():
+        adj_out, adj_in = graph.adj(v, color)
+        signature[0] += len(adj_in)
+        signature[1] += len(adj_out)
+        signature[2] += adj_out.count(v)
+    return tuple(signature)
+
+def isomorphic(graph, other):
+    """
+    :return: true iff the 1-graphs are isomorphic, by a search for a bijection
+    of their vertices that keeps the signature of each vertex and the number
+    of edges between each pair.
+    """
+    if (sorted(signature(graph, v) for v in graph.vertices()) !=
+        sorted(signature(other, w) for w in other.vertices())):
+        return False
+    vertices = graph.vertices()
+    mapping = dict()
+    def extend(i):
+        if (i == len(vertices)):
+            return True
+        v = vertices[i]
+        for w in other.vertices():
+            if ((w in mapping.values()) or
+                (signature(graph, v) != signature(other, w))):
+                continue
+            mapping[v] = w
+            if all(((graph.adj(v)[0].count(x) ==
+                     other.adj(w)[0].count(mapping[x])) and
+                    (graph.adj(x)[0].count(v) ==
+                     other.adj(mapping[x])[0].count(w)))
+                   for x in vertices[:i+1]):
+                if extend(i+1):
+                    return True
+            del mapping[v]
+        return False
+    return extend(0)
+
+def test_incremental():
+    """
+    incremental moves, along random moves and mutations of their graph, list
+    the components that moves built on each graph do.
+    """
+    rng = random.Random(31)
+    for trial in range(40):
+        g = random_graph(rng, rng.randint(1,5), rng.randint(1,9))
+        incremental = dict((move, move(g, incremental=True))
+                           for move in MOVES)
+        for step in range(8):
+            if (g.V() > 16):
+                break
+            options = [(move, component)
+                       for move in MOVES
+                       for component in incremental[move].viable]
+            if ((len(options) > 0) and (rng.random() < 0.7)):
+                move, component = rng.choice(options)
+                move(g, in_place=True)(component)(g)
+            elif ((rng.random() < 0.5) or (g.E() == 0)):
+                g.add_edge(rng.choice(g.vertices()), rng.choice(g.vertices()),
+                           0)
+            else:
+                v = rng.choice([v for v in g.vertices()
+                                if (len(g.adj(v)[0]) > 0)])
+                g.del_edge(v, rng.choice(g.adj(v)[0]), 0)
+            for move in MOVES:
+                assert view(incremental[move]) == view(move(g))
+        for move in MOVES:
+            incremental[move].detach()
+
+def test_lazy():
+    """
+    a lazy move checks nothing until asked; it enumerates the components of
+    an eager move, each pair of an inverse split once, and stops at the first
+    for `any_viable`.
+    """
+    rng = random.Random(32)
+    for trial in range(60):
+        g = random_graph(rng, rng.randint(1,6), rng.randint(1,12))
+        for move in MOVES:
+            eager = move(g)
+            lazy = move(g, lazy=True)
+            assert lazy._viable_components == None
+            assert lazy.any_viable() == (len(eager.viable) > 0)
+            assert lazy._viable_components == None
+            components = [repr(norm(c)) for c in lazy.iter_viable()]
+            if (move in (IInverse, OInverse)):
+                assert len(set(components)) == len(components)
+            assert sorted(components) == view(eager)
+            assert lazy.active == eager.active
+            assert view(lazy) == view(eager)
+
+def test_apply_many():
+    """
+    a batch of components is applied in one pass, and undone by the inverse
+    components returned, in reverse order. components far apart are all
+    taken.
+    """
+    rng = random.Random(34)
+    for trial in range(60):
+        g = random_graph(rng, rng.randint(1,7), rng.randint(1,14))
+        before = g.to_string()
+        for move in MOVES:
+            components = move(g).viable
+            rng.shuffle(components)
+            h, inverses = move(g).apply_many(g, components)
+            assert g.to_string() == before
+            assert (len(inverses) > 0) == (len(components) > 0)
+            for inverse in reversed(inverses):
+                h, _ = INVERSES[move](h)(inverse)(h)
+            assert isomorphic(h, g)
+    # sinks n+1, ..., 2n, one per edge
+    n = 50
+    g = ColoredDigraph(vertices=list(range(2*n)),
+                       edges=[(i,n+i,0) for i in range(n)], k=1)
+    h, inverses = S(g, in_place=True).apply_many(g, S(g).viable)
+    assert (h is g) and (len(inverses) == n)
+    assert sorted(g.vertices()) == list(range(n))
+
+def test_apply_many_nonlocal():
+    """
+    a non-local move acting on a fork checks each further component again on
+    the fork, and takes every one still viable.
+    """
+    # n copies of a vertex 2i with a loop, entering a vertex 2i+1 with two
+    n = 4
+    edges = []
+    for i in range(n):
+        edges += [(2*i,2*i,0),(2*i,2*i+1,0),(2*i+1,2*i+1,0),(2*i+1,2*i+1,0)]
+    g = ColoredDigraph(vertices=list(range(2*n)), edges=edges, k=1)
+    before = g.to_string()
+    for move in [P, C]:
+        h, inverses = move(g).apply_many(g, move(g).viable)
+        assert len(inverses) == n
+        h, undone = INVERSES[move](h).apply_many(h, inverses)
+        assert len(undone) == n
+        assert (g.to_string() == before) and isomorphic(h, g)
+        assert h._subscribers == []
+
+def brute_partitions(neighbors):
+    """
+    :return: the set of unordered partitions of a set into two nonempty parts.
+    """
+    neighbors = sorted(neighbors)
+    partitions = set()
+    for mask in range(1, (1 << len(neighbors)) - 1):
+        E1 = frozenset(w for j, w in enumerate(neighbors) if ((mask >> j) & 1))
+        partitions.add(frozenset([E1, frozenset(neighbors) - E1]))
+    return partitions
+
+def test_partitions():
+    """
+    the partitions of a split are every partition of the neighbors into two
+    parts, each once, and each viable.
+    """
+    rng = random.Random(35)
+    for trial in range(60):
+        g = random_graph(rng, rng.randint(1,7), rng.randint(1,16))
+        for move, side in [(I, 1), (O, 0)]:
+            instance = move(g)
+            for v in g.vertices():
+                partitions = list(instance.partitions(v))
+                assert all(instance._viable(c) for c in partitions)
+                keys = [frozenset([frozenset(E1), frozenset(E2)])
+                        for _, E1, E2 in partitions]
+                assert len(set(keys)) == len(keys)
+                if instance.splittable(v):
+                    assert set(keys) == brute_partitions(set(g.adj(v)[side]))
+                else:
+                    assert keys == []
+
+def test_buckets():
+    """
+    the inverse splits check only the pairs within a bucket of vertices
+    with the same neighbors, and find every pair found by checking each pair
+    of vertices that has such a neighbor.
+    """
+    rng = random.Random(36)
+    found = 0
+    for trial in range(60):
+        g = random_graph(rng, rng.randint(2,6), rng.randint(2,12))
+        # splits leave pairs to find
+        for _ in range(3):
+            move = rng.choice([I, O])
+            if (len(move(g).viable) > 0):
+                g, _ = move(g)(rng.choice(move(g).viable))(g)
+        for move, side in [(IInverse, 0), (OInverse, 1)]:
+            instance = move(g)
+            vertices = sorted(g.vertices())
+            pairs = sorted((v,w) for i, v in enumerate(vertices)
+                           for w in vertices[i+1:]
+                           if ((len(g.adj(v)[side]) > 0) and
+                               instance._viable((v,w))))
+            assert sorted(instance.viable) == pairs
+            assert sorted(move(g, lazy=True).iter_viable()) == pairs
+            found += len(pairs)
+    assert found > 0
+
+def test_degree_index():
+    """
+    an incremental degree index, on a graph of two colors mutated at random,
+    buckets each vertex by its signature, as a new index does.
+    """
+    rng = random.Random(37)
+    for trial in range(40):
+        V = rng.randint(1,6)
+        g = ColoredDigraph(vertices=list(range(V)),
+                           edges=[(rng.randrange(V),rng.randrange(V),
+                                   rng.randrange(2))
+                                  for _ in range(rng.randint(0,12))],
+                           k=2)
+        index = DegreeIndex(g, incremental=True)
+        for step in range(20):
+            vertices = g.vertices()
+            op = rng.random()
+            if (op < 0.4):
+                g.add_edge(rng.choice(vertices), rng.choice(vertices),
+                           rng.randrange(2))
+            elif ((op < 0.7) and (g.E() > 0)):
+                v, color = rng.choice([(v, color) for v in vertices
+                                       for color in g.colors()
+                                       if (len(g.adj(v, color)[0]) > 0)])
+                g.del_edge(v, rng.choice(g.adj(v, color)[0]), color)
+            elif ((op < 0.85) and (len(vertices) > 1)):
+                g.del_vertex(rng.choice(vertices))
+            else:
+                g.add_vertex()
+            fresh = DegreeIndex(g)
+            keys = set(signature(g, v) for v in g.vertices())
+            for v in g.vertices():
+                assert index.key(v) == fresh.key(v) == signature(g, v)
+            for key in keys:
+                assert index[key] == fresh[key] == \
+                       [v for v in g.vertices() if (signature(g, v) == key)]
+        index.detach()
+
+def test_motif_index():
+    """
+    (C)^{-1} seeks its motifs through a degree index, shared or its own,
+    and finds the motifs that a search of every vertex does. a move that is
+    not incremental builds its index once.
+    """
+    rng = random.Random(37)
+    g = random_graph(rng, 5, 10)
+    index = DegreeIndex(g, incremental=True)
+    incremental = CInverse(g, incremental=True, degreeindex=index)
+    for step in range(30):
+        move = rng.choice([C, C, CInverse, S, SInverse, I, O])
+        viable = move(g).viable
+        if (len(viable) > 0):
+            move(g, in_place=True)(rng.choice(viable))(g)
+        # a motif (v, w, u) is a path from v through w to u
+        expected = [(v, w, u) for v in g.vertices()
+                    for w in set(g.adj(v, symmetric=True))
+                    for u in set(g.adj(w, symmetric=True))
+                    if CInverse(g, lazy=True)._viable((v, w, u))]
+        assert view(incremental) == view(CInverse(g)) == \
+               sorted(repr(c) for c in expected)
+        # a move that is not incremental builds its index once, and keeps it
+        static = CInverse(g)
+        built = static.degreeindex
+        assert not built.incremental
+        assert static._candidates() == index[CInverse.motif_key]
+        assert static.degreeindex is built
+    try:
+        CInverse(random_graph(rng, 2, 2), degreeindex=index)
+        assert False
+    except ValueError:
+        pass
+
+def test_sharded():
+    """
+    a shardable move checked by a pool of processes lists the components of
+    a move checked in-process, in the same order.
+    """
+    rng = random.Random(40)
+    for trial in range(3):
+        g = random_graph(rng, 30, 60)
+        for move in MOVES:
+            if (not move.shardable):
+                continue
+            sharded = move(g, lazy=True, processes=2)
+            sharded.parallel_threshold = 1
+            assert sharded._sharded()
+            assert list(map(norm, sharded.viable)) == \
+                   list(map(norm, move(g).viable))
+
+def test_snapshot():
+    """
+    the degrees of a snapshot are those of its graph, over every color and
+    with vertices deleted, and a vectorizable move checked on it lists the
+    components of a move checked vertex by vertex.
+    """
+    rng = random.Random(41)
+    for trial in range(60):
+        k = rng.randint(1,2)
+        V = rng.randint(1,8)
+        g = ColoredDigraph(vertices=list(range(V)),
+                           edges=[(rng.randrange(V),rng.randrange(V),
+                                   rng.randrange(k))
+                                  for _ in range(rng.randint(0,16))],
+                           k=k)
+        for _ in range(rng.randint(0,2)):
+            if (g.V() > 1):
+                g.del_vertex(rng.choice(g.vertices()))
+        snapshot = CSRSnapshot(g)
+        vertices = g.vertices()
+        assert snapshot.labels.tolist() == vertices
+        out_adj = [[w for c in g.colors() for w in g.adj(v, c)[0]]
+                   for v in vertices]
+        in_adj = [[w for c in g.colors() for w in g.adj(v, c)[1]]
+                  for v in vertices]
+        assert snapshot.out_degree().tolist() == list(map(len, out_adj))
+        assert snapshot.in_degree().tolist() == list(map(len, in_adj))
+        assert snapshot.loops().tolist() == \
+               [adj.count(v) for v, adj in zip(vertices, out_adj)]
+        assert snapshot.distinct_out().tolist() == \
+               [len(set(adj)) for adj in out_adj]
+        assert snapshot.distinct_in().tolist() == \
+               [len(set(adj)) for adj in in_adj]
+        if (k == 1):
+            for move in MOVES:
+                if move.vectorizable:
+                    assert list(map(norm, move(g, snapshot=snapshot).viable)) \
+                           == list(map(norm, move(g).viable))
+    try:
+        S(g, snapshot=CSRSnapshot(g.fork()))
+        assert False
+    except ValueError:
+        pass
+
+def main():
+    print("="*100)
+    print("moves/ viability test\n")
+    for test in [test_incremental,
+                 test_lazy,
+                 test_apply_many,
+                 test_apply_many_nonlocal,
+                 test_partitions,
+                 test_buckets,
+                 test_degree_index,
+                 test_motif_index,
+                 test_sharded,
+                 test_snapshot]:
+        test()
+        print(test.__name__, "passed")
+
+if __name__ == "__main__":
+    main()